@@ -1,120 +1,534 @@
-"""Bag file playback worker — reads .bag frames and emits QImage signals."""
+"""Bag file playback worker — reads .bag (or .rvl) frames into a preview mailbox."""
 import time
 import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Optional
 import numpy as np
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
-from PyQt6.QtGui import QImage
+
+from app.camera.frame_source import (
+    FrameSet, FrameSource, BagFileFrameSource, EndOfStream, REALSENSE_AVAILABLE,
+)
+from app.camera.chunked_recording import open_chunked
+from app.camera.depth_colorizer import make_colorizer
+from app.camera.frame_index import FrameIndex, seek_to
+from app.camera.frame_mailbox import FrameMailbox
+from app.camera.frame_pool import FramePool, PooledFrame
+from app.camera.frame_render import decimate, decimation_factor, render_preview
+from app.camera.rvl_file import RvlFileFrameSource
 
 logger = logging.getLogger(__name__)
 
-try:
-    import pyrealsense2 as rs
-    REALSENSE_AVAILABLE = True
-except ImportError:
-    rs = None  # type: ignore
-    REALSENSE_AVAILABLE = False
+# Framesets decoded ahead of the one on screen
+PREFETCH = 8
+# A frameset shown more than this after its due time counts as late
+LATE_TOLERANCE_MS = 10.0
+# When decoding falls this far behind the clock the decoder seeks ahead
+CATCH_UP_MS = 250.0
+
+
+@dataclass
+class PlaybackStats:
+    buffered: int       # decoded framesets waiting to be shown
+    capacity: int
+    underruns: int      # times a frameset was wanted and none was decoded yet
+    decoded: int
+    shown: int
+    late: int = 0       # shown more than LATE_TOLERANCE_MS after their due time
+    skipped: int = 0    # not shown because a later one was already due
+    max_late_ms: float = 0.0
+
+
+@dataclass
+class _Decoded:
+    """One entry of the prefetch queue."""
+    generation: int
+    frame: Optional[PooledFrame] = None
+    timestamp_ms: float = 0.0
+    index: int = -1
+    seconds: float = 0.0
+    end: bool = False
+    error: Optional[str] = None
+
+    def release(self) -> None:
+        if self.frame is not None:
+            self.frame.release()
 
 
 class BagPlaybackWorker(QObject):
-    """Reads frames from a .bag file and emits them as QImage.
+    """Reads frames from a .bag file and posts them to a FrameMailbox.
 
     Shows RGB (left) + colorised Depth (right) side-by-side when both streams
     are present; falls back to whichever stream is available.
 
-    Pause/resume is handled by setting _paused; the worker sleeps in the loop
-    rather than calling wait_for_frames, which keeps the bag position intact.
+    Two threads share the work. A decoder thread owns the source: it reads,
+    decodes, colorizes and composites framesets into pooled buffers, up to
+    PREFETCH ahead, in a bounded queue. The presenter (run(), on the
+    worker's QThread) only takes them off the queue when they are due and
+    posts them to the mailbox, so one slow frameset costs buffer rather
+    than a visible stall. stats_updated reports the queue depth and how
+    often the presenter found it empty, about once a second.
+
+    The source stays open for the life of the worker: seek(), step() and
+    restart() queue commands and reaching the end only idles both threads
+    until the next seek. Each seek starts a new generation; the decoder
+    drops what it had prefetched and the presenter discards anything
+    older still in flight. A run of seeks (a slider drag) collapses to
+    the newest one. Seeking to an arbitrary frameset needs the recording's
+    FrameIndex, passed in or supplied later with set_index(); without one
+    only restart() and forward steps are possible.
+
+    Framesets are shown at their recorded timestamps scaled by the speed
+    set with set_speed(), so a 15 fps recording plays at 15 fps, 2.0 plays
+    it twice as fast, and a gap where the camera dropped frames stays a
+    gap. The schedule is fixed to the recording's clock from the anchor
+    frame on: when a frameset comes out late it is counted, and if the one
+    after it is already due too it is skipped, so playback falls back into
+    step instead of drifting behind. If decoding itself cannot keep up
+    (high speeds) the decoder seeks ahead to the clock once it is
+    CATCH_UP_MS behind, which needs the index. Pausing, seeking and
+    changing speed re-anchor the clock on the last frame shown.
+
+    Any finite FrameSource (e.g. a ReplayFrameSource) may be injected in
+    place of the bag file; .rvl files are read with RvlFileFrameSource,
+    which needs no SDK. A recording split into chunks plays as one, given
+    its first file and the index of the whole recording (see
+    chunked_recording). *colorizer* is "numpy" or "realsense".
+
+    Frames are decimated to the size passed to set_preview_size() before
+    colorizing, so the cost follows the viewer size, not the recording's.
+    frame_ready is emitted when *mailbox* goes from empty to full; the
+    receiver take()s the newest frame and release()s it once painted.
     """
 
-    frame_ready     = pyqtSignal(QImage)
-    error_occurred  = pyqtSignal(str)
-    playback_ended  = pyqtSignal()
+    frame_ready      = pyqtSignal()
+    error_occurred   = pyqtSignal(str)
+    playback_ended   = pyqtSignal()
+    position_changed = pyqtSignal(int, float)   # frameset index (-1 if unindexed), seconds
+    stats_updated    = pyqtSignal(object)       # PlaybackStats
 
-    TARGET_FPS = 30
+    SPEEDS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0)
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, source: Optional[FrameSource] = None,
+                 colorizer: str = "numpy", index: Optional[FrameIndex] = None):
         super().__init__()
         self._file_path = file_path
+        self._colorizer_kind = colorizer
+        self._preview_width  = 0
+        self._preview_height = 0
+        self._source  = source
+        self._index   = index
+        # Room for the prefetched frames, the mailbox and the one on screen
+        self._frame_pool = FramePool(size=PREFETCH + 3)
+        self.mailbox     = FrameMailbox()
+        self._commands: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._seeks:    "queue.SimpleQueue[tuple[int, int]]" = queue.SimpleQueue()
+        self._frames:   "queue.Queue[_Decoded]" = queue.Queue(maxsize=PREFETCH)
         self._running = False
         self._paused  = False
+        self._speed   = 1.0
+        # Playback clock, set by the presenter and read by the decoder:
+        # (generation, monotonic s, timestamp ms, speed), None while stopped
+        self._anchor: Optional[tuple[int, float, float, float]] = None
+
+        # Presenter state (worker thread only)
+        self._generation = 0
+        self._last_ts: Optional[float] = None
+        self._current = -1
+        self._target: Optional[int] = None    # frameset of the seek in flight
+        self._to_show = 0           # entries to take even while paused; the last is shown
+        self._next: Optional[_Decoded] = None
+        self._ended     = False
+        self._starving  = True      # queue found empty and already counted
+        self._underruns = 0
+        self._shown     = 0
+        self._late      = 0
+        self._skipped   = 0
+        self._max_late_ms = 0.0
+        self._decoded   = 0         # written by the decoder thread
+        self._skipped_ahead = 0     # written by the decoder thread
 
     @pyqtSlot()
     def run(self) -> None:
-        if not REALSENSE_AVAILABLE:
+        is_rvl = self._file_path.lower().endswith(".rvl")
+        if self._source is None and not is_rvl and not REALSENSE_AVAILABLE:
             self.error_occurred.emit("pyrealsense2 is not installed.")
             return
 
-        pipeline  = rs.pipeline()
-        config    = rs.config()
-        config.enable_device_from_file(self._file_path, repeat_playback=False)
-
-        colorizer = rs.colorizer()
-        colorizer.set_option(rs.option.color_scheme, 0)  # Jet
+        # Real-time mode is disabled on bag sources so we drive the frame rate ourselves
+        source = self._source
+        if source is None:
+            source = open_chunked(self._file_path, RvlFileFrameSource if is_rvl
+                                  else BagFileFrameSource)
+        colorizer = make_colorizer(self._colorizer_kind, bgr=True)
 
+        decoder = None
         try:
-            profile  = pipeline.start(config)
-            playback = profile.get_device().as_playback()
-            # Disable real-time mode so we drive the frame rate ourselves
-            playback.set_real_time(False)
+            source.start()
 
             self._running = True
-            frame_interval = 1.0 / self.TARGET_FPS
+            decoder = threading.Thread(target=self._decode_loop, args=(source, colorizer),
+                                       name="playback-decode", daemon=True)
+            decoder.start()
             logger.info("Bag playback started: %s", self._file_path)
 
+            next_stats = time.monotonic() + 1.0
             while self._running:
-                # Honour pause
-                if self._paused:
-                    time.sleep(0.05)
+                self._apply_commands()
+
+                now = time.monotonic()
+                if now >= next_stats:
+                    next_stats = now + 1.0
+                    self.stats_updated.emit(self.stats())
+
+                # Seek results and frame steps are shown even while paused
+                if self._to_show:
+                    item = self._take()
+                    if item is None or self._handle_special(item):
+                        continue
+                    self._to_show -= 1
+                    if self._to_show:
+                        item.release()
+                    else:
+                        self._target = None
+                        self._anchor = None
+                        self._show(item)
+                    continue
+
+                # Honour pause (and idle at the end until the next seek)
+                if self._paused or self._ended:
+                    self._anchor = None
+                    time.sleep(0.02)
+                    continue
+
+                if self._next is None:
+                    self._next = self._take()
+                    if self._next is None:
+                        continue
+                if self._handle_special(self._next):
+                    self._next = None
+                    continue
+
+                # Hold the frame until its recorded time, in short sleeps so
+                # commands stay responsive
+                wait = self._due(self._next.timestamp_ms) - time.monotonic()
+                if wait > 0:
+                    time.sleep(min(wait, 0.02))
                     continue
+                self._show(self._catch_up(-wait * 1000.0))
+
+        except Exception as exc:
+            logger.error("Bag playback worker error: %s", exc)
+            self.error_occurred.emit(str(exc))
+        finally:
+            self._running = False
+            if decoder is not None:
+                decoder.join(timeout=3.0)
+            self._drop_queued()
+            if self._next is not None:
+                self._next.release()
+            source.stop()
+            logger.info("Bag playback stopped (%d shown, %d late, %d skipped, "
+                        "%d underruns).", self._shown, self._late,
+                        self._skipped + self._skipped_ahead, self._underruns)
+
+    def stats(self) -> PlaybackStats:
+        return PlaybackStats(buffered=self._frames.qsize(), capacity=PREFETCH,
+                             underruns=self._underruns, decoded=self._decoded,
+                             shown=self._shown, late=self._late,
+                             skipped=self._skipped + self._skipped_ahead,
+                             max_late_ms=self._max_late_ms)
+
+    # ------------------------------------------------------------------ #
+    # Presenter                                                            #
+    # ------------------------------------------------------------------ #
+
+    def _due(self, timestamp_ms: float) -> float:
+        """Monotonic time at which the frameset stamped *timestamp_ms* is due."""
+        if self._anchor is None:
+            start = self._last_ts if self._last_ts is not None else timestamp_ms
+            self._anchor = (self._generation, time.monotonic(),
+                            min(start, timestamp_ms), self._speed)
+        _, wall, ts, speed = self._anchor
+        return wall + (timestamp_ms - ts) / 1000.0 / speed
+
+    def _catch_up(self, late_ms: float) -> _Decoded:
+        """Take self._next, which is *late_ms* past due, skipping ahead to the
+        newest prefetched frameset that is already due."""
+        item, self._next = self._next, None
+        if late_ms <= LATE_TOLERANCE_MS:
+            return item
+        self._late += 1
+        self._max_late_ms = max(self._max_late_ms, late_ms)
+        now = time.monotonic()
+        while True:
+            try:
+                following = self._frames.get_nowait()
+            except queue.Empty:
+                break
+            if following.generation != self._generation:
+                following.release()
+                continue
+            if (following.end or following.error is not None
+                    or self._due(following.timestamp_ms) > now):
+                self._next = following
+                break
+            item.release()
+            item = following
+            self._skipped += 1
+        return item
 
-                t0 = time.monotonic()
+    def _take(self) -> Optional[_Decoded]:
+        """Next prefetched entry of the current generation, or None."""
+        try:
+            item = self._frames.get(timeout=0.05)
+        except queue.Empty:
+            if not self._starving:
+                self._starving = True
+                self._underruns += 1
+            return None
+        self._starving = False
+        if item.generation != self._generation:
+            item.release()
+            return None
+        return item
+
+    def _handle_special(self, item: _Decoded) -> bool:
+        """Act on an end-of-stream or error entry; True if *item* was one."""
+        if item.error is not None:
+            self.error_occurred.emit(item.error)
+            self._running = False
+        elif item.end:
+            self._to_show  = 0
+            self._target   = None
+            self._starving = True
+            if not self._ended:
+                self._ended = True
+                self.playback_ended.emit()
+        else:
+            return False
+        return True
+
+    def _show(self, item: _Decoded) -> None:
+        self._last_ts = item.timestamp_ms
+        self._current = item.index
+        self._shown  += 1
+        self.position_changed.emit(item.index, item.seconds)
+        if item.frame is not None and self.mailbox.put(item.frame):
+            self.frame_ready.emit()
+
+    def _apply_commands(self) -> None:
+        seek = None
+        while True:
+            try:
+                command, arg = self._commands.get_nowait()
+            except queue.Empty:
+                break
+            if command == "seek":
+                seek = arg
+            elif command == "step":
+                if seek is not None:
+                    self._request_seek(seek)
+                    seek = None
+                self._request_step(arg)
+            elif command == "speed":
+                self._speed  = arg
+                self._anchor = None
+        if seek is not None:
+            self._request_seek(seek)
+
+    def _request_step(self, n: int) -> None:
+        if n < 0:
+            base = self._target if self._target is not None else self._current
+            if self._index is not None and base >= 0:
+                self._request_seek(max(0, base + n))
+            return
+        if self._ended:
+            return
+        # A frameset already taken off the queue is the first step
+        if self._next is not None and not self._to_show:
+            item, self._next = self._next, None
+            n -= 1
+            if not n:
+                self._anchor = None
+                self._show(item)
+                return
+            item.release()
+        self._to_show += n
 
+    def _request_seek(self, i: int) -> None:
+        if self._index is None and i != 0:
+            return
+        self._generation += 1
+        self._seeks.put((self._generation, i))
+        if self._next is not None:
+            self._next.release()
+            self._next = None
+        self._target   = i
+        self._to_show  = 1
+        self._ended    = False
+        self._starving = True
+        self._anchor   = None
+        self._last_ts  = None
+
+    def _drop_queued(self) -> None:
+        """Release every entry still in the prefetch queue."""
+        while True:
+            try:
+                self._frames.get_nowait().release()
+            except queue.Empty:
+                break
+
+    # ------------------------------------------------------------------ #
+    # Decoder thread                                                       #
+    # ------------------------------------------------------------------ #
+
+    def _decode_loop(self, source: FrameSource, colorizer) -> None:
+        generation = 0
+        first_ts: Optional[float] = None
+        ended = False
+        while self._running:
+            # Only the newest seek matters
+            seek = None
+            while True:
                 try:
-                    frames = pipeline.wait_for_frames(timeout_ms=2000)
-                except RuntimeError:
-                    # End of bag file
-                    self.playback_ended.emit()
+                    seek = self._seeks.get_nowait()
+                except queue.Empty:
                     break
-                except Exception as exc:
-                    if self._running:
-                        self.error_occurred.emit(str(exc))
+
+            try:
+                if seek is not None:
+                    generation, i = seek
+                    ended = False
+                    self._drop_queued()     # the presenter would discard them
+                    frames = self._seek_source(source, i)
+                    if frames is None:
+                        if self._index is not None:     # ran off the end
+                            ended = True
+                            self._put(_Decoded(generation, end=True))
+                        continue
+                elif ended:
+                    time.sleep(0.02)
+                    continue
+                else:
+                    try:
+                        frames = source.wait_for_frames(timeout_ms=2000)
+                    except EndOfStream:
+                        ended = True
+                        self._put(_Decoded(generation, end=True))
+                        continue
+                    if frames is None:
+                        continue
+
+                index = self._index
+                if seek is None and index is not None:
+                    frames = self._catch_up_source(source, index, generation, frames)
+                    if frames is None:
+                        ended = True
+                        self._put(_Decoded(generation, end=True))
+                        continue
+                if index is not None and len(index):
+                    first_ts = float(index.timestamps_ms[0])
+                    i = int(np.searchsorted(index.timestamps_ms, frames.timestamp_ms))
+                else:
+                    if first_ts is None:
+                        first_ts = frames.timestamp_ms
+                    i = -1
+                self._put(_Decoded(generation, self._render(frames, colorizer),
+                                   frames.timestamp_ms, i,
+                                   (frames.timestamp_ms - first_ts) / 1000.0))
+                self._decoded += 1
+            except Exception as exc:
+                if self._running:
+                    logger.error("Playback decoder error: %s", exc)
+                    self._put(_Decoded(generation, error=str(exc)))
+                return
+
+    def _seek_source(self, source: FrameSource, i: int) -> Optional[FrameSet]:
+        """Seek to frameset *i* and return it (None: read on from the start)."""
+        index = self._index
+        if index is None:
+            source.seek(0)
+            return None
+        i = max(0, min(i, len(index) - 1))
+        t0 = time.perf_counter()
+        frames = seek_to(source, index, i)
+        logger.debug("Seek to frameset %d took %.0f ms", i,
+                     (time.perf_counter() - t0) * 1000.0)
+        return frames
+
+    def _catch_up_source(self, source: FrameSource, index: FrameIndex,
+                         generation: int, frames: FrameSet) -> Optional[FrameSet]:
+        """*frames*, or if it is already CATCH_UP_MS behind the playback
+        clock, the frameset the clock has reached (None past the end)."""
+        anchor = self._anchor
+        if anchor is None or anchor[0] != generation:
+            return frames
+        _, wall, ts, speed = anchor
+        now_ts = ts + (time.monotonic() - wall) * 1000.0 * speed
+        if (now_ts - frames.timestamp_ms) / speed < CATCH_UP_MS:
+            return frames
+        current = int(np.searchsorted(index.timestamps_ms, frames.timestamp_ms))
+        target = index.find_time(now_ts - float(index.timestamps_ms[0]))
+        if target <= current:
+            return frames
+        self._skipped_ahead += target - current
+        logger.debug("Playback %.0f ms behind; skipping to frameset %d.",
+                     (now_ts - frames.timestamp_ms) / speed, target)
+        return seek_to(source, index, target)
+
+    def _put(self, item: _Decoded) -> None:
+        """Queue *item*, waiting for room; dropped if a seek or stop intervenes."""
+        while self._running:
+            try:
+                self._frames.put(item, timeout=0.05)
+                return
+            except queue.Full:
+                if not self._seeks.empty():
                     break
+        item.release()
 
-                color_frame = frames.get_color_frame()
-                depth_frame = frames.get_depth_frame()
+    def _render(self, frames: FrameSet, colorizer) -> Optional[PooledFrame]:
+        ref = frames.depth if frames.depth is not None else frames.color
+        if ref is None:
+            return None
+        panels = 2 if frames.depth is not None and frames.color is not None else 1
+        factor = decimation_factor(ref.shape[1], ref.shape[0],
+                                   self._preview_width // panels,
+                                   self._preview_height)
+        return render_preview(decimate(frames, factor), True, colorizer,
+                              self._frame_pool)
 
-                if not color_frame and not depth_frame:
-                    continue
+    # ------------------------------------------------------------------ #
+    # Controls (called from the UI thread)                                 #
+    # ------------------------------------------------------------------ #
 
-                parts: list[np.ndarray] = []
-                if color_frame:
-                    color_bgr = np.asarray(color_frame.get_data())
-                    parts.append(color_bgr[:, :, ::-1].copy())
+    def set_preview_size(self, width: int, height: int) -> None:
+        self._preview_width  = width
+        self._preview_height = height
 
-                if depth_frame:
-                    depth_colored = colorizer.colorize(depth_frame)
-                    parts.append(np.asarray(depth_colored.get_data()).copy())
+    def set_index(self, index: FrameIndex) -> None:
+        """Enable seeking once the recording's index is available."""
+        self._index = index
 
-                combined = np.hstack(parts) if len(parts) > 1 else parts[0]
-                h, w, ch = combined.shape
-                qimg = QImage(combined.data, w, h, ch * w,
-                              QImage.Format.Format_RGB888)
-                self.frame_ready.emit(qimg.copy())
+    def set_speed(self, speed: float) -> None:
+        self._commands.put(("speed", speed))
 
-                # Throttle to TARGET_FPS
-                elapsed = time.monotonic() - t0
-                sleep_t = frame_interval - elapsed
-                if sleep_t > 0:
-                    time.sleep(sleep_t)
+    def seek(self, i: int) -> None:
+        """Show frameset *i* of the index; playback continues from there."""
+        self._commands.put(("seek", i))
 
-        except Exception as exc:
-            logger.error("Bag playback worker error: %s", exc)
-            self.error_occurred.emit(str(exc))
-        finally:
-            try:
-                pipeline.stop()
-            except Exception:
-                pass
-            logger.info("Bag playback stopped.")
+    def step(self, n: int) -> None:
+        """Pause and move *n* framesets (negative steps need the index)."""
+        self._paused = True
+        self._commands.put(("step", n))
+
+    def restart(self) -> None:
+        """Play again from the first frameset, without reopening the file."""
+        self._paused = False
+        self._commands.put(("seek", 0))
 
     def pause(self) -> None:
         self._paused = True
@@ -0,0 +1,159 @@
+"""Writes FrameSets to a .bag file without owning the camera pipeline.
+
+A librealsense software device mirrors the streams of the running camera
+(same resolution, fps and intrinsics) and is wrapped in an ``rs.recorder``.
+Every frame pushed into its sensors is serialised to the bag, so a
+recording can be attached to — and detached from — a stream that keeps
+running for the whole session.
+"""
+import logging
+
+from typing import Optional
+
+import numpy as np
+
+from app.camera.frame_source import Extrinsics, FrameSet, StreamInfo
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyrealsense2 as rs
+    REALSENSE_AVAILABLE = True
+except ImportError:
+    rs = None  # type: ignore
+    REALSENSE_AVAILABLE = False
+
+
+# name → (sensor name, stream index, unique id, bytes per pixel)
+_STREAM_LAYOUT = {
+    "depth":    ("Stereo Module", 0, 1, 2),
+    "infrared": ("Stereo Module", 1, 2, 1),
+    "color":    ("RGB Camera",    0, 3, 3),
+}
+
+
+def _rs_stream(name: str):
+    return {"color": rs.stream.color, "depth": rs.stream.depth,
+            "infrared": rs.stream.infrared}[name]
+
+
+def _rs_format(name: str):
+    return {"color": rs.format.bgr8, "depth": rs.format.z16,
+            "infrared": rs.format.y8}[name]
+
+
+class BagWriter:
+    """Serialises framesets for the given *streams* into *file_path*.
+
+    *extrinsics* (depth → stream, see frame_source.depth_extrinsics) are
+    registered between the mirrored profiles, so readers of the bag can
+    align depth to colour with the camera's calibration.
+
+    Not thread-safe: one thread calls write() and close().
+    """
+
+    def __init__(self, file_path: str, streams: dict[str, StreamInfo],
+                 depth_scale: float = 0.001,
+                 extrinsics: Optional[dict[str, Extrinsics]] = None):
+        if not REALSENSE_AVAILABLE:
+            raise RuntimeError("pyrealsense2 is not installed.")
+        self._file_path = file_path
+        self._device    = rs.software_device()
+        self._sensors: dict[str, "rs.software_sensor"] = {}
+        self._profiles: dict[str, "rs.stream_profile"] = {}
+        self._frames_written = 0
+        self._bytes_written  = 0
+
+        sensors_by_name: dict[str, "rs.software_sensor"] = {}
+        for name, info in streams.items():
+            sensor_name, index, uid, bpp = _STREAM_LAYOUT[name]
+            sensor = sensors_by_name.get(sensor_name)
+            if sensor is None:
+                sensor = self._device.add_sensor(sensor_name)
+                sensors_by_name[sensor_name] = sensor
+                if sensor_name == "Stereo Module":
+                    sensor.add_read_only_option(rs.option.depth_units, depth_scale)
+
+            intr = rs.intrinsics()
+            intr.width, intr.height = info.intrinsics.width, info.intrinsics.height
+            intr.fx, intr.fy = info.intrinsics.fx, info.intrinsics.fy
+            intr.ppx, intr.ppy = info.intrinsics.ppx, info.intrinsics.ppy
+            intr.model = rs.distortion.brown_conrady
+            intr.coeffs = list(info.intrinsics.coeffs)
+
+            vs = rs.video_stream()
+            vs.type = _rs_stream(name)
+            vs.index = index
+            vs.uid = uid
+            vs.width, vs.height, vs.fps = info.width, info.height, info.fps
+            vs.bpp = bpp
+            vs.fmt = _rs_format(name)
+            vs.intrinsics = intr
+            self._profiles[name] = sensor.add_video_stream(vs)
+            self._sensors[name] = sensor
+
+        depth = self._profiles.get("depth")
+        for name, extr in (extrinsics or {}).items():
+            if depth is None or name not in self._profiles:
+                continue
+            rs_extr = rs.extrinsics()
+            rs_extr.rotation = list(extr.rotation)
+            rs_extr.translation = list(extr.translation)
+            depth.register_extrinsics_to(self._profiles[name], rs_extr)
+
+        # Sensors must be opened through the recorder so it sees every frame.
+        self._recorder = rs.recorder(file_path, self._device)
+        self._rec_sensors = []
+        for rec_sensor, sw_sensor in zip(self._recorder.query_sensors(),
+                                         sensors_by_name.values()):
+            profiles = [p for n, p in self._profiles.items()
+                        if self._sensors[n] is sw_sensor]
+            rec_sensor.open(profiles)
+            rec_sensor.start(lambda frame: None)
+            self._rec_sensors.append(rec_sensor)
+        logger.info("Bag writer opened: %s (%s)", file_path, ", ".join(streams))
+
+    @property
+    def frames_written(self) -> int:
+        return self._frames_written
+
+    @property
+    def bytes_written(self) -> int:
+        """Pixel bytes written so far; the bag adds little to them."""
+        return self._bytes_written
+
+    def write(self, frames: FrameSet) -> None:
+        """Append every stream present in *frames* to the bag, stamped with
+        its own hardware timestamp and counter where the source knows them."""
+        clock = frames.stream_clock or {}
+        for name, profile in self._profiles.items():
+            pixels = getattr(frames, name)
+            if pixels is None:
+                continue
+            pixels = np.ascontiguousarray(pixels)
+            frame = rs.software_video_frame()
+            frame.pixels = pixels
+            frame.stride = pixels.strides[0]
+            frame.bpp = _STREAM_LAYOUT[name][3]
+            frame.timestamp, frame.frame_number = clock.get(
+                name, (frames.timestamp_ms, frames.frame_number))
+            frame.domain = rs.timestamp_domain.hardware_clock
+            frame.profile = profile.as_video_stream_profile()
+            self._sensors[name].on_video_frame(frame)
+            self._bytes_written += pixels.nbytes
+        self._frames_written += 1
+
+    def close(self) -> None:
+        """Stop the software sensors and flush the bag to disk."""
+        for rec_sensor in self._rec_sensors:
+            try:
+                rec_sensor.stop()
+                rec_sensor.close()
+            except RuntimeError:
+                pass
+        self._rec_sensors = []
+        # The recorder finalises the bag when it is destroyed.
+        self._recorder = None
+        self._device = None
+        logger.info("Bag writer closed: %s (%d framesets)",
+                    self._file_path, self._frames_written)
@@ -0,0 +1,274 @@
+"""Camera service — one long-lived pipeline shared by preview and recording.
+
+The service owns the FrameSource for a whole session. Every frameset is
+handed to the attached RecordingWorker (if any) and, at the preview rate,
+rendered for the UI. Starting or stopping a recording never restarts the
+camera, so the first recorded frame arrives one frame interval after Start.
+
+While nothing is recording, the raw frames are also kept in a PrerollBuffer
+so a recording can begin with the seconds before Start was pressed. The
+buffer is frozen from Start until the recorder has closed its files, since
+writers read the pre-roll frames in place.
+"""
+import logging
+import time
+from enum import Enum
+from typing import Optional
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from app.camera.frame_source import (
+    EndOfStream, Extrinsics, FrameSet, FrameSource, RealSenseFrameSource, StreamInfo,
+    REALSENSE_AVAILABLE, depth_extrinsics,
+)
+from app.camera.depth_colorizer import make_colorizer
+from app.camera.frame_mailbox import FrameMailbox
+from app.camera.frame_pool import FramePool, PooledFrame
+from app.camera.frame_render import decimate, decimation_factor, render_preview
+from app.camera.preroll_buffer import PrerollBuffer
+from app.camera.preview_rate import PreviewRateController
+from app.camera.realsense_manager import build_streaming_config
+from app.camera.reprojection import DepthReprojector
+
+logger = logging.getLogger(__name__)
+
+
+class PreviewMode(str, Enum):
+    CALIBRATION = "calibration"  # RGB (left) + colorized Depth (right) side by side
+    DATA = "data"                # Colorized Depth only
+
+
+class CameraService(QObject):
+    """Runs in a QThread for the lifetime of a recording session.
+
+    CALIBRATION mode: RGB and colorized depth side by side.
+    DATA mode: colorized depth only.
+    The preview mode can be switched while streaming.
+
+    Frames come from *source* when one is injected (synthetic, replay, …);
+    otherwise a RealSense pipeline is opened with all three streams at the
+    recording profiles, on the device with *serial* if one is given. Run
+    one service per camera for multi-camera rigs.
+
+    *preroll_seconds* of raw frames (capped at *preroll_max_bytes*) are
+    handed to each recorder on attach; 0 disables pre-roll.
+
+    *colorizer* selects the depth colorizer: "numpy" (LUT-based
+    DepthColorizer) or "realsense" (rs.colorizer).
+
+    Preview frames are decimated to the display size given by
+    set_preview_size() before alignment, colorizing and compositing, so
+    preview cost follows the widget size; recorders always get
+    full-resolution frames. Alignment uses a DepthReprojector whose maps
+    are built once per stream profile.
+
+    The preview rate adapts between 2 fps and *preview_fps* so rendering
+    stays within *preview_budget* (fraction of one core, halved while
+    recording) and does not outrun the UI; see PreviewRateController.
+    preview_rate_changed reports the effective rate about once a second.
+
+    Preview frames are posted to *mailbox* (newest wins); frame_ready is
+    emitted only when the mailbox was empty, and the receiver take()s the
+    frame from it and release()s it once painted.
+
+    streaming_stopped is emitted once the source has been closed — after
+    stop(), an error, a finite source (bag, synthetic, replay) running
+    out or a camera that stopped delivering frames — so the owner can
+    quit the thread.
+    """
+
+    frame_ready          = pyqtSignal()
+    error_occurred       = pyqtSignal(str)
+    streaming_started    = pyqtSignal()
+    streaming_stopped    = pyqtSignal()
+    preview_rate_changed = pyqtSignal(object)   # PreviewRate
+
+    def __init__(self, color_width: int = 1280, color_height: int = 720,
+                 color_fps: int = 30, depth_width: int = 1280,
+                 depth_height: int = 720, depth_fps: int = 30,
+                 infrared_width: int = 1280, infrared_height: int = 720,
+                 infrared_fps: int = 30, preview_fps: int = 15,
+                 preview_budget: float = 0.25,
+                 mode: PreviewMode = PreviewMode.CALIBRATION,
+                 preroll_seconds: float = 0.0,
+                 preroll_max_bytes: int = 512 * 1024 * 1024,
+                 colorizer: str = "numpy",
+                 serial: Optional[str] = None,
+                 source: Optional[FrameSource] = None):
+        super().__init__()
+        self._color_width     = color_width
+        self._color_height    = color_height
+        self._color_fps       = color_fps
+        self._depth_width     = depth_width
+        self._depth_height    = depth_height
+        self._depth_fps       = depth_fps
+        self._infrared_width  = infrared_width
+        self._infrared_height = infrared_height
+        self._infrared_fps    = infrared_fps
+        self._preview_fps     = preview_fps
+        self._preview_budget  = preview_budget
+        self._mode            = mode
+        self._preview_width   = 0
+        self._preview_height  = 0
+        self._source          = source
+        self.serial           = serial
+        self._colorizer_kind  = colorizer
+        self._preroll         = PrerollBuffer(preroll_seconds, color_fps,
+                                              preroll_max_bytes)
+        self._active_source: Optional[FrameSource] = None
+        self._recorder        = None
+        self._reprojector     = DepthReprojector()
+        self._frame_pool      = FramePool()
+        self.mailbox          = FrameMailbox()
+        self._running         = False
+
+    # ------------------------------------------------------------------ #
+    # Control (called from the UI thread)                                  #
+    # ------------------------------------------------------------------ #
+
+    def set_preview_mode(self, mode: PreviewMode) -> None:
+        self._mode = mode
+
+    def set_preview_size(self, width: int, height: int) -> None:
+        """Size (in pixels) of the widget the preview is displayed in."""
+        self._preview_width  = width
+        self._preview_height = height
+
+    def attach_recorder(self, recorder) -> None:
+        """Start forwarding every frameset to *recorder* (a RecordingWorker).
+
+        The recorder first receives the buffered pre-roll, then live frames.
+        """
+        self._recorder = recorder
+
+    def detach_recorder(self) -> None:
+        self._recorder = None
+
+    def is_streaming(self) -> bool:
+        return self._running
+
+    def streams(self) -> dict[str, StreamInfo]:
+        return self._active_source.streams() if self._active_source else {}
+
+    def stop(self) -> None:
+        self._running = False
+
+    # ------------------------------------------------------------------ #
+    # Capture loop                                                         #
+    # ------------------------------------------------------------------ #
+
+    def _build_source(self) -> FrameSource:
+        return RealSenseFrameSource(build_streaming_config(
+            self._color_width, self._color_height, self._color_fps,
+            self._depth_width, self._depth_height, self._depth_fps,
+            self._infrared_width, self._infrared_height, self._infrared_fps,
+            serial=self.serial,
+        ))
+
+    @pyqtSlot()
+    def run(self) -> None:
+        if self._source is None and not REALSENSE_AVAILABLE:
+            self.error_occurred.emit("pyrealsense2 is not installed.")
+            return
+
+        source = self._source or self._build_source()
+
+        # Jet colormap for depth visualisation
+        colorizer = make_colorizer(self._colorizer_kind, bgr=True)
+        recorder  = None
+        # Detached recorder whose writer may still read the frozen pre-roll
+        draining  = None
+
+        try:
+            source.start()
+            self._active_source = source
+            self._running = True
+            self.streaming_started.emit()
+            logger.info("Camera service started (mode=%s, serial=%s).",
+                        self._mode, self.serial or "default")
+
+            streams = source.streams()
+            calibration = depth_extrinsics(source)
+            extrinsics = calibration.get("color")
+
+            rate = PreviewRateController(self._preview_fps, self._color_fps,
+                                         self._preview_budget)
+
+            while self._running:
+                try:
+                    frames = source.wait_for_frames(timeout_ms=1000)
+                except EndOfStream as exc:
+                    logger.info("Camera source ended: %s", exc)
+                    break
+                if frames is None:
+                    continue
+
+                if self._recorder is not recorder:
+                    if recorder is not None:
+                        draining = recorder
+                    recorder = self._recorder
+                    if recorder is not None:
+                        recorder.set_streams(source.streams(), source.depth_scale,
+                                             calibration)
+                        # The ring still holds the previous recording's
+                        # pre-roll until that one is written out
+                        recorder.set_preroll(self._preroll.freeze()
+                                             if draining is None else [])
+                if draining is not None and draining.finished():
+                    self._preroll.release()
+                    draining = None
+                if recorder is not None:
+                    recorder.submit(frames)
+                elif draining is None:
+                    self._preroll.push(frames)
+
+                now = time.monotonic()
+                report = rate.update(now, self.mailbox.taken, recorder is not None,
+                                     recorder.backlog() if recorder is not None else 0.0)
+                if report is not None:
+                    self.preview_rate_changed.emit(report)
+                if not rate.due(now):
+                    continue
+
+                try:
+                    frame = self._render_preview(frames, streams, extrinsics,
+                                                 source.depth_scale, colorizer,
+                                                 rate.scale)
+                    rate.rendered(time.monotonic() - now)
+                    if frame is not None and self.mailbox.put(frame):
+                        self.frame_ready.emit()
+                except Exception as exc:
+                    # preview failure must never abort an attached recording
+                    logger.debug("Preview frame skipped: %s", exc)
+
+        except Exception as exc:
+            logger.error("Camera service error: %s", exc)
+            self.error_occurred.emit(str(exc))
+        finally:
+            self._running = False
+            self._active_source = None
+            source.stop()
+            logger.info("Camera service stopped (preview: %d posted, %d overwritten).",
+                        self.mailbox.posted, self.mailbox.overwritten)
+            self.streaming_stopped.emit()
+
+    def _render_preview(self, frames: FrameSet, streams: dict[str, StreamInfo],
+                        extrinsics: Optional[Extrinsics], depth_scale: float,
+                        colorizer, scale: int = 1) -> Optional[PooledFrame]:
+        include_color = self._mode != PreviewMode.DATA
+        if frames.depth is None:
+            return None
+        if include_color and frames.color is None:
+            return None
+
+        # Decimate first, then align depth to color at preview resolution
+        ref = frames.color if frames.color is not None else frames.depth
+        h, w = ref.shape[:2]
+        panels = 2 if include_color else 1
+        factor = decimation_factor(w, h, self._preview_width // panels,
+                                   self._preview_height) * scale
+        small = decimate(frames, factor)
+        if extrinsics is not None:
+            small = self._reprojector.align(
+                small, factor, streams["depth"].intrinsics,
+                streams["color"].intrinsics, extrinsics, depth_scale)
+        return render_preview(small, include_color, colorizer, self._frame_pool)
@@ -0,0 +1,217 @@
+"""Recordings split into consecutive chunk files, read as one recording.
+
+RecordingWorker can roll a long recording over to a new file every so
+many minutes or GB (see build_chunk_path for the names):
+
+    S01_data_20250101_120000.bag            chunk 0, the recording's file_path
+    S01_data_20250101_120000_chunk001.bag   chunk 1
+    ...
+
+Every chunk is a complete recording by itself, with its own sidecar frame
+index. ChunkedFrameSource plays the chunks back to back, and the index of
+the whole recording is the chunks' indexes concatenated, so playback,
+seeking and export do not need to know a recording was split. Positions
+carry the chunk number above CHUNK_SHIFT bits:
+
+    position = chunk << CHUNK_SHIFT | position within the chunk
+
+CHUNK_SHIFT leaves 78 hours of bag playback nanoseconds per chunk. A
+recording that was not split is opened as its single file's own source,
+so its positions are unchanged.
+"""
+import logging
+import os
+import re
+from typing import Callable, Optional
+
+import numpy as np
+
+from app.camera.frame_index import FrameIndex, build_index, load_index
+from app.camera.frame_source import EndOfStream, Extrinsics, FrameSet, FrameSource, StreamInfo
+from app.utils.file_utils import build_chunk_path
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SHIFT = 48
+_POSITION_MASK = (1 << CHUNK_SHIFT) - 1
+_CONTINUATION = re.compile(r"_chunk\d{3,}$")
+
+
+def chunk_paths(file_path: str) -> list[str]:
+    """*file_path* followed by its chunks that exist on disk, in order."""
+    paths = [file_path]
+    while True:
+        path = build_chunk_path(file_path, len(paths))
+        if not os.path.exists(path):
+            return paths
+        paths.append(path)
+
+
+def is_continuation(file_path: str) -> bool:
+    """True for chunk 1 onwards, which belong to the recording before them."""
+    return bool(_CONTINUATION.search(os.path.splitext(file_path)[0]))
+
+
+def fingerprint(file_path: str) -> tuple[int, int]:
+    """(total size, newest mtime_ns) of every chunk of the recording."""
+    size, mtime = 0, 0
+    for path in chunk_paths(file_path):
+        st = os.stat(path)
+        size += st.st_size
+        mtime = max(mtime, st.st_mtime_ns)
+    return size, mtime
+
+
+# ---------------------------------------------------------------------- #
+# Source                                                                   #
+# ---------------------------------------------------------------------- #
+
+class ChunkedFrameSource(FrameSource):
+    """Reads the chunks of one recording as a single source.
+
+    Only one chunk is open at a time; running off the end of a chunk
+    opens the next one. *open_chunk* makes the (unstarted) source of one
+    chunk file; *first* is chunk 0's, if already made.
+    """
+
+    def __init__(self, file_paths: list[str],
+                 open_chunk: Callable[[str], FrameSource],
+                 first: Optional[FrameSource] = None):
+        self._paths      = list(file_paths)
+        self._open_chunk = open_chunk
+        self._first      = first
+        self._chunk      = -1
+        self._source: Optional[FrameSource] = None
+        self._complete   = True
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    @property
+    def chunk(self) -> int:
+        """The chunk being read."""
+        return self._chunk
+
+    @property
+    def complete(self) -> bool:
+        """False if any chunk read so far was never closed cleanly."""
+        return self._complete and getattr(self._source, "complete", True)
+
+    def _switch(self, chunk: int) -> None:
+        if self._source is not None:
+            self._complete = self._complete and getattr(self._source, "complete", True)
+            self._source.stop()
+        source = self._first if chunk == 0 and self._first is not None \
+            else self._open_chunk(self._paths[chunk])
+        self._first = None
+        source.start()
+        self._source = source
+        self._chunk = chunk
+        self.depth_scale = source.depth_scale
+
+    def start(self) -> None:
+        self._complete = True
+        self._switch(0)
+
+    def stop(self) -> None:
+        if self._source is not None:
+            self._source.stop()
+            self._source = None
+        self._chunk = -1
+
+    def streams(self) -> dict[str, StreamInfo]:
+        return self._source.streams() if self._source else {}
+
+    def extrinsics(self, from_stream: str, to_stream: str) -> Extrinsics:
+        return self._source.extrinsics(from_stream, to_stream)
+
+    def wait_for_frames(self, timeout_ms: int = 1000) -> Optional[FrameSet]:
+        while True:
+            try:
+                return self._source.wait_for_frames(timeout_ms)
+            except EndOfStream:
+                if self._chunk + 1 >= len(self._paths):
+                    raise
+                logger.debug("Continuing in %s", self._paths[self._chunk + 1])
+                self._switch(self._chunk + 1)
+
+    def position(self) -> Optional[int]:
+        inner = self._source.position() if self._source else None
+        return None if inner is None else self._chunk << CHUNK_SHIFT | inner
+
+    def seek(self, position: int) -> None:
+        chunk = min(position >> CHUNK_SHIFT, len(self._paths) - 1)
+        if chunk != self._chunk:
+            self._switch(chunk)
+        self._source.seek(position & _POSITION_MASK)
+
+
+def open_chunked(file_path: str,
+                 open_chunk: Callable[[str], Optional[FrameSource]]) -> Optional[FrameSource]:
+    """A source for the whole recording at *file_path*: *open_chunk*'s own
+    source if it was not split, else a ChunkedFrameSource over its chunks.
+    None if *open_chunk* cannot read the file here."""
+    paths = chunk_paths(file_path)
+    first = open_chunk(paths[0])
+    if first is None or len(paths) == 1:
+        return first
+    return ChunkedFrameSource(paths, open_chunk, first)
+
+
+# ---------------------------------------------------------------------- #
+# Index                                                                    #
+# ---------------------------------------------------------------------- #
+
+def concat_indexes(indexes: list[FrameIndex]) -> FrameIndex:
+    """The index of chunks with these *indexes*, in chunk order."""
+    if len(indexes) == 1:
+        return indexes[0]
+    streams = set.intersection(*(set(i.stream_timestamps_ms) for i in indexes))
+    return FrameIndex(
+        positions=np.concatenate([i.positions | np.int64(k) << CHUNK_SHIFT
+                                  for k, i in enumerate(indexes)]),
+        timestamps_ms=np.concatenate([i.timestamps_ms for i in indexes]),
+        frame_numbers=np.concatenate([i.frame_numbers for i in indexes]),
+        stream_timestamps_ms={s: np.concatenate([i.stream_timestamps_ms[s] for i in indexes])
+                              for s in streams},
+        stream_frame_numbers={s: np.concatenate([i.stream_frame_numbers[s] for i in indexes])
+                              for s in streams},
+    )
+
+
+def load_recording_index(file_path: str) -> Optional[FrameIndex]:
+    """The index of the whole recording at *file_path*, or None unless
+    every chunk has an up-to-date sidecar index."""
+    indexes = []
+    for path in chunk_paths(file_path):
+        index = load_index(path)
+        if index is None:
+            return None
+        indexes.append(index)
+    return concat_indexes(indexes)
+
+
+def recording_index(file_path: str, open_chunk: Callable[[str], Optional[FrameSource]],
+                    should_stop=lambda: False) -> Optional[FrameIndex]:
+    """Like load_recording_index(), but chunks without an index are read
+    and indexed first. None if a chunk cannot be read here or *should_stop*
+    turned true."""
+    indexes = []
+    for path in chunk_paths(file_path):
+        index = load_index(path)
+        if index is None:
+            source = open_chunk(path)
+            if source is None:
+                return None
+            source.start()
+            try:
+                index = build_index(source, should_stop)
+            finally:
+                source.stop()
+            if index is None:
+                return None
+            index.save(path)
+            logger.debug("Indexed %s: %d framesets, %.1f s", path, len(index),
+                        index.duration_ms / 1000.0)
+        indexes.append(index)
+    return concat_indexes(indexes)
@@ -0,0 +1,221 @@
+"""Vectorised z16 depth colorizer built on cached 64K-entry lookup tables.
+
+Every possible depth value maps straight to an RGB triple, so colorizing a
+frame is a single ``np.take`` into a preallocated output buffer. Tables are
+cached per (scheme, range) and only rebuilt when the range changes.
+
+Modes mirror rs.colorizer:
+    fixed range            — min_depth..max_depth (z16 units) across the palette
+    auto range             — range taken from each frame's valid pixels
+    histogram equalization — palette position follows the cumulative depth
+                             histogram (rs.colorizer's default look)
+Zero depth (no data) is always black.
+
+With bgr=True the tables hold BGR triples, so the output can be written
+straight into a Format_BGR888 preview buffer.
+"""
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from app.camera.frame_source import FrameSet
+
+try:
+    import pyrealsense2 as rs
+    REALSENSE_AVAILABLE = True
+except ImportError:
+    rs = None  # type: ignore
+    REALSENSE_AVAILABLE = False
+
+# Palette control points (position 0..1 → RGB), as in librealsense's colour maps.
+_SCHEMES: dict[str, list[tuple[float, tuple[int, int, int]]]] = {
+    "jet": [(0.00, (0, 0, 128)), (0.11, (0, 0, 255)), (0.36, (0, 255, 255)),
+            (0.62, (255, 255, 0)), (0.87, (255, 0, 0)), (1.00, (128, 0, 0))],
+    "classic": [(0.00, (30, 77, 203)), (0.25, (25, 60, 192)), (0.50, (45, 117, 220)),
+                (0.75, (204, 108, 191)), (1.00, (196, 57, 178))],
+    "white_to_black": [(0.0, (255, 255, 255)), (1.0, (0, 0, 0))],
+    "black_to_white": [(0.0, (0, 0, 0)), (1.0, (255, 255, 255))],
+    "bio": [(0.0, (0, 0, 255)), (0.25, (0, 255, 0)), (0.5, (255, 255, 0)),
+            (0.75, (255, 128, 0)), (1.0, (255, 0, 0))],
+    "cold": [(0.0, (0, 0, 0)), (0.33, (0, 0, 255)), (0.66, (0, 255, 255)),
+             (1.0, (255, 255, 255))],
+    "warm": [(0.0, (0, 0, 0)), (0.33, (255, 0, 0)), (0.66, (255, 255, 0)),
+             (1.0, (255, 255, 255))],
+    "hue": [(0.0, (255, 0, 0)), (0.17, (255, 255, 0)), (0.33, (0, 255, 0)),
+            (0.5, (0, 255, 255)), (0.67, (0, 0, 255)), (0.83, (255, 0, 255)),
+            (1.0, (255, 0, 0))],
+}
+
+SCHEMES = tuple(_SCHEMES)
+
+_LUT_SIZE = 65536
+
+
+@lru_cache(maxsize=None)
+def palette(scheme: str, size: int = 1024, bgr: bool = False) -> np.ndarray:
+    """Return a (size, 3) uint8 palette for *scheme* (RGB, or BGR if *bgr*)."""
+    points = _SCHEMES[scheme]
+    pos = np.array([p for p, _ in points])
+    rgb = np.array([c for _, c in points], dtype=np.float64)
+    x = np.linspace(0.0, 1.0, size)
+    out = np.empty((size, 3), dtype=np.uint8)
+    for ch in range(3):
+        out[:, 2 - ch if bgr else ch] = np.round(np.interp(x, pos, rgb[:, ch]))
+    return out
+
+
+@lru_cache(maxsize=32)
+def range_lut(scheme: str, min_depth: int, max_depth: int,
+              bgr: bool = False) -> np.ndarray:
+    """Return the (65536, 3) LUT mapping z16 values linearly over the palette."""
+    pal = palette(scheme, bgr=bgr)
+    values = np.arange(_LUT_SIZE, dtype=np.float64)
+    span = max(1, max_depth - min_depth)
+    idx = np.clip((values - min_depth) / span, 0.0, 1.0) * (len(pal) - 1)
+    lut = pal[idx.astype(np.intp)]
+    lut[0] = 0
+    lut.setflags(write=False)
+    return lut
+
+
+class DepthColorizer:
+    """Colorizes z16 depth arrays through a cached lookup table.
+
+    *min_depth*/*max_depth* are in z16 units (mm on D4xx cameras) and are
+    used when neither *auto_range* nor *equalize* is set. The returned
+    array is a reused buffer — copy it if it must outlive the next call.
+    """
+
+    def __init__(self, scheme: str = "jet", min_depth: int = 300,
+                 max_depth: int = 4000, auto_range: bool = False,
+                 equalize: bool = False, bgr: bool = False):
+        if scheme not in _SCHEMES:
+            raise ValueError(f"Unknown color scheme: {scheme}")
+        self.scheme     = scheme
+        self.min_depth  = min_depth
+        self.max_depth  = max_depth
+        self.auto_range = auto_range
+        self.equalize   = equalize
+        self.bgr        = bgr
+        self._out: Optional[np.ndarray] = None
+        self._index: Optional[np.ndarray] = None
+        self._eq_lut = np.empty((_LUT_SIZE, 3), dtype=np.uint8)
+        self._hist = np.empty(_LUT_SIZE, dtype=np.int64)
+        self._cdf = np.empty(_LUT_SIZE, dtype=np.int64)
+
+    def _buffer(self, shape: tuple) -> np.ndarray:
+        if self._out is None or self._out.shape[:2] != shape:
+            self._out = np.empty(shape + (3,), dtype=np.uint8)
+        return self._out
+
+    def _indices(self, depth: np.ndarray) -> np.ndarray:
+        # np.take converts uint16 indices to intp on every call; converting
+        # into a reused buffer instead saves a frame-sized copy per call.
+        if self._index is None or self._index.shape != depth.shape:
+            self._index = np.empty(depth.shape, dtype=np.intp)
+        np.copyto(self._index, depth)
+        return self._index
+
+    def _equalized_lut(self, index: np.ndarray) -> np.ndarray:
+        # np.bincount would allocate a fresh 64K histogram every frame
+        hist = self._hist
+        hist.fill(0)
+        np.add.at(hist, index.ravel(), 1)
+        hist[0] = 0
+        cdf = np.cumsum(hist, out=self._cdf)
+        total = int(cdf[-1])
+        pal = palette(self.scheme, bgr=self.bgr)
+        if total == 0:
+            self._eq_lut[:] = 0
+            return self._eq_lut
+        cdf *= len(pal) - 1
+        cdf //= total
+        np.take(pal, cdf, axis=0, out=self._eq_lut, mode="clip")
+        self._eq_lut[0] = 0
+        return self._eq_lut
+
+    def lut_for(self, depth: np.ndarray) -> np.ndarray:
+        """Return the LUT that colorize() would use for *depth*."""
+        return self._lut(depth, self._indices(depth))
+
+    def _lut(self, depth: np.ndarray, index: np.ndarray) -> np.ndarray:
+        if self.equalize:
+            return self._equalized_lut(index)
+        if self.auto_range:
+            valid = depth[depth > 0]
+            if valid.size:
+                return range_lut(self.scheme, int(valid.min()), int(valid.max()),
+                                 self.bgr)
+        return range_lut(self.scheme, self.min_depth, self.max_depth, self.bgr)
+
+    def colorize(self, depth: np.ndarray,
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Map *depth* (H x W uint16) to RGB/BGR, writing into *out* if given."""
+        index = self._indices(depth)
+        lut = self._lut(depth, index)
+        if out is None or not out.flags.c_contiguous:
+            # np.take buffers a strided *out* internally, so go through our
+            # own buffer and copy into the caller's panel.
+            buf = self._buffer(depth.shape)
+            np.take(lut, index, axis=0, out=buf, mode="clip")
+            if out is None:
+                return buf
+            np.copyto(out, buf)
+            return out
+        np.take(lut, index, axis=0, out=out, mode="clip")
+        return out
+
+    def colorize_frames(self, frames: FrameSet,
+                        out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        return None if frames.depth is None else self.colorize(frames.depth, out)
+
+
+class RealSenseColorizer:
+    """rs.colorizer behind the DepthColorizer interface.
+
+    Frames without an SDK depth frame (synthetic, replayed, pre-roll) fall
+    back to an equivalent DepthColorizer.
+    """
+
+    _SCHEME_IDS = {"jet": 0, "classic": 1, "white_to_black": 2,
+                   "black_to_white": 3, "bio": 4, "cold": 5, "warm": 6, "hue": 9}
+
+    def __init__(self, scheme: str = "jet", equalize: bool = True,
+                 bgr: bool = False):
+        self._fallback = DepthColorizer(scheme, equalize=equalize, bgr=bgr)
+        self._bgr = bgr
+        self._colorizer = rs.colorizer()
+        self._colorizer.set_option(rs.option.color_scheme, self._SCHEME_IDS[scheme])
+        self._colorizer.set_option(rs.option.histogram_equalization_enabled,
+                                   1 if equalize else 0)
+
+    def colorize(self, depth: np.ndarray,
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+        return self._fallback.colorize(depth, out)
+
+    def colorize_frames(self, frames: FrameSet,
+                        out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        if frames.depth is None:
+            return None
+        if frames.native is not None:
+            depth_frame = frames.native.get_depth_frame()
+            if depth_frame:
+                rgb = np.asarray(self._colorizer.colorize(depth_frame).get_data())
+                src = rgb[:, :, ::-1] if self._bgr else rgb
+                if out is None:
+                    return src
+                np.copyto(out, src)
+                return out
+        return self._fallback.colorize(frames.depth, out)
+
+
+COLORIZERS = ("numpy", "realsense")
+
+
+def make_colorizer(kind: str = "numpy", scheme: str = "jet", equalize: bool = True,
+                   bgr: bool = False):
+    """Return a colorizer of *kind*; "realsense" degrades to NumPy without the SDK."""
+    if kind == "realsense" and REALSENSE_AVAILABLE:
+        return RealSenseColorizer(scheme, equalize, bgr)
+    return DepthColorizer(scheme, equalize=equalize, bgr=bgr)
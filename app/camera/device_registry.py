@@ -0,0 +1,210 @@
+"""Long-lived registry of connected RealSense devices.
+
+Creating an rs.context and querying its devices costs hundreds of ms on
+Windows, and polling never tells anyone that a camera was unplugged. The
+registry keeps one context for the life of the application, reads each
+device's info and stream profiles once when it appears, and subscribes to
+the SDK's device-changed callback so the cache follows hotplug events.
+
+The callback runs on an SDK thread; the registry updates its cache under a
+lock and emits Qt signals, which reach UI slots queued on the GUI thread:
+
+    device_connected(DeviceInfo)
+    device_disconnected(str)     serial of the removed device
+
+Use device_registry() to get the shared instance.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyrealsense2 as rs
+    REALSENSE_AVAILABLE = True
+except ImportError:
+    rs = None  # type: ignore
+    REALSENSE_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class StreamProfile:
+    stream: str       # "color", "depth", "infrared"
+    width: int
+    height: int
+    fps: int
+    format: str       # e.g. "bgr8", "z16", "y8"
+
+
+@dataclass(frozen=True)
+class DeviceInfo:
+    name: str
+    serial: str
+    firmware: str
+    usb_type: str                       # e.g. "3.2"; "" if the device doesn't say
+    profiles: tuple[StreamProfile, ...]
+
+    @property
+    def is_usb3(self) -> bool:
+        return self.usb_type.startswith("3")
+
+    def describe(self) -> str:
+        text = f"{self.name} | Serial: {self.serial} | FW: {self.firmware}"
+        if self.usb_type:
+            text += f" | USB {self.usb_type}"
+        return text
+
+    def supports(self, stream: str, width: int, height: int, fps: int) -> bool:
+        """True if the device offers *stream* at width x height @ fps."""
+        return any(p.stream == stream and p.width == width
+                   and p.height == height and p.fps == fps
+                   for p in self.profiles)
+
+
+def _camera_info(dev, key) -> str:
+    return dev.get_info(key) if dev.supports(key) else ""
+
+
+def _read_device(dev) -> DeviceInfo:
+    """Read everything the app needs from *dev* in one go."""
+    profiles = set()
+    for sensor in dev.query_sensors():
+        for p in sensor.get_stream_profiles():
+            if not p.is_video_stream_profile():
+                continue
+            v = p.as_video_stream_profile()
+            profiles.add(StreamProfile(
+                stream=p.stream_type().name,
+                width=v.width(),
+                height=v.height(),
+                fps=p.fps(),
+                format=p.format().name,
+            ))
+    return DeviceInfo(
+        name=_camera_info(dev, rs.camera_info.name),
+        serial=_camera_info(dev, rs.camera_info.serial_number),
+        firmware=_camera_info(dev, rs.camera_info.firmware_version),
+        usb_type=_camera_info(dev, rs.camera_info.usb_type_descriptor),
+        profiles=tuple(sorted(profiles, key=lambda p: (p.stream, -p.width, -p.fps))),
+    )
+
+
+class DeviceRegistry(QObject):
+    device_connected    = pyqtSignal(object)   # DeviceInfo
+    device_disconnected = pyqtSignal(str)      # serial
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock    = threading.Lock()
+        self._ctx     = None
+        # serial → (DeviceInfo, rs.device); the handle is kept for was_removed()
+        self._devices: dict[str, tuple[DeviceInfo, object]] = {}
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle                                                            #
+    # ------------------------------------------------------------------ #
+
+    def start(self) -> None:
+        """Open the context, subscribe to hotplug events and enumerate once."""
+        if self._ctx is not None or not REALSENSE_AVAILABLE:
+            return
+        try:
+            self._ctx = rs.context()
+            self._ctx.set_devices_changed_callback(self._on_devices_changed)
+            self._add_devices(self._ctx.query_devices())
+        except Exception as exc:
+            logger.error("Error querying RealSense devices: %s", exc)
+
+    def refresh(self) -> None:
+        """Re-enumerate from scratch (e.g. after a missed event)."""
+        if self._ctx is None:
+            self.start()
+            return
+        try:
+            present = {_camera_info(dev, rs.camera_info.serial_number)
+                       for dev in self._ctx.query_devices()}
+        except Exception as exc:
+            logger.error("Error querying RealSense devices: %s", exc)
+            return
+        for serial in self.serials():
+            if serial not in present:
+                self._remove(serial)
+        self._add_devices(self._ctx.query_devices())
+
+    # ------------------------------------------------------------------ #
+    # Queries (served from the cache)                                     #
+    # ------------------------------------------------------------------ #
+
+    def devices(self) -> list[DeviceInfo]:
+        """Connected devices, sorted by serial."""
+        with self._lock:
+            return [self._devices[s][0] for s in sorted(self._devices)]
+
+    def serials(self) -> list[str]:
+        with self._lock:
+            return sorted(self._devices)
+
+    def get(self, serial: str) -> Optional[DeviceInfo]:
+        with self._lock:
+            entry = self._devices.get(serial)
+        return entry[0] if entry else None
+
+    def is_connected(self, serial: Optional[str] = None) -> bool:
+        """True if *serial* (or, without one, any device) is connected."""
+        with self._lock:
+            return serial in self._devices if serial else bool(self._devices)
+
+    # ------------------------------------------------------------------ #
+    # Hotplug                                                              #
+    # ------------------------------------------------------------------ #
+
+    def _on_devices_changed(self, event) -> None:
+        """SDK callback thread."""
+        try:
+            with self._lock:
+                removed = [serial for serial, (_, dev) in self._devices.items()
+                           if event.was_removed(dev)]
+            for serial in removed:
+                self._remove(serial)
+            self._add_devices(event.get_new_devices())
+        except Exception as exc:
+            logger.error("Error handling RealSense device change: %s", exc)
+
+    def _add_devices(self, device_list) -> None:
+        for dev in device_list:
+            try:
+                info = _read_device(dev)
+            except Exception as exc:
+                # Devices still booting can refuse queries; the next event
+                # or refresh() will pick them up.
+                logger.warning("Could not read RealSense device info: %s", exc)
+                continue
+            with self._lock:
+                known = info.serial in self._devices
+                self._devices[info.serial] = (info, dev)
+            if not known:
+                logger.info("Camera connected: %s", info.describe())
+                self.device_connected.emit(info)
+
+    def _remove(self, serial: str) -> None:
+        with self._lock:
+            entry = self._devices.pop(serial, None)
+        if entry is not None:
+            logger.warning("Camera disconnected: %s", serial)
+            self.device_disconnected.emit(serial)
+
+
+_registry: Optional[DeviceRegistry] = None
+
+
+def device_registry() -> DeviceRegistry:
+    """The application-wide registry, started on first use."""
+    global _registry
+    if _registry is None:
+        _registry = DeviceRegistry()
+        _registry.start()
+    return _registry
@@ -0,0 +1,117 @@
+"""Free-space forecast for running recordings, with an early stop before the disk fills.
+
+A bag whose disk fills up mid-write is never finalised and cannot be
+opened. DiskSpaceMonitor polls, every POLL_INTERVAL_S on its own thread,
+the size of the files being written and the free space of their volume
+(one stat() per file and one disk_usage() per poll, nothing per frame),
+and forecasts how long recording can continue:
+
+    remaining = (free - reserve) / rate
+
+*rate* starts as the rate the configured streams need and switches to the
+measured growth of the files once WARMUP_S of it has been seen. *reserve*
+is RESERVE_BYTES per file: room for the frames still queued in the
+recording worker and for the writer to finalise the file. When the
+forecast drops below STOP_MARGIN_S, space_low is emitted once so the
+recording can be stopped and finalised normally. Recordings split into
+chunks are followed from file to file (one more stat() per file).
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from app.utils.file_utils import build_chunk_path
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_S = 2.0
+WARMUP_S = 6.0
+# Per file: RecordingWorker's 90-frameset queue at 1280x720 is ~250 MB,
+# plus what the writer needs to close the file
+RESERVE_BYTES = 512 * 1024 * 1024
+STOP_MARGIN_S = 10.0
+
+
+@dataclass
+class DiskForecast:
+    free_bytes: int
+    written_bytes: int
+    bytes_per_second: float
+    remaining_seconds: float
+    measured: bool          # rate from file growth rather than the settings
+
+
+class DiskSpaceMonitor(QObject):
+    """Watches *file_paths* (all in *directory*) while they are recorded."""
+
+    forecast_updated = pyqtSignal(object)   # DiskForecast
+    space_low        = pyqtSignal(str)      # message
+    error_occurred   = pyqtSignal(str)
+
+    def __init__(self, directory: str, file_paths: list[str], expected_bps: float):
+        super().__init__()
+        self._directory    = directory
+        self._file_paths   = list(file_paths)
+        # Per recording: [current chunk, bytes in the chunks before it]
+        self._chunks       = [[0, 0] for _ in file_paths]
+        self._expected_bps = expected_bps
+        self._wake         = threading.Event()
+        self._running      = False
+        self._warned       = False
+
+    @pyqtSlot()
+    def run(self) -> None:
+        self._running = True
+        start = time.monotonic()
+        start_bytes: Optional[int] = None
+        while self._running:
+            try:
+                forecast = self._poll(start, start_bytes)
+            except OSError as exc:
+                logger.warning("Disk space check of %s failed: %s", self._directory, exc)
+                self.error_occurred.emit(str(exc))
+            else:
+                if start_bytes is None:
+                    start, start_bytes = time.monotonic(), forecast.written_bytes
+                self.forecast_updated.emit(forecast)
+                if forecast.remaining_seconds < STOP_MARGIN_S and not self._warned:
+                    self._warned = True
+                    free_mb = forecast.free_bytes / (1024 * 1024)
+                    logger.warning("Output disk almost full (%.0f MB free); stopping "
+                                   "the recording.", free_mb)
+                    self.space_low.emit(
+                        f"The output disk is almost full ({free_mb:.0f} MB free). "
+                        "The recording was stopped and saved before it could be damaged.")
+            self._wake.wait(POLL_INTERVAL_S)
+
+    def _poll(self, start: float, start_bytes: Optional[int]) -> DiskForecast:
+        written = 0
+        for path, chunk in zip(self._file_paths, self._chunks):
+            try:
+                size = os.stat(build_chunk_path(path, chunk[0])).st_size
+            except FileNotFoundError:
+                continue        # not opened yet: the writer waits for its first frame
+            # Once the next chunk exists this one is complete
+            while os.path.exists(build_chunk_path(path, chunk[0] + 1)):
+                chunk[0] += 1
+                chunk[1] += size
+                size = os.stat(build_chunk_path(path, chunk[0])).st_size
+            written += chunk[1] + size
+        free = shutil.disk_usage(self._directory).free
+
+        rate, measured = self._expected_bps, False
+        elapsed = time.monotonic() - start
+        if start_bytes is not None and elapsed >= WARMUP_S and written > start_bytes:
+            rate, measured = (written - start_bytes) / elapsed, True
+        usable = free - RESERVE_BYTES * len(self._file_paths)
+        remaining = usable / rate if rate > 0 else float("inf")
+        return DiskForecast(free, written, rate, remaining, measured)
+
+    def stop(self) -> None:
+        self._running = False
+        self._wake.set()
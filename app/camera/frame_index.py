@@ -0,0 +1,193 @@
+"""Sidecar frame index for recordings — seek by time or frame in O(log n).
+
+A .bag can only be read forwards, so without an index reaching minute 9
+of a take means decoding minutes 0-8. After a recording is finalised the
+IndexWorker reads it once and stores, next to it as ``<file>.idx.npz``:
+
+    positions       source position of every frameset (bag: playback ns
+                    from the start; .rvl: frameset number) — what
+                    FrameSource.seek() takes
+    timestamps_ms   frameset timestamps
+    frame_numbers   frameset frame numbers
+    <stream>_timestamps_ms / <stream>_frame_numbers
+                    the per-stream hardware clock, where recorded
+
+plus the recording's size and mtime, so an index whose recording has
+changed is ignored. Lookups are np.searchsorted over the sorted arrays.
+"""
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from app.camera.frame_source import EndOfStream, FrameSet, FrameSource
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX  = ".idx.npz"
+INDEX_VERSION = 1
+# After a seek, how many framesets to read forward looking for the target
+MAX_SEEK_SKIP = 8
+
+
+def index_path(file_path: str) -> str:
+    return file_path + INDEX_SUFFIX
+
+
+def _fingerprint(file_path: str) -> tuple[int, int]:
+    st = os.stat(file_path)
+    return st.st_size, st.st_mtime_ns
+
+
+@dataclass
+class FrameIndex:
+    positions: np.ndarray                 # int64
+    timestamps_ms: np.ndarray             # float64
+    frame_numbers: np.ndarray             # int64
+    stream_timestamps_ms: dict[str, np.ndarray] = field(default_factory=dict)
+    stream_frame_numbers: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @property
+    def duration_ms(self) -> float:
+        if len(self) < 2:
+            return 0.0
+        return float(self.timestamps_ms[-1] - self.timestamps_ms[0])
+
+    def find_time(self, offset_ms: float) -> int:
+        """Index of the last frameset at or before *offset_ms* from the start."""
+        if not len(self):
+            raise IndexError("empty frame index")
+        target = self.timestamps_ms[0] + offset_ms
+        i = int(np.searchsorted(self.timestamps_ms, target, side="right")) - 1
+        return max(0, min(i, len(self) - 1))
+
+    def find_frame_number(self, frame_number: int, stream: Optional[str] = None) -> int:
+        """Index of the frameset holding *frame_number* (of *stream*, if given),
+        or of the first frameset after it when that number was dropped."""
+        numbers = self.frame_numbers if stream is None else self.stream_frame_numbers[stream]
+        i = int(np.searchsorted(numbers, frame_number, side="left"))
+        return max(0, min(i, len(self) - 1))
+
+    # ------------------------------------------------------------------ #
+    # Persistence                                                          #
+    # ------------------------------------------------------------------ #
+
+    def save(self, file_path: str) -> str:
+        """Write the sidecar for recording *file_path*; returns its path."""
+        size, mtime = _fingerprint(file_path)
+        arrays = {
+            "version": np.int64(INDEX_VERSION),
+            "source_size": np.int64(size),
+            "source_mtime_ns": np.int64(mtime),
+            "positions": self.positions,
+            "timestamps_ms": self.timestamps_ms,
+            "frame_numbers": self.frame_numbers,
+        }
+        for name, values in self.stream_timestamps_ms.items():
+            arrays[f"{name}_timestamps_ms"] = values
+            arrays[f"{name}_frame_numbers"] = self.stream_frame_numbers[name]
+        path = index_path(file_path)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, path)
+        return path
+
+
+def load_index(file_path: str) -> Optional[FrameIndex]:
+    """The sidecar index of *file_path*, or None if missing or stale."""
+    path = index_path(file_path)
+    if not os.path.exists(path) or not os.path.exists(file_path):
+        return None
+    try:
+        with np.load(path) as data:
+            if int(data["version"]) != INDEX_VERSION:
+                return None
+            if (int(data["source_size"]), int(data["source_mtime_ns"])) != \
+                    _fingerprint(file_path):
+                logger.info("Frame index of %s is stale; ignoring it.", file_path)
+                return None
+            streams = [k[:-len("_timestamps_ms")] for k in data.files
+                       if k.endswith("_timestamps_ms") and k != "timestamps_ms"]
+            return FrameIndex(
+                positions=data["positions"],
+                timestamps_ms=data["timestamps_ms"],
+                frame_numbers=data["frame_numbers"],
+                stream_timestamps_ms={s: data[f"{s}_timestamps_ms"] for s in streams},
+                stream_frame_numbers={s: data[f"{s}_frame_numbers"] for s in streams},
+            )
+    except Exception as exc:
+        logger.warning("Could not read frame index %s: %s", path, exc)
+        return None
+
+
+# ---------------------------------------------------------------------- #
+# Building and seeking                                                     #
+# ---------------------------------------------------------------------- #
+
+def build_index(source: FrameSource, should_stop=lambda: False) -> Optional[FrameIndex]:
+    """Read *source* (started, at its beginning) to the end and index it.
+
+    Returns None if *should_stop* turned true before the end.
+    """
+    positions, times, numbers = [], [], []
+    stream_times: dict[str, list[float]] = {}
+    stream_numbers: dict[str, list[int]] = {}
+    while not should_stop():
+        try:
+            frames = source.wait_for_frames()
+        except EndOfStream:
+            break
+        if frames is None:
+            continue
+        positions.append(source.position())
+        times.append(frames.timestamp_ms)
+        numbers.append(frames.frame_number)
+        for name, (ts, number) in (frames.stream_clock or {}).items():
+            stream_times.setdefault(name, []).append(ts)
+            stream_numbers.setdefault(name, []).append(number)
+    else:
+        return None     # stopped before the end (no break)
+
+    # Streams missing from some framesets can't be indexed per frameset
+    complete = [s for s, v in stream_times.items() if len(v) == len(times)]
+    return FrameIndex(
+        positions=np.asarray(positions, dtype=np.int64),
+        timestamps_ms=np.asarray(times, dtype=np.float64),
+        frame_numbers=np.asarray(numbers, dtype=np.int64),
+        stream_timestamps_ms={s: np.asarray(stream_times[s], dtype=np.float64)
+                              for s in complete},
+        stream_frame_numbers={s: np.asarray(stream_numbers[s], dtype=np.int64)
+                              for s in complete},
+    )
+
+
+def seek_to(source: FrameSource, index: FrameIndex, i: int) -> Optional[FrameSet]:
+    """Seek *source* to frameset *i* of *index* and return that frameset.
+
+    Bag playback can land a frameset or two off the indexed position: if it
+    lands early, framesets are read forward to the indexed timestamp; if it
+    overshoots, the seek is retried from a few framesets earlier.
+    """
+    target = index.timestamps_ms[i]
+    frames = None
+    for back in (0, MAX_SEEK_SKIP // 2):
+        source.seek(int(index.positions[max(0, i - back)]))
+        for _ in range(MAX_SEEK_SKIP):
+            try:
+                frames = source.wait_for_frames()
+            except EndOfStream:
+                return None
+            if frames is None:
+                continue
+            if frames.timestamp_ms == target or (
+                    frames.timestamp_ms > target and (back or i == 0)):
+                return frames
+            if frames.timestamp_ms > target:
+                break           # overshot: retry from further back
+    logger.warning("Seek to frameset %d did not land on t=%.1f ms.", i, target)
+    return frames
@@ -0,0 +1,49 @@
+"""Single-slot "latest frame wins" hand-off from a camera worker to the UI.
+
+A queued frame_ready signal per frame lets frames pile up in the event
+queue whenever the UI thread stalls, so the preview plays catch-up with
+growing latency and memory. With a mailbox the worker overwrites the slot
+instead, and only notifies the UI when the slot goes from empty to full;
+the widget takes whatever is newest when it gets round to it. Preview
+latency is bounded by one frame and at most one notification is pending.
+"""
+import threading
+from typing import Optional
+
+from app.camera.frame_pool import PooledFrame
+
+
+class FrameMailbox:
+    """Holds at most one PooledFrame; put() releases any frame it replaces."""
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._frame: Optional[PooledFrame] = None
+        self.posted      = 0
+        self.overwritten = 0
+        self.taken       = 0
+
+    def put(self, frame: PooledFrame) -> bool:
+        """Store *frame*; True if the slot was empty (the reader must be told)."""
+        with self._lock:
+            old, self._frame = self._frame, frame
+            self.posted += 1
+            if old is not None:
+                self.overwritten += 1
+        if old is not None:
+            old.release()
+            return False
+        return True
+
+    def take(self) -> Optional[PooledFrame]:
+        """Remove and return the newest frame, or None if there is none."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+            if frame is not None:
+                self.taken += 1
+        return frame
+
+    def clear(self) -> None:
+        frame = self.take()
+        if frame is not None:
+            frame.release()
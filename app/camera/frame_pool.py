@@ -0,0 +1,87 @@
+"""Pool of preallocated preview buffers shared between a worker and the UI.
+
+Workers render the preview composite straight into a pooled BGR buffer and
+emit a PooledFrame whose QImage wraps that buffer (Format_BGR888, so the
+colour stream needs no channel flip). The widget releases the frame once it
+has been painted and replaced, returning the buffer for reuse. In steady
+state the composite needs no new pixel buffer per frame — only the small
+lease object and the QImage header that points into the pooled buffer.
+Decimation and depth alignment before it still allocate their
+preview-sized intermediates.
+
+If every buffer is still held by the UI, acquire() returns None and the
+worker skips that preview frame instead of queueing more work.
+"""
+import logging
+import threading
+from typing import Optional
+
+import numpy as np
+from PyQt6.QtGui import QImage
+
+logger = logging.getLogger(__name__)
+
+
+class PooledFrame:
+    """A loan of one pooled H x W x 3 BGR buffer and the QImage wrapping it.
+
+    The QImage does not own its pixels: it is only valid until release().
+    """
+
+    def __init__(self, pool: "FramePool", array: np.ndarray, generation: int):
+        self.array = array
+        h, w, _ = array.shape
+        self.image = QImage(array.data, w, h, array.strides[0],
+                            QImage.Format.Format_BGR888)
+        self._pool = pool
+        self._generation = generation
+        self._released = False
+
+    def release(self) -> None:
+        """Return the buffer to its pool (safe to call more than once)."""
+        if not self._released:
+            self._released = True
+            self._pool._give_back(self.array, self._generation)
+
+    def __del__(self):
+        # Frames dropped without release (e.g. an unconnected signal) must
+        # not starve the pool.
+        if not self._released:
+            self.release()
+
+
+class FramePool:
+    """Fixed set of *size* preview buffers of one shape.
+
+    acquire() is called from the worker thread, release() from the UI
+    thread. Requesting a new shape (the widget was resized) discards the
+    old buffers; frames still out on loan are dropped when released.
+    """
+
+    def __init__(self, size: int = 4):
+        self._size = size
+        self._lock = threading.Lock()
+        self._shape: Optional[tuple] = None
+        self._free: list[np.ndarray] = []
+        self._generation = 0
+
+    def acquire(self, height: int, width: int) -> Optional[PooledFrame]:
+        """Return a free frame of (height, width), or None if all are in use."""
+        shape = (height, width, 3)
+        with self._lock:
+            if shape != self._shape:
+                self._shape = shape
+                self._generation += 1
+                self._free = [np.empty(shape, dtype=np.uint8)
+                              for _ in range(self._size)]
+                logger.debug("Frame pool reallocated: %d x %s.", self._size, shape)
+            if not self._free:
+                return None
+            array = self._free.pop()
+            generation = self._generation
+        return PooledFrame(self, array, generation)
+
+    def _give_back(self, array: np.ndarray, generation: int) -> None:
+        with self._lock:
+            if generation == self._generation:
+                self._free.append(array)
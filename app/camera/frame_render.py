@@ -0,0 +1,106 @@
+"""Preview rendering shared by the camera workers.
+
+Turns a FrameSet into the composite image shown in CameraPreviewWidget:
+colour (left) + colorised depth (right), or colorised depth alone. The
+composite is BGR, matching the colour stream, and is written into a
+pooled buffer that the widget displays without further copies.
+"""
+from typing import Optional
+
+import numpy as np
+
+from app.camera.frame_pool import FramePool, PooledFrame
+from app.camera.frame_source import FrameSet
+
+
+def decimation_factor(width: int, height: int,
+                      target_width: int, target_height: int) -> int:
+    """Largest integer stride that keeps a width x height image at least as
+    large as it appears when aspect-fitted into the target; 1 when no
+    target is known."""
+    if target_width <= 0 or target_height <= 0:
+        return 1
+    return max(1, int(max(width / target_width, height / target_height)))
+
+
+def decimate(frames: FrameSet, factor: int) -> FrameSet:
+    """Return strided (zero-copy) views of every stream in *frames*.
+
+    The result no longer refers to the SDK frameset, so it is only used for
+    display — recordings always receive the full-resolution frames.
+    """
+    if factor <= 1:
+        return frames
+
+    def _view(arr):
+        return None if arr is None else arr[::factor, ::factor]
+
+    return FrameSet(
+        color=_view(frames.color),
+        depth=_view(frames.depth),
+        infrared=_view(frames.infrared),
+        timestamp_ms=frames.timestamp_ms,
+        frame_number=frames.frame_number,
+    )
+
+
+def colorize_depth(frames: FrameSet, colorizer) -> Optional[np.ndarray]:
+    """Return the depth of *frames* as an H x W x 3 image via *colorizer*
+    (a DepthColorizer or RealSenseColorizer)."""
+    return colorizer.colorize_frames(frames)
+
+
+def preview_shape(frames: FrameSet, include_color: bool) -> Optional[tuple[int, int]]:
+    """(height, width) of the composite compose_preview() builds for *frames*."""
+    panels = []
+    if include_color and frames.color is not None:
+        panels.append(frames.color.shape[:2])
+    if frames.depth is not None:
+        panels.append(frames.depth.shape[:2])
+    if not panels:
+        return None
+    return max(h for h, _ in panels), sum(w for _, w in panels)
+
+
+def compose_preview(frames: FrameSet, include_color: bool, colorizer,
+                    out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """Build the BGR preview composite for *frames*.
+
+    include_color=True  →  colour (left) + colorised depth (right)
+    include_color=False →  colorised depth only
+    Falls back to whichever stream is present; None if neither is.
+
+    Each panel is written straight into *out* (preview_shape() x 3, uint8)
+    when given, otherwise into a new array. *colorizer* must produce BGR.
+    """
+    shape = preview_shape(frames, include_color)
+    if shape is None:
+        return None
+    if out is None:
+        out = np.empty(shape + (3,), dtype=np.uint8)
+    x = 0
+    if include_color and frames.color is not None:
+        h, w = frames.color.shape[:2]
+        np.copyto(out[:h, :w], frames.color)
+        x = w
+    if frames.depth is not None:
+        h, w = frames.depth.shape
+        colorizer.colorize_frames(frames, out[:h, x:x + w])
+    return out
+
+
+def render_preview(frames: FrameSet, include_color: bool, colorizer,
+                   pool: FramePool) -> Optional[PooledFrame]:
+    """Compose *frames* into a buffer from *pool*.
+
+    Returns None when there is nothing to show or every pooled buffer is
+    still held by the UI (the frame is skipped).
+    """
+    shape = preview_shape(frames, include_color)
+    if shape is None:
+        return None
+    frame = pool.acquire(*shape)
+    if frame is None:
+        return None
+    compose_preview(frames, include_color, colorizer, frame.array)
+    return frame
@@ -0,0 +1,536 @@
+"""Frame sources — pluggable producers of colour/depth/IR framesets.
+
+The camera workers pull frames from a FrameSource instead of building an
+``rs.pipeline()`` themselves, so the same processing code can be driven by:
+
+    RealSenseFrameSource  — a live device (or any rs.config)
+    BagFileFrameSource    — a recorded .bag file, driven as fast as requested
+    SyntheticFrameSource  — generated moving depth patterns, no SDK required
+    ReplayFrameSource     — an in-memory / .npz capture replayed at its timestamps
+
+Every source hands out FrameSet objects holding plain NumPy arrays, so the
+colorize / align / QImage path can be profiled headlessly on build machines.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyrealsense2 as rs
+    REALSENSE_AVAILABLE = True
+except ImportError:
+    rs = None  # type: ignore
+    REALSENSE_AVAILABLE = False
+
+
+class EndOfStream(RuntimeError):
+    """Raised by finite sources (bag files, replays) once every frame was read,
+    and by live sources whose device stopped delivering frames."""
+
+
+@dataclass
+class FrameSet:
+    """One synchronised set of frames.
+
+    Arrays may be zero-copy views into SDK memory; they stay valid for as long
+    as *native* (the underlying rs.composite_frame, if any) is referenced.
+    """
+    color: Optional[np.ndarray] = None      # H x W x 3 uint8, BGR
+    depth: Optional[np.ndarray] = None      # H x W uint16, z16 depth units
+    infrared: Optional[np.ndarray] = None   # H x W uint8
+    timestamp_ms: float = 0.0
+    frame_number: int = 0
+    native: Any = None
+    # Per-stream (hardware timestamp ms, frame counter) when the source
+    # knows them; otherwise every stream shares timestamp_ms/frame_number.
+    stream_clock: Optional[dict[str, tuple[float, int]]] = None
+
+
+@dataclass
+class Intrinsics:
+    """Pinhole intrinsics of one stream (Brown-Conrady distortion)."""
+    width: int
+    height: int
+    fx: float
+    fy: float
+    ppx: float
+    ppy: float
+    coeffs: tuple = (0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+@dataclass
+class Extrinsics:
+    """Rigid transform between two streams' coordinate systems.
+
+    *rotation* is column-major (as reported by librealsense); *translation*
+    is in metres.
+    """
+    rotation: tuple = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0)
+    translation: tuple = (0.0, 0.0, 0.0)
+
+
+@dataclass
+class StreamInfo:
+    """Resolution, rate and intrinsics of one stream delivered by a source."""
+    name: str                # "color" | "depth" | "infrared"
+    width: int
+    height: int
+    fps: int
+    intrinsics: Intrinsics
+
+
+class FrameSource:
+    """Base class for everything the camera workers can pull frames from."""
+
+    #: Metres per z16 depth unit.
+    depth_scale: float = 0.001
+
+    def start(self) -> None:
+        pass
+
+    def streams(self) -> dict[str, StreamInfo]:
+        """Return the active streams keyed by name; valid once started."""
+        return {}
+
+    def extrinsics(self, from_stream: str, to_stream: str) -> Extrinsics:
+        """Return the transform from one stream's 3D space to another's.
+
+        Synthetic and replayed depth already shares the colour camera's
+        coordinate system, hence the identity default.
+        """
+        return Extrinsics()
+
+    def stop(self) -> None:
+        pass
+
+    def wait_for_frames(self, timeout_ms: int = 1000) -> Optional[FrameSet]:
+        """Return the next frameset, or None on timeout.
+
+        Raises EndOfStream when a finite source has been exhausted or a
+        live device is lost.
+        """
+        raise NotImplementedError
+
+    # Seekable (file-backed) sources override the two methods below.
+
+    def position(self) -> Optional[int]:
+        """Opaque position of the last frameset returned, for seek().
+
+        None for live sources. Positions are what frame_index stores.
+        """
+        return None
+
+    def seek(self, position: int) -> None:
+        """Make the next wait_for_frames() return the frameset at *position*.
+
+        File-backed sources may land a frameset or two early; frame_index
+        .seek_to() reads forward to the exact frameset.
+        """
+        raise NotImplementedError(f"{type(self).__name__} is not seekable")
+
+
+def depth_extrinsics(source: FrameSource) -> dict[str, Extrinsics]:
+    """Depth → colour and depth → infrared transforms of a started *source*,
+    keyed by the target stream; pairs the source cannot provide are left out.
+    Writers store them so recordings keep the camera's calibration."""
+    streams = source.streams()
+    result: dict[str, Extrinsics] = {}
+    if "depth" not in streams:
+        return result
+    for name in ("color", "infrared"):
+        if name not in streams:
+            continue
+        try:
+            result[name] = source.extrinsics("depth", name)
+        except RuntimeError as exc:
+            logger.warning("No depth → %s extrinsics: %s", name, exc)
+    return result
+
+
+# ---------------------------------------------------------------------- #
+# RealSense-backed sources                                                 #
+# ---------------------------------------------------------------------- #
+
+def _to_frameset(frames: "rs.composite_frame") -> FrameSet:
+    color_frame = frames.get_color_frame()
+    depth_frame = frames.get_depth_frame()
+    ir_frame    = frames.get_infrared_frame(1)
+    clock = {name: (f.get_timestamp(), f.get_frame_number())
+             for name, f in (("color", color_frame), ("depth", depth_frame),
+                             ("infrared", ir_frame)) if f}
+    return FrameSet(
+        color=np.asanyarray(color_frame.get_data()) if color_frame else None,
+        depth=np.asanyarray(depth_frame.get_data()) if depth_frame else None,
+        infrared=np.asanyarray(ir_frame.get_data()) if ir_frame else None,
+        timestamp_ms=frames.get_timestamp(),
+        frame_number=frames.get_frame_number(),
+        native=frames,
+        stream_clock=clock,
+    )
+
+
+class RealSenseFrameSource(FrameSource):
+    """Wraps an ``rs.pipeline`` started with the given ``rs.config``.
+
+    A timeout returns None; after LOST_AFTER_MS without a single frameset
+    the device is taken to be gone (unplugged, USB reset) and EndOfStream
+    is raised, so the worker reading it can end.
+    """
+
+    LOST_AFTER_MS = 5000
+
+    def __init__(self, config: "rs.config"):
+        if not REALSENSE_AVAILABLE:
+            raise RuntimeError("pyrealsense2 is not installed.")
+        self._config   = config
+        self._pipeline = rs.pipeline()
+        self.profile   = None
+        self._waited_ms = 0
+
+    def start(self) -> None:
+        self.profile = self._pipeline.start(self._config)
+        self._waited_ms = 0
+        try:
+            depth_sensor = self.profile.get_device().first_depth_sensor()
+            self.depth_scale = depth_sensor.get_depth_scale()
+        except RuntimeError:
+            pass
+
+    def stop(self) -> None:
+        try:
+            self._pipeline.stop()
+        except Exception:
+            pass
+
+    def streams(self) -> dict[str, StreamInfo]:
+        if self.profile is None:
+            return {}
+        names = {rs.stream.color: "color", rs.stream.depth: "depth",
+                 rs.stream.infrared: "infrared"}
+        result: dict[str, StreamInfo] = {}
+        for sp in self.profile.get_streams():
+            name = names.get(sp.stream_type())
+            if name is None or name in result:
+                continue
+            vsp = sp.as_video_stream_profile()
+            intr = vsp.get_intrinsics()
+            result[name] = StreamInfo(
+                name=name, width=intr.width, height=intr.height, fps=sp.fps(),
+                intrinsics=Intrinsics(intr.width, intr.height, intr.fx, intr.fy,
+                                      intr.ppx, intr.ppy, tuple(intr.coeffs)),
+            )
+        return result
+
+    def extrinsics(self, from_stream: str, to_stream: str) -> Extrinsics:
+        src = self.profile.get_stream(getattr(rs.stream, from_stream))
+        dst = self.profile.get_stream(getattr(rs.stream, to_stream))
+        extr = src.get_extrinsics_to(dst)
+        return Extrinsics(tuple(extr.rotation), tuple(extr.translation))
+
+    def wait_for_frames(self, timeout_ms: int = 1000) -> Optional[FrameSet]:
+        try:
+            frames = self._pipeline.wait_for_frames(timeout_ms=timeout_ms)
+        except RuntimeError as exc:
+            self._waited_ms += timeout_ms
+            if self._waited_ms >= self.LOST_AFTER_MS:
+                raise EndOfStream(f"No frames for {self._waited_ms / 1000:.0f} s; "
+                                  f"device lost ({exc})") from exc
+            return None
+        self._waited_ms = 0
+        return _to_frameset(frames)
+
+
+class BagFileFrameSource(RealSenseFrameSource):
+    """Reads a .bag file with real-time playback disabled.
+
+    The caller drives the frame rate; running out of frames raises EndOfStream.
+    """
+
+    def __init__(self, file_path: str):
+        config = rs.config() if REALSENSE_AVAILABLE else None
+        if config is not None:
+            config.enable_device_from_file(file_path, repeat_playback=False)
+        super().__init__(config)
+        self._file_path = file_path
+
+    def start(self) -> None:
+        super().start()
+        self._playback = self.profile.get_device().as_playback()
+        self._playback.set_real_time(False)
+
+    def wait_for_frames(self, timeout_ms: int = 2000) -> Optional[FrameSet]:
+        try:
+            frames = self._pipeline.wait_for_frames(timeout_ms=timeout_ms)
+        except RuntimeError as exc:
+            raise EndOfStream(str(exc)) from exc
+        return _to_frameset(frames)
+
+    def duration_ns(self) -> int:
+        return int(self._playback.get_duration().total_seconds() * 1e9)
+
+    def position(self) -> Optional[int]:
+        """Playback position in ns from the start of the bag."""
+        return int(self._playback.get_position())
+
+    def seek(self, position: int) -> None:
+        # Once the end of the bag is reached the playback device stops and
+        # will not deliver frames again until the pipeline is restarted.
+        if self._playback.current_status() == rs.playback_status.stopped:
+            self._pipeline.stop()
+            self.start()
+        self._playback.seek(timedelta(microseconds=position / 1000.0))
+
+
+# ---------------------------------------------------------------------- #
+# Device-free sources                                                      #
+# ---------------------------------------------------------------------- #
+
+class _Pacer:
+    """Sleeps so that successive frames are released at a fixed period."""
+
+    def __init__(self, fps: float, real_time: bool):
+        self._period    = 1.0 / fps if fps > 0 else 0.0
+        self._real_time = real_time
+        self._next      = 0.0
+
+    def reset(self) -> None:
+        self._next = time.monotonic()
+
+    def wait(self, periods: int = 1, timeout_ms: int = 1000) -> bool:
+        """Advance by *periods*; return False if that would exceed the timeout."""
+        self._next += self._period * periods
+        if not self._real_time:
+            return True
+        delay = self._next - time.monotonic()
+        if delay > timeout_ms / 1000.0:
+            self._next -= self._period * periods
+            time.sleep(timeout_ms / 1000.0)
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+
+class SyntheticFrameSource(FrameSource):
+    """Generates colour, depth and IR frames without any camera attached.
+
+    Depth is a tilted background plane with a sphere that orbits the frame,
+    so colorizer and alignment code see realistic gradients and edges.
+    Frames can be dropped deliberately — every *drop_every*-th frame and/or
+    with probability *drop_rate* — which shows up as gaps in frame_number
+    and timestamp_ms exactly like a USB hiccup on the real device.
+
+    *real_time* paces delivery at *fps*; disable it for throughput benchmarks.
+    *num_frames* (frames generated, including dropped ones) makes the source
+    finite, after which it raises EndOfStream.
+    """
+
+    def __init__(self, width: int = 1280, height: int = 720, fps: int = 30,
+                 num_frames: Optional[int] = None, real_time: bool = True,
+                 drop_every: int = 0, drop_rate: float = 0.0,
+                 seed: int = 0):
+        self._width      = width
+        self._height     = height
+        self._fps        = fps
+        self._num_frames = num_frames
+        self._drop_every = drop_every
+        self._drop_rate  = drop_rate
+        self._rng        = np.random.default_rng(seed)
+        self._pacer      = _Pacer(fps, real_time)
+        self._index      = 0
+
+        # Static parts of the scene are computed once.
+        yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+        self._xx = xx
+        self._yy = yy
+        self._plane = (1500.0 + 1500.0 * yy / max(1, height - 1)).astype(np.float32)
+        self._color_base = np.empty((height, width, 3), dtype=np.uint8)
+        self._color_base[:, :, 0] = (255 * xx / max(1, width - 1)).astype(np.uint8)
+        self._color_base[:, :, 1] = (255 * yy / max(1, height - 1)).astype(np.uint8)
+        self._color_base[:, :, 2] = 96
+        self._radius = min(width, height) / 5.0
+
+    def start(self) -> None:
+        self._index = 0
+        self._pacer.reset()
+
+    def streams(self) -> dict[str, StreamInfo]:
+        w, h = self._width, self._height
+        intr = Intrinsics(w, h, fx=0.7 * w, fy=0.7 * w, ppx=w / 2.0, ppy=h / 2.0)
+        return {name: StreamInfo(name, w, h, self._fps, intr)
+                for name in ("color", "depth", "infrared")}
+
+    def wait_for_frames(self, timeout_ms: int = 1000) -> Optional[FrameSet]:
+        periods = 1
+        while self._is_dropped(self._index + periods - 1):
+            periods += 1
+        if self._num_frames is not None and self._index + periods > self._num_frames:
+            raise EndOfStream("synthetic source exhausted")
+        if not self._pacer.wait(periods, timeout_ms):
+            return None
+        self._index += periods
+        return self.generate(self._index - 1)
+
+    def _is_dropped(self, index: int) -> bool:
+        if index == 0:
+            return False
+        if self._drop_every and index % self._drop_every == 0:
+            return True
+        return self._drop_rate > 0 and self._rng.random() < self._drop_rate
+
+    def generate(self, index: int) -> FrameSet:
+        """Render frame *index* of the scene (independent of pacing and drops)."""
+        t = index / float(self._fps)
+        cx = self._width  * (0.5 + 0.3 * np.cos(t))
+        cy = self._height * (0.5 + 0.3 * np.sin(1.3 * t))
+        r2 = (self._xx - cx) ** 2 + (self._yy - cy) ** 2
+        inside = r2 < self._radius ** 2
+
+        depth_f = self._plane.copy()
+        bulge = np.sqrt(np.maximum(self._radius ** 2 - r2, 0.0))
+        depth_f[inside] = 900.0 - bulge[inside]
+        depth = depth_f.astype(np.uint16)
+        depth[:, : self._width // 40] = 0          # invalid band, as on a real D4xx
+
+        color = self._color_base.copy()
+        color[inside] = (40, 40, 220)
+
+        infrared = (255 - np.minimum(depth_f, 3000.0) * (255.0 / 3000.0)).astype(np.uint8)
+
+        return FrameSet(
+            color=color,
+            depth=depth,
+            infrared=infrared,
+            timestamp_ms=1000.0 * t,
+            frame_number=index + 1,
+        )
+
+
+class ReplayFrameSource(FrameSource):
+    """Replays a captured sequence of framesets at their recorded timestamps.
+
+    Use save_capture() to snapshot frames from any source (e.g. a real
+    camera) into a .npz file, and ReplayFrameSource.from_npz() to play them
+    back as a deterministic regression input.
+    """
+
+    def __init__(self, frames: Sequence[FrameSet], loop: bool = False,
+                 real_time: bool = True):
+        if not frames:
+            raise ValueError("ReplayFrameSource needs at least one frame.")
+        self._frames    = list(frames)
+        self._loop      = loop
+        self._real_time = real_time
+        self._index     = 0
+        self._t0        = 0.0
+        self._offset_ms = 0.0
+
+    @classmethod
+    def from_npz(cls, path: str, **kwargs) -> "ReplayFrameSource":
+        data = np.load(path)
+        frames = []
+        for i in range(len(data["timestamp_ms"])):
+            frames.append(FrameSet(
+                color=data["color"][i] if "color" in data else None,
+                depth=data["depth"][i] if "depth" in data else None,
+                infrared=data["infrared"][i] if "infrared" in data else None,
+                timestamp_ms=float(data["timestamp_ms"][i]),
+                frame_number=int(data["frame_number"][i]),
+            ))
+        return cls(frames, **kwargs)
+
+    def start(self) -> None:
+        self._index     = 0
+        self._offset_ms = 0.0
+        self._t0        = time.monotonic()
+
+    def wait_for_frames(self, timeout_ms: int = 1000) -> Optional[FrameSet]:
+        if self._index >= len(self._frames):
+            if not self._loop:
+                raise EndOfStream("replay exhausted")
+            last = self._frames[-1].timestamp_ms - self._frames[0].timestamp_ms
+            self._offset_ms += last + self._nominal_period_ms()
+            self._index = 0
+
+        frames = self._frames[self._index]
+        if self._real_time:
+            due = self._t0 + (frames.timestamp_ms - self._frames[0].timestamp_ms
+                              + self._offset_ms) / 1000.0
+            delay = due - time.monotonic()
+            if delay > timeout_ms / 1000.0:
+                time.sleep(timeout_ms / 1000.0)
+                return None
+            if delay > 0:
+                time.sleep(delay)
+        self._index += 1
+        return frames
+
+    def position(self) -> Optional[int]:
+        return self._index - 1 if self._index else None
+
+    def seek(self, position: int) -> None:
+        self._index = max(0, min(position, len(self._frames)))
+        if self._index < len(self._frames):
+            # Re-anchor the real-time clock so playback resumes from here
+            elapsed_ms = (self._frames[self._index].timestamp_ms
+                          - self._frames[0].timestamp_ms + self._offset_ms)
+            self._t0 = time.monotonic() - elapsed_ms / 1000.0
+
+    def streams(self) -> dict[str, StreamInfo]:
+        first = self._frames[0]
+        period = self._nominal_period_ms()
+        fps = int(round(1000.0 / period)) if period > 0 else 30
+        result: dict[str, StreamInfo] = {}
+        for name in ("color", "depth", "infrared"):
+            arr = getattr(first, name)
+            if arr is None:
+                continue
+            h, w = arr.shape[:2]
+            intr = Intrinsics(w, h, fx=0.7 * w, fy=0.7 * w, ppx=w / 2.0, ppy=h / 2.0)
+            result[name] = StreamInfo(name, w, h, fps, intr)
+        return result
+
+    def _nominal_period_ms(self) -> float:
+        if len(self._frames) < 2:
+            return 0.0
+        span = self._frames[-1].timestamp_ms - self._frames[0].timestamp_ms
+        return span / (len(self._frames) - 1)
+
+
+def save_capture(source: FrameSource, path: str, num_frames: int) -> None:
+    """Copy *num_frames* framesets from *source* into a .npz file for replay."""
+    captured: list[FrameSet] = []
+    source.start()
+    try:
+        while len(captured) < num_frames:
+            try:
+                frames = source.wait_for_frames()
+            except EndOfStream:
+                break
+            if frames is None:
+                continue
+            captured.append(FrameSet(
+                color=None if frames.color is None else frames.color.copy(),
+                depth=None if frames.depth is None else frames.depth.copy(),
+                infrared=None if frames.infrared is None else frames.infrared.copy(),
+                timestamp_ms=frames.timestamp_ms,
+                frame_number=frames.frame_number,
+            ))
+    finally:
+        source.stop()
+
+    arrays = {
+        "timestamp_ms": np.array([f.timestamp_ms for f in captured]),
+        "frame_number": np.array([f.frame_number for f in captured]),
+    }
+    for name in ("color", "depth", "infrared"):
+        if captured and all(getattr(f, name) is not None for f in captured):
+            arrays[name] = np.stack([getattr(f, name) for f in captured])
+    np.savez_compressed(path, **arrays)
+    logger.info("Saved %d framesets to %s", len(captured), path)
@@ -0,0 +1,102 @@
+"""Background indexer — writes the sidecar frame index of finished recordings.
+
+A recording split into chunks is enqueued by its first file; each chunk
+gets its own index and index_ready names the first file.
+"""
+import logging
+import queue
+from typing import Optional
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from app.camera.chunked_recording import load_recording_index, recording_index
+from app.camera.frame_source import BagFileFrameSource, FrameSource, REALSENSE_AVAILABLE
+from app.camera.rvl_file import RvlFileFrameSource
+
+logger = logging.getLogger(__name__)
+
+
+def open_for_indexing(file_path: str) -> Optional[FrameSource]:
+    """A source that reads *file_path* as cheaply as indexing allows."""
+    if file_path.lower().endswith(".rvl"):
+        return RvlFileFrameSource(file_path, decode=False)
+    if REALSENSE_AVAILABLE:
+        return BagFileFrameSource(file_path)
+    return None
+
+
+class IndexWorker(QObject):
+    """Indexes queued recordings one at a time on its own QThread.
+
+    Recordings that already have an up-to-date index are skipped, so
+    enqueueing is always safe. Use frame_indexer() for the shared instance.
+    """
+
+    index_ready    = pyqtSignal(str)        # recording file path
+    error_occurred = pyqtSignal(str, str)   # recording file path, message
+
+    def __init__(self):
+        super().__init__()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._running = False
+
+    def enqueue(self, file_path: str) -> None:
+        """Index *file_path* in the background (thread-safe)."""
+        self._queue.put(file_path)
+
+    @pyqtSlot()
+    def run(self) -> None:
+        self._running = True
+        while self._running:
+            try:
+                file_path = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if load_recording_index(file_path) is not None:
+                continue
+            try:
+                self._index(file_path)
+            except Exception as exc:
+                logger.error("Indexing %s failed: %s", file_path, exc)
+                self.error_occurred.emit(file_path, str(exc))
+
+    def _index(self, file_path: str) -> None:
+        if not file_path.lower().endswith(".rvl") and not REALSENSE_AVAILABLE:
+            logger.info("Not indexing %s: pyrealsense2 is not installed.", file_path)
+            return
+        index = recording_index(file_path, open_for_indexing,
+                                should_stop=lambda: not self._running)
+        if index is None:
+            return
+        logger.info("Indexed %s: %d framesets, %.1f s", file_path, len(index),
+                    index.duration_ms / 1000.0)
+        self.index_ready.emit(file_path)
+
+    def stop(self) -> None:
+        self._running = False
+
+
+_indexer: Optional[IndexWorker] = None
+_indexer_thread: Optional[QThread] = None
+
+
+def frame_indexer() -> IndexWorker:
+    """The application-wide indexer, started on first use."""
+    global _indexer, _indexer_thread
+    if _indexer is None:
+        _indexer = IndexWorker()
+        _indexer_thread = QThread()
+        _indexer.moveToThread(_indexer_thread)
+        _indexer_thread.started.connect(_indexer.run)
+        _indexer_thread.start()
+    return _indexer
+
+
+def stop_frame_indexer() -> None:
+    """Stop the shared indexer (an index in progress is abandoned)."""
+    global _indexer, _indexer_thread
+    if _indexer is not None:
+        _indexer.stop()
+        _indexer_thread.quit()
+        _indexer_thread.wait(5000)
+    _indexer = None
+    _indexer_thread = None
@@ -0,0 +1,285 @@
+"""Point clouds from recorded depth, written as binary PLY.
+
+Deprojection uses the same idea as reprojection.py. The viewing ray
+K⁻¹·(u, v, 1) of every depth pixel is computed once per stream profile,
+with the depth scale folded in, so a frame only costs
+
+    X, Y, Z = z·ray            (metres, depth camera coordinates)
+
+over its non-zero pixels instead of a call into rs.pointcloud. Colour is
+sampled from the colour frame: each point is moved into the colour camera
+with the depth→colour extrinsics, projected with the colour intrinsics and
+given the nearest colour pixel (black if it falls outside the image). When
+depth already lies on the colour grid (synthetic sources, recordings
+aligned at capture) the colour pixel is looked up directly.
+
+Lens distortion is ignored, as in reprojection.py.
+
+export_point_clouds() writes one PLY per selected frameset, named after
+its position in the frame index (frame_000123.ply) with the frameset's
+timestamp in a header comment. The selection is split into contiguous
+blocks that are decoded and converted in worker processes.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Optional
+
+import numpy as np
+
+from app.camera.chunked_recording import open_chunked, recording_index
+from app.camera.frame_index import MAX_SEEK_SKIP, FrameIndex, seek_to
+from app.camera.frame_source import (
+    BagFileFrameSource, EndOfStream, Extrinsics, FrameSet, FrameSource, Intrinsics,
+    REALSENSE_AVAILABLE,
+)
+from app.camera.reprojection import DepthReprojector
+from app.camera.rvl_file import RvlFileFrameSource
+
+logger = logging.getLogger(__name__)
+
+PLY_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("z", "<f4"),
+                      ("red", "u1"), ("green", "u1"), ("blue", "u1")])
+# Blocks handed out per worker process, so early finishers pick up more work
+BLOCKS_PER_WORKER = 4
+
+
+class PointCloudMaker:
+    """Turns the depth (and colour) of framesets into PLY_DTYPE point arrays."""
+
+    def __init__(self, depth_intr: Intrinsics, depth_scale: float,
+                 color_intr: Optional[Intrinsics] = None,
+                 extr: Optional[Extrinsics] = None):
+        extr = extr or Extrinsics()
+        h, w = depth_intr.height, depth_intr.width
+        self.shape = (h, w)
+        self._depth_scale = depth_scale
+
+        xn = (np.arange(w, dtype=np.float64) - depth_intr.ppx) / depth_intr.fx
+        yn = (np.arange(h, dtype=np.float64) - depth_intr.ppy) / depth_intr.fy
+        xn, yn = np.meshgrid(xn, yn)
+        # Flat tables with the depth scale folded in: X = z16 · ray_x.
+        self._ray_x = (xn * depth_scale).astype(np.float32).ravel()
+        self._ray_y = (yn * depth_scale).astype(np.float32).ravel()
+
+        self._color_intr = color_intr
+        self._direct = (color_intr is None
+                        or DepthReprojector.is_identity(depth_intr, color_intr, extr))
+        if not self._direct:
+            rot = np.asarray(extr.rotation, dtype=np.float64).reshape(3, 3).T
+            self._cray = [((rot[r, 0] * xn + rot[r, 1] * yn + rot[r, 2]) * depth_scale)
+                          .astype(np.float32).ravel() for r in range(3)]
+            self._t = tuple(float(t) for t in extr.translation)
+        self._spare: Optional[np.ndarray] = None
+
+    @classmethod
+    def for_source(cls, source: FrameSource) -> "PointCloudMaker":
+        """A maker for the streams of a started *source*."""
+        streams = source.streams()
+        if "depth" not in streams:
+            raise ValueError("The recording has no depth stream.")
+        color = streams.get("color")
+        extr = None
+        if color:
+            try:
+                extr = source.extrinsics("depth", "color")
+            except RuntimeError as exc:
+                logger.warning("No depth → colour extrinsics (%s); assuming the "
+                               "streams are aligned, colours may be offset.", exc)
+                extr = Extrinsics()
+        return cls(streams["depth"].intrinsics, source.depth_scale,
+                   color.intrinsics if color else None, extr)
+
+    def points(self, frames: FrameSet) -> np.ndarray:
+        """The valid (non-zero depth) points of *frames* as a PLY_DTYPE array."""
+        depth = frames.depth
+        if depth is None:
+            return np.empty(0, dtype=PLY_DTYPE)
+        if depth.shape != self.shape:
+            raise ValueError(f"Depth frame is {depth.shape[1]}x{depth.shape[0]}, "
+                             f"intrinsics are {self.shape[1]}x{self.shape[0]}.")
+        flat = depth.ravel()
+        idx = np.flatnonzero(flat)
+        z = flat[idx].astype(np.float32)
+
+        out = np.empty(len(idx), dtype=PLY_DTYPE)
+        out["x"] = z * self._ray_x[idx]
+        out["y"] = z * self._ray_y[idx]
+        out["z"] = z * np.float32(self._depth_scale)
+
+        color = frames.color
+        cidx = None if color is None else self._color_index(color.shape[:2], idx, z)
+        if cidx is None:
+            out["red"] = out["green"] = out["blue"] = 0
+            return out
+        # One channel at a time: gathering 3-byte pixels is several times slower.
+        pixels = color.reshape(-1, 3)
+        spare = self._spare_for(len(pixels))
+        for name, channel in (("blue", 0), ("green", 1), ("red", 2)):
+            spare[:-1] = pixels[:, channel]
+            out[name] = spare[cidx]
+        return out
+
+    def _spare_for(self, size: int) -> np.ndarray:
+        """A reused channel buffer with a black spare pixel past the end."""
+        if self._spare is None or len(self._spare) != size + 1:
+            self._spare = np.zeros(size + 1, dtype=np.uint8)
+        return self._spare
+
+    def _color_index(self, color_shape: tuple, idx: np.ndarray,
+                     z: np.ndarray) -> Optional[np.ndarray]:
+        """Flat colour pixel of each point; points off the colour image get
+        the spare index one past the end."""
+        ch, cw = color_shape
+        if self._direct and color_shape == self.shape:
+            return idx
+        intr = self._color_intr
+        if intr is None:
+            return None
+
+        # Colour intrinsics describe the full-resolution colour image.
+        sx, sy = cw / intr.width, ch / intr.height
+        if self._direct:
+            px, py = z * self._ray_x[idx], z * self._ray_y[idx]
+            pz = z * np.float32(self._depth_scale)
+        else:
+            (rx, ry, rz), (tx, ty, tz) = self._cray, self._t
+            px, py, pz = z * rx[idx], z * ry[idx], z * rz[idx]
+            px += tx
+            py += ty
+            pz += tz
+        np.maximum(pz, 1e-6, out=pz)
+        np.reciprocal(pz, out=pz)
+        px *= pz
+        px *= intr.fx * sx
+        px += intr.ppx * sx + 0.5       # + 0.5: nearest pixel after truncation
+        py *= pz
+        py *= intr.fy * sy
+        py += intr.ppy * sy + 0.5
+
+        bad = px < 0
+        bad |= px >= cw
+        bad |= py < 0
+        bad |= py >= ch
+        cidx = py.astype(np.intp)
+        cidx *= cw
+        cidx += px.astype(np.intp)
+        np.copyto(cidx, ch * cw, where=bad)
+        return cidx
+
+
+def write_ply(path: str, points: np.ndarray, comments: tuple = ()) -> None:
+    """Write PLY_DTYPE *points* to *path* as binary little-endian PLY."""
+    header = ["ply", "format binary_little_endian 1.0"]
+    header += [f"comment {c}" for c in comments]
+    header += [f"element vertex {len(points)}",
+               "property float x", "property float y", "property float z",
+               "property uchar red", "property uchar green", "property uchar blue",
+               "end_header"]
+    with open(path, "wb") as f:
+        f.write(("\n".join(header) + "\n").encode("ascii"))
+        f.write(np.ascontiguousarray(points, dtype=PLY_DTYPE).tobytes())
+
+
+# ---------------------------------------------------------------------- #
+# Recordings                                                               #
+# ---------------------------------------------------------------------- #
+
+def _open(file_path: str, decode: bool = True) -> FrameSource:
+    if file_path.lower().endswith(".rvl"):
+        return RvlFileFrameSource(file_path, decode=decode)
+    if not REALSENSE_AVAILABLE:
+        raise RuntimeError("pyrealsense2 is not installed (needed to read .bag).")
+    return BagFileFrameSource(file_path)
+
+
+def _index(file_path: str) -> FrameIndex:
+    """The index of the whole recording, written first where missing."""
+    return recording_index(file_path, lambda path: _open(path, decode=False))
+
+
+def select_framesets(index: FrameIndex, stride: int = 1,
+                     start_s: Optional[float] = None,
+                     end_s: Optional[float] = None) -> list[int]:
+    """Every *stride*-th frameset from *start_s* to *end_s* (seconds from the start)."""
+    if not len(index):
+        return []
+    first = 0
+    if start_s is not None:
+        target = index.timestamps_ms[0] + 1000.0 * start_s
+        first = int(np.searchsorted(index.timestamps_ms, target, side="left"))
+    last = len(index) - 1 if end_s is None else index.find_time(1000.0 * end_s)
+    return list(range(first, last + 1, max(1, stride)))
+
+
+def ply_name(i: int) -> str:
+    return f"frame_{i:06d}.ply"
+
+
+def _export_block(file_path: str, out_dir: str, indices: list[int]) -> int:
+    """Write the PLYs of frameset *indices* (ascending); safe in a worker process."""
+    index = _index(file_path)
+    source = open_chunked(file_path, _open)
+    source.start()
+    written = 0
+    try:
+        maker = PointCloudMaker.for_source(source)
+        current = None          # index position of the last frameset read
+        for i in indices:
+            frames = None
+            if current is not None and 0 < i - current <= MAX_SEEK_SKIP:
+                # Close enough to read forward rather than seek.
+                try:
+                    while current < i:
+                        frames = source.wait_for_frames()
+                        if frames is not None:
+                            current += 1
+                except EndOfStream:
+                    break
+                if frames.timestamp_ms != index.timestamps_ms[i]:
+                    frames = None
+            if frames is None:
+                frames = seek_to(source, index, i)
+                if frames is None:
+                    break
+            current = i
+            write_ply(os.path.join(out_dir, ply_name(i)), maker.points(frames),
+                      (f"timestamp_ms {frames.timestamp_ms:.3f}",
+                       f"frame_number {frames.frame_number}"))
+            written += 1
+    finally:
+        source.stop()
+    return written
+
+
+def export_point_clouds(file_path: str, out_dir: str, stride: int = 1,
+                        start_s: Optional[float] = None, end_s: Optional[float] = None,
+                        workers: int = 1,
+                        progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """Write PLYs of the selected framesets of *file_path* into *out_dir*.
+
+    *progress(done, total)* is called as blocks finish. Returns the number
+    of PLY files written.
+    """
+    indices = select_framesets(_index(file_path), stride, start_s, end_s)
+    os.makedirs(out_dir, exist_ok=True)
+    if not indices:
+        return 0
+    blocks = [b.tolist() for b in
+              np.array_split(indices, max(1, workers) * BLOCKS_PER_WORKER) if len(b)]
+
+    written = 0
+    if workers <= 1:
+        for block in blocks:
+            written += _export_block(file_path, out_dir, block)
+            if progress:
+                progress(written, len(indices))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_export_block, file_path, out_dir, b) for b in blocks]
+            for future in as_completed(futures):
+                written += future.result()
+                if progress:
+                    progress(written, len(indices))
+    logger.info("Wrote %d point clouds of %s to %s.", written, file_path, out_dir)
+    return written
@@ -0,0 +1,117 @@
+"""Pre-roll ring buffer — keeps the last few seconds of raw frames in memory.
+
+Storage for every stream is allocated once, on the first push, as a
+contiguous (capacity, H, W[, C]) block; pushing afterwards only copies
+pixels into the next slot, so the steady state at 30 fps allocates nothing.
+"""
+import logging
+from typing import Optional
+
+import numpy as np
+
+from app.camera.frame_source import FrameSet
+
+logger = logging.getLogger(__name__)
+
+_STREAMS = ("color", "depth", "infrared")
+
+
+class PrerollBuffer:
+    """Fixed-capacity ring of the most recent framesets.
+
+    Capacity is *seconds* x *fps*, reduced if needed so the pixel storage
+    stays under *max_bytes*. A capacity of zero disables the buffer.
+
+    freeze() hands the buffered frames to a recording as zero-copy views
+    and stops overwriting them; release() empties the ring and resumes
+    buffering once the recording is done with them.
+    """
+
+    def __init__(self, seconds: float, fps: int, max_bytes: int):
+        self._wanted    = max(0, int(round(seconds * fps)))
+        self._max_bytes = max_bytes
+        self._capacity  = 0
+        self._arrays: dict[str, Optional[np.ndarray]] = {}
+        self._timestamps: Optional[np.ndarray] = None
+        self._frame_numbers: Optional[np.ndarray] = None
+        self._clocks: Optional[np.ndarray] = None
+        self._head   = 0       # next slot to write
+        self._count  = 0
+        self._frozen = False
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _allocate(self, frames: FrameSet) -> None:
+        per_frame = sum(getattr(frames, n).nbytes for n in _STREAMS
+                        if getattr(frames, n) is not None)
+        capacity = self._wanted
+        if per_frame:
+            capacity = min(capacity, self._max_bytes // per_frame)
+        self._capacity = capacity
+        for name in _STREAMS:
+            arr = getattr(frames, name)
+            self._arrays[name] = (None if arr is None or capacity == 0 else
+                                  np.empty((capacity,) + arr.shape, dtype=arr.dtype))
+        self._timestamps    = np.zeros(capacity, dtype=np.float64)
+        self._frame_numbers = np.zeros(capacity, dtype=np.int64)
+        # Per-stream (timestamp, frame counter); NaN when the source has none
+        self._clocks        = np.full((capacity, len(_STREAMS), 2), np.nan)
+        logger.info("Pre-roll buffer: %d framesets (%.0f MB).",
+                    capacity, capacity * per_frame / (1024 * 1024))
+
+    def push(self, frames: FrameSet) -> None:
+        """Copy *frames* into the oldest slot (no-op while frozen or disabled)."""
+        if self._frozen or self._wanted == 0:
+            return
+        if self._timestamps is None:
+            self._allocate(frames)
+        if self._capacity == 0:
+            return
+
+        slot = self._head
+        for name, store in self._arrays.items():
+            src = getattr(frames, name)
+            if store is not None and src is not None and src.shape == store.shape[1:]:
+                np.copyto(store[slot], src)
+        self._timestamps[slot]    = frames.timestamp_ms
+        self._frame_numbers[slot] = frames.frame_number
+        clocks = self._clocks[slot]
+        clocks.fill(np.nan)
+        if frames.stream_clock:
+            for i, name in enumerate(_STREAMS):
+                if name in frames.stream_clock:
+                    clocks[i] = frames.stream_clock[name]
+        self._head  = (slot + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def freeze(self) -> list[FrameSet]:
+        """Stop buffering and return the contents, oldest first, as views."""
+        self._frozen = True
+        if self._count == 0:
+            return []
+        start = (self._head - self._count) % self._capacity
+        result = []
+        for i in range(self._count):
+            slot = (start + i) % self._capacity
+            views = {name: None if store is None else store[slot]
+                     for name, store in self._arrays.items()}
+            clock = {name: (float(ts), int(number))
+                     for name, (ts, number) in zip(_STREAMS, self._clocks[slot])
+                     if not np.isnan(ts)}
+            result.append(FrameSet(
+                timestamp_ms=float(self._timestamps[slot]),
+                frame_number=int(self._frame_numbers[slot]),
+                stream_clock=clock or None,
+                **views,
+            ))
+        return result
+
+    def release(self) -> None:
+        """Discard the buffered frames and resume buffering."""
+        self._count  = 0
+        self._frozen = False
@@ -0,0 +1,113 @@
+"""Adaptive, time-based preview rate controller.
+
+Instead of rendering every n-th camera frame, CameraService asks due()
+whether a preview frame should be rendered now and reports how long it
+took. Once a second the controller re-plans from what it measured:
+
+    cost     — mean render time per preview frame (decimate → compose)
+    budget   — the share of one CPU core preview may use; halved while a
+               recording is attached and cut further as the recorder's
+               queue fills, so the recording path always wins
+    UI rate  — how many frames the widget actually took from its mailbox;
+               rendering faster than the UI paints is wasted work
+
+The preview rate is the tightest of those limits, capped at the
+configured preview fps. If even MIN_FPS cannot be afforded, the preview
+is decimated one step further (scale), and the step is undone once the
+cost leaves enough headroom.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class PreviewRate:
+    """One controller report, emitted about once a second."""
+    fps: float          # preview frames actually rendered per second
+    target_fps: float   # rate the controller is aiming for
+    render_ms: float    # mean render cost per preview frame
+    load: float         # share of the current budget used (1.0 = all of it)
+    budget: float       # current budget, fraction of one core
+    scale: int          # extra decimation applied on top of the display fit
+
+
+class PreviewRateController:
+    MIN_FPS   = 2.0
+    MAX_SCALE = 4
+    PERIOD_S  = 1.0
+
+    def __init__(self, max_fps: float, camera_fps: float, budget: float = 0.25):
+        self.max_fps    = max(self.MIN_FPS, float(max_fps))
+        self.budget     = budget
+        self.target_fps = self.max_fps
+        self.scale      = 1
+        # A frame counts as due up to half a camera period early, so e.g.
+        # 15 fps on a 30 fps camera renders every other frame, not every third.
+        self._slack     = 0.5 / camera_fps if camera_fps > 0 else 0.0
+        self._next_due  = 0.0
+        self._period_start: Optional[float] = None
+        self._rendered  = 0
+        self._render_s  = 0.0
+        self._taken_at_start = 0
+
+    def due(self, now: float) -> bool:
+        """True if a preview frame should be rendered at time *now* (seconds)."""
+        if now + self._slack < self._next_due:
+            return False
+        interval = 1.0 / self.target_fps
+        self._next_due += interval
+        if self._next_due < now:        # fell behind: don't burst to catch up
+            self._next_due = now + interval
+        return True
+
+    def rendered(self, seconds: float) -> None:
+        """Record that one preview frame took *seconds* to render."""
+        self._rendered += 1
+        self._render_s += seconds
+
+    def update(self, now: float, frames_taken: int, recording: bool = False,
+               recorder_backlog: float = 0.0) -> Optional[PreviewRate]:
+        """Re-plan once per PERIOD_S; returns a report when it did.
+
+        *frames_taken* is the UI's running count of frames taken from the
+        mailbox; *recorder_backlog* is the attached recorder's queue fill
+        (0..1).
+        """
+        if self._period_start is None:
+            self._period_start = now
+            self._taken_at_start = frames_taken
+            return None
+        elapsed = now - self._period_start
+        if elapsed < self.PERIOD_S:
+            return None
+
+        fps      = self._rendered / elapsed
+        render_s = self._render_s / self._rendered if self._rendered else 0.0
+        ui_fps   = (frames_taken - self._taken_at_start) / elapsed
+
+        budget = self.budget
+        if recording:
+            budget *= 0.5 * (1.0 - min(1.0, recorder_backlog))
+        target = self.max_fps
+        if render_s > 0:
+            target = min(target, budget / render_s)
+        if self._rendered and ui_fps < fps * 0.9:
+            # UI is dropping frames: aim just above what it keeps up with
+            target = min(target, ui_fps * 1.1)
+
+        if target < self.MIN_FPS and self.scale < self.MAX_SCALE:
+            self.scale += 1
+        elif (self.scale > 1 and render_s > 0
+              and budget / (render_s * (self.scale / (self.scale - 1)) ** 2)
+              > 2 * self.max_fps):
+            self.scale -= 1
+        self.target_fps = max(self.MIN_FPS, min(self.max_fps, target))
+
+        load = render_s * fps / budget if budget > 0 else 0.0
+        self._period_start   = now
+        self._taken_at_start = frames_taken
+        self._rendered = 0
+        self._render_s = 0.0
+        return PreviewRate(fps=fps, target_fps=self.target_fps,
+                           render_ms=render_s * 1000.0, load=load,
+                           budget=budget, scale=self.scale)
@@ -0,0 +1,288 @@
+"""Export recordings to NumPy (.npy) or HDF5 arrays for offline analysis.
+
+Each recording under the output directory ({subject}/session_{id}/, see
+build_output_path) is mirrored under the export directory:
+
+    npy   <stem>/color.npy (N x H x W x 3 uint8, BGR), depth.npy (N x H x W
+          uint16, z16 units), infrared.npy, timestamps_ms.npy,
+          frame_numbers.npy, <stream>_timestamps_ms.npy,
+          <stream>_frame_numbers.npy and meta.json
+    h5    <stem>.h5 with the same arrays as datasets, images chunked one
+          frame per chunk and gzip-compressed, and meta.json's fields as
+          attributes
+
+N is the number of framesets. A stream missing from a frameset leaves
+zeros in its image and NaN / -1 in its clock arrays. meta.json records
+the depth scale, stream intrinsics and the size and mtime of the source
+recording: an export whose source has not changed since is skipped, so an
+interrupted batch can simply be run again. Exports are written under a
+".partial" name and renamed when complete.
+
+A recording split into chunks (see chunked_recording) is exported as one,
+under its first file's name; meta.json then lists the chunk files and
+the size and mtime cover all of them.
+
+HDF5 needs h5py, which is optional.
+"""
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass
+from glob import glob
+from typing import Optional
+
+import numpy as np
+
+from app.camera.chunked_recording import (
+    chunk_paths, fingerprint, is_continuation, open_chunked, recording_index,
+)
+from app.camera.frame_source import (
+    BagFileFrameSource, EndOfStream, FrameSet, FrameSource, StreamInfo,
+    REALSENSE_AVAILABLE,
+)
+from app.camera.rvl_file import RvlFileFrameSource
+
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    h5py = None  # type: ignore
+    H5PY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("npy", "h5")
+STREAMS = ("color", "depth", "infrared")
+RECORDING_EXTENSIONS = (".bag", ".rvl")
+PARTIAL_SUFFIX = ".partial"
+H5_GZIP_LEVEL = 1
+
+
+@dataclass
+class ExportResult:
+    file_path: str
+    target: str
+    status: str             # "exported", "skipped" or "failed"
+    framesets: int = 0
+    seconds: float = 0.0
+    message: str = ""
+
+
+def find_recordings(output_dir: str) -> list[str]:
+    """Every recording in the {subject}/session_{id}/ layout under *output_dir*
+    (split recordings by their first file)."""
+    found = []
+    for ext in RECORDING_EXTENSIONS:
+        found += glob(os.path.join(output_dir, "*", "session_*", "*" + ext))
+    return sorted(f for f in found if not is_continuation(f))
+
+
+def export_target(file_path: str, output_dir: str, export_dir: str, fmt: str) -> str:
+    """Where *file_path* is exported: a directory (npy) or an .h5 file."""
+    stem = os.path.splitext(os.path.relpath(file_path, output_dir))[0]
+    return os.path.join(export_dir, stem + (".h5" if fmt == "h5" else ""))
+
+
+def _source_fingerprint(file_path: str) -> dict:
+    size, mtime = fingerprint(file_path)
+    return {"source_size": size, "source_mtime_ns": mtime}
+
+
+def read_export_meta(target: str, fmt: str) -> Optional[dict]:
+    """The metadata of a finished export at *target*, or None."""
+    try:
+        if fmt == "h5":
+            if not H5PY_AVAILABLE or not os.path.isfile(target):
+                return None
+            with h5py.File(target, "r") as f:
+                return json.loads(f.attrs["meta"])
+        with open(os.path.join(target, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def is_exported(file_path: str, target: str, fmt: str) -> bool:
+    """True if *target* holds an export of *file_path* as it is now."""
+    meta = read_export_meta(target, fmt)
+    if meta is None:
+        return False
+    fingerprint = _source_fingerprint(file_path)
+    return all(meta.get(k) == v for k, v in fingerprint.items())
+
+
+# ---------------------------------------------------------------------- #
+# Writers                                                                  #
+# ---------------------------------------------------------------------- #
+
+def _image_shape(info: StreamInfo) -> tuple:
+    if info.name == "color":
+        return (info.height, info.width, 3)
+    return (info.height, info.width)
+
+
+def _image_dtype(name: str):
+    return np.uint16 if name == "depth" else np.uint8
+
+
+class _ArraySet:
+    """Per-frameset arrays of one export, written frameset by frameset."""
+
+    def __init__(self, streams: dict[str, StreamInfo], count: int, create):
+        # create(name, shape, dtype, fill, image) -> writable array-like
+        self.images = {name: create(name, (count,) + _image_shape(info),
+                                    _image_dtype(name), None, True)
+                       for name, info in streams.items()}
+        self.timestamps = create("timestamps_ms", (count,), np.float64, np.nan, False)
+        self.numbers    = create("frame_numbers", (count,), np.int64, -1, False)
+        self.stream_timestamps = {
+            name: create(f"{name}_timestamps_ms", (count,), np.float64, np.nan, False)
+            for name in streams}
+        self.stream_numbers = {
+            name: create(f"{name}_frame_numbers", (count,), np.int64, -1, False)
+            for name in streams}
+
+    def write(self, i: int, frames: FrameSet) -> None:
+        self.timestamps[i] = frames.timestamp_ms
+        self.numbers[i]    = frames.frame_number
+        clock = frames.stream_clock or {}
+        for name, images in self.images.items():
+            pixels = getattr(frames, name)
+            if pixels is None:
+                continue
+            images[i] = pixels
+            ts, number = clock.get(name, (frames.timestamp_ms, frames.frame_number))
+            self.stream_timestamps[name][i] = ts
+            self.stream_numbers[name][i]    = number
+
+
+def _write_npy(directory: str, source: FrameSource, streams: dict[str, StreamInfo],
+               count: int, meta: dict) -> int:
+    os.makedirs(directory)
+    arrays = []
+
+    def create(name, shape, dtype, fill, image):
+        array = np.lib.format.open_memmap(os.path.join(directory, name + ".npy"),
+                                          mode="w+", dtype=dtype, shape=shape)
+        if fill is not None:
+            array[:] = fill
+        arrays.append(array)
+        return array
+
+    out = _ArraySet(streams, count, create)
+    written = _copy_framesets(source, out, count)
+    for array in arrays:
+        array.flush()
+    del out, arrays
+    meta["framesets"] = written
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return written
+
+
+def _write_h5(path: str, source: FrameSource, streams: dict[str, StreamInfo],
+              count: int, meta: dict) -> int:
+    with h5py.File(path, "w") as f:
+        def create(name, shape, dtype, fill, image):
+            if image:
+                return f.create_dataset(name, shape=shape, dtype=dtype,
+                                        chunks=(1,) + shape[1:], compression="gzip",
+                                        compression_opts=H5_GZIP_LEVEL, shuffle=True)
+            return f.create_dataset(name, shape=shape, dtype=dtype, fillvalue=fill)
+
+        out = _ArraySet(streams, count, create)
+        written = _copy_framesets(source, out, count)
+        meta["framesets"] = written
+        f.attrs["meta"] = json.dumps(meta)
+        for key in ("depth_scale", "framesets", "source_size", "source_mtime_ns"):
+            f.attrs[key] = meta[key]
+    return written
+
+
+def _copy_framesets(source: FrameSource, out: _ArraySet, count: int) -> int:
+    written = 0
+    while written < count:
+        try:
+            frames = source.wait_for_frames()
+        except EndOfStream:
+            break
+        if frames is None:
+            continue
+        out.write(written, frames)
+        written += 1
+    return written
+
+
+# ---------------------------------------------------------------------- #
+# One recording                                                            #
+# ---------------------------------------------------------------------- #
+
+def _open(file_path: str, decode: bool = True) -> FrameSource:
+    if file_path.lower().endswith(".rvl"):
+        return RvlFileFrameSource(file_path, decode=decode)
+    if not REALSENSE_AVAILABLE:
+        raise RuntimeError("pyrealsense2 is not installed (needed to read .bag).")
+    return BagFileFrameSource(file_path)
+
+
+def _frameset_count(file_path: str) -> int:
+    """From the sidecar index, which is written first if missing."""
+    return len(recording_index(file_path, lambda path: _open(path, decode=False)))
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def export_recording(file_path: str, target: str, fmt: str = "npy",
+                     streams: tuple[str, ...] = STREAMS,
+                     force: bool = False) -> ExportResult:
+    """Export one recording to *target*; safe to call in a worker process."""
+    t0 = time.perf_counter()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "h5" and not H5PY_AVAILABLE:
+        return ExportResult(file_path, target, "failed", message="h5py is not installed.")
+    if not force and is_exported(file_path, target, fmt):
+        return ExportResult(file_path, target, "skipped")
+
+    partial = target + PARTIAL_SUFFIX
+    try:
+        count = _frameset_count(file_path)
+        source = open_chunked(file_path, _open)
+        source.start()
+        try:
+            available = source.streams()
+            selected = {n: available[n] for n in streams if n in available}
+            meta = {
+                "source": os.path.abspath(file_path),
+                "chunks": [os.path.basename(p) for p in chunk_paths(file_path)],
+                **_source_fingerprint(file_path),
+                "format": fmt,
+                "depth_scale": source.depth_scale,
+                "streams": {n: {"width": s.width, "height": s.height, "fps": s.fps,
+                                "intrinsics": asdict(s.intrinsics)}
+                            for n, s in selected.items()},
+            }
+            _remove(partial)
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            write = _write_h5 if fmt == "h5" else _write_npy
+            written = write(partial, source, selected, count, meta)
+        finally:
+            source.stop()
+        _remove(target)
+        os.replace(partial, target)
+    except Exception as exc:
+        logger.error("Export of %s failed: %s", file_path, exc)
+        _remove(partial)
+        return ExportResult(file_path, target, "failed",
+                            seconds=time.perf_counter() - t0, message=str(exc))
+
+    message = "" if written == count else f"index lists {count} framesets, read {written}"
+    return ExportResult(file_path, target, "exported", written,
+                        time.perf_counter() - t0, message)
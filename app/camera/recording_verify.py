@@ -0,0 +1,195 @@
+"""Integrity check of finished recordings.
+
+verify_recording() reads a .bag / .rvl from start to end, one frameset at
+a time (nothing but the current frameset is held in memory), and checks
+that
+
+    the file exists, is not empty and opens
+    colour, depth and infrared are all present, at the expected profiles
+    every frameset can be read, and per-stream frame counts add up
+    the file is complete: an .rvl was closed (it has its frame index) and
+    the recorded time span is not shorter than the duration the recording
+    worker measured
+
+The result is one of VERIFY_STATUSES with a short message. .rvl files
+are read without decoding (record headers and payloads only), so a check
+costs little more than reading the file once. A recording split into
+chunks is checked as one, across all its files: a missing last chunk
+shows as a truncated recording, an unclosed chunk as an unclosed file.
+
+verify_many() runs checks in a thread pool. Reading is I/O bound and
+librealsense releases the GIL while it decodes, so threads keep several
+disks busy without the start-up cost of worker processes.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from app.camera.chunked_recording import chunk_paths, open_chunked
+from app.camera.frame_source import (
+    BagFileFrameSource, EndOfStream, FrameSource, REALSENSE_AVAILABLE,
+)
+from app.camera.rvl_file import RvlFileFrameSource
+
+logger = logging.getLogger(__name__)
+
+# ok        everything checks out
+# warning   readable and complete, but not as configured (profile, fps)
+# truncated shorter than recorded, or an .rvl that was never closed
+# failed    does not open, a stream is missing, or unreadable part-way
+# missing   the file is not there
+VERIFY_STATUSES = ("ok", "warning", "truncated", "failed", "missing")
+EXPECTED_STREAMS = ("color", "depth", "infrared")
+# Recorded time span may fall short of the measured duration by this much
+TRUNCATION_TOLERANCE_S = 1.0
+
+
+@dataclass
+class VerifyJob:
+    recording_id: Optional[int]
+    file_path: str
+    # stream -> (width, height, fps); None skips the profile check
+    expected: Optional[dict[str, tuple[int, int, int]]] = None
+    duration_seconds: Optional[float] = None     # as measured while recording
+    chunks: Optional[int] = None                 # files it was split into, if known
+
+
+@dataclass
+class VerifyResult:
+    recording_id: Optional[int]
+    file_path: str
+    status: Optional[str]       # one of VERIFY_STATUSES; None if it cannot be read here
+    message: str = ""
+    framesets: int = 0
+    stream_frames: dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0        # recorded time span
+
+
+def expected_profiles(settings) -> dict[str, tuple[int, int, int]]:
+    """Stream profiles configured in *settings* (an AppSettings)."""
+    return {name: (getattr(settings, f"{name}_width"), getattr(settings, f"{name}_height"),
+                   getattr(settings, f"{name}_fps"))
+            for name in EXPECTED_STREAMS}
+
+
+def _open(file_path: str) -> Optional[FrameSource]:
+    if file_path.lower().endswith(".rvl"):
+        return RvlFileFrameSource(file_path, decode=False)
+    if REALSENSE_AVAILABLE:
+        return BagFileFrameSource(file_path)
+    return None
+
+
+def verify_recording(job: VerifyJob, should_stop=lambda: False) -> VerifyResult:
+    """Check one recording; safe to call from any thread."""
+    result = VerifyResult(job.recording_id, job.file_path, None)
+    if not os.path.isfile(job.file_path):
+        result.status, result.message = "missing", "File not found."
+        return result
+    if os.path.getsize(job.file_path) == 0:
+        result.status, result.message = "failed", "File is empty."
+        return result
+    files = len(chunk_paths(job.file_path))
+    source = open_chunked(job.file_path, _open)
+    if source is None:
+        result.message = "pyrealsense2 is not installed (needed to read .bag)."
+        return result
+
+    try:
+        source.start()
+    except Exception as exc:
+        result.status, result.message = "failed", f"Does not open: {exc}"
+        return result
+    try:
+        streams = source.streams()
+        missing = [n for n in EXPECTED_STREAMS if n not in streams]
+        if missing:
+            result.status = "failed"
+            result.message = f"No {', '.join(missing)} stream."
+            return result
+        warnings = []
+        for name, (w, h, fps) in (job.expected or {}).items():
+            s = streams[name]
+            if (s.width, s.height, s.fps) != (w, h, fps):
+                warnings.append(f"{name} is {s.width}x{s.height}@{s.fps}, "
+                                f"expected {w}x{h}@{fps}")
+
+        first_ts = last_ts = None
+        while not should_stop():
+            try:
+                frames = source.wait_for_frames()
+            except EndOfStream:
+                break
+            except Exception as exc:
+                result.status = "failed"
+                result.message = f"Unreadable after {result.framesets} framesets: {exc}"
+                return result
+            if frames is None:
+                continue
+            result.framesets += 1
+            for name in frames.stream_clock or {}:
+                result.stream_frames[name] = result.stream_frames.get(name, 0) + 1
+            if first_ts is None:
+                first_ts = frames.timestamp_ms
+            last_ts = frames.timestamp_ms
+        else:
+            return result       # stopped: status stays None
+        complete = getattr(source, "complete", True)
+    finally:
+        source.stop()
+
+    if not result.framesets:
+        result.status, result.message = "failed", "No frames."
+        return result
+    # Span of the framesets plus one frame period for the last one.
+    fps = max(s.fps for s in streams.values()) or 30
+    result.seconds = (last_ts - first_ts) / 1000.0 + 1.0 / fps
+    short = [n for n in EXPECTED_STREAMS if not result.stream_frames.get(n)]
+    if short:
+        result.status = "failed"
+        result.message = f"No {', '.join(short)} frames in {result.framesets} framesets."
+    elif job.chunks is not None and files < job.chunks:
+        result.status = "truncated"
+        result.message = f"Only {files} of its {job.chunks} files are there."
+    elif not complete:
+        result.status = "truncated"
+        result.message = "Not closed cleanly (frame index rebuilt by scanning)."
+    elif (job.duration_seconds is not None
+          and result.seconds < job.duration_seconds - TRUNCATION_TOLERANCE_S):
+        result.status = "truncated"
+        result.message = (f"Holds {result.seconds:.1f} s of "
+                          f"{job.duration_seconds:.1f} s recorded.")
+    elif warnings:
+        result.status, result.message = "warning", "; ".join(warnings) + "."
+    else:
+        result.status = "ok"
+        result.message = (f"{result.framesets} framesets, {result.seconds:.1f} s ("
+                          + ", ".join(f"{n} {c}" for n, c in result.stream_frames.items())
+                          + ").")
+        if files > 1:
+            result.message += f" {files} files."
+    return result
+
+
+def verify_many(jobs: Iterable[VerifyJob], workers: int = 4,
+                should_stop=lambda: False) -> Iterator[VerifyResult]:
+    """Verify *jobs* in a pool of *workers* threads, yielding results as they finish.
+
+    When *should_stop* turns true, queued checks are cancelled and running
+    ones end at their next frameset (those yield a status of None).
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers),
+                            thread_name_prefix="verify") as pool:
+        futures = [pool.submit(verify_recording, job, should_stop) for job in jobs]
+        try:
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                yield future.result()
+                if should_stop():
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
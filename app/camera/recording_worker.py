@@ -1,139 +1,283 @@
-"""Recording worker — runs RealSense recording pipeline in a thread,
-records to .bag and emits live preview frames at a reduced rate."""
+"""Recording worker — writes the framesets forwarded by the CameraService
+to a .bag (or compressed .rvl) file on its own thread."""
 import logging
+import queue
+import threading
 import time
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
-from PyQt6.QtGui import QImage
+
+from app.camera.bag_writer import BagWriter
+from app.camera.frame_source import Extrinsics, FrameSet, StreamInfo
+from app.camera.rvl_file import RvlWriter
+from app.camera.stream_stats import RecordingStats, StreamStatsTracker
+from app.utils.file_utils import build_chunk_path
 
 logger = logging.getLogger(__name__)
 
-try:
-    import pyrealsense2 as rs
-    REALSENSE_AVAILABLE = True
-except ImportError:
-    rs = None  # type: ignore
-    REALSENSE_AVAILABLE = False
+
+def open_writer(file_path: str, streams: dict[str, StreamInfo], depth_scale: float,
+                extrinsics: Optional[dict[str, Extrinsics]] = None):
+    """BagWriter, or RvlWriter for an .rvl path; both write()/close() framesets."""
+    if file_path.lower().endswith(".rvl"):
+        return RvlWriter(file_path, streams, depth_scale, extrinsics)
+    return BagWriter(file_path, streams, depth_scale, extrinsics)
+
+
+@dataclass
+class ChunkInfo:
+    """One file of a recording; see RecordingWorker's chunk_seconds / chunk_bytes."""
+    index: int
+    file_path: str
+    started_at: str                 # UTC, when its first frameset was written
+    start_timestamp_ms: float       # camera clock of its first frameset
+    duration_seconds: float = 0.0   # set when closed
+    framesets: int = 0
 
 
 class RecordingWorker(QObject):
     """Records all 3 RealSense streams to a .bag file.
 
-    Also emits preview QImage frames at *preview_fps* rate so the UI
-    can display a live feed during recording without a separate pipeline.
+    The worker does not touch the camera: CameraService.attach_recorder()
+    makes the running capture loop call submit() with every frameset, and
+    this worker drains them into a BagWriter (RvlWriter for .rvl paths)
+    in its own QThread. stop()
+    lets the queue drain, finalises the bag and emits recording_stopped.
+
+    Pre-roll frames passed to set_preroll() are written ahead of the first
+    live frameset and count towards the reported duration. They are views
+    into the camera's pre-roll buffer, which stays frozen until finished()
+    (writers may still be encoding them after they were handed over).
 
-    Preview mode:
-        "calibration"  →  RGB (left) + colorised Depth (right) side-by-side
-        "data"         →  colorised Depth only
+    If the writer falls more than *queue_size* framesets behind, new
+    framesets are dropped (and counted) rather than stalling the camera.
+
+    With *chunk_seconds* or *chunk_bytes* set, the recording is split into
+    consecutive files (build_chunk_path) once the current one spans that
+    much camera time or holds that many bytes. The frameset that crosses
+    the limit is the first of the next file, so nothing is lost at the
+    boundary, and the full file is closed on a helper thread while frames
+    keep going into the next. chunk_opened / chunk_closed report every
+    file, including the only one of a recording that is never split;
+    recording_stopped comes after the last chunk_closed and carries the
+    first file's path and the duration of the whole recording.
+
+    Every written frameset updates per-stream received/gap/drop counters
+    (see stream_stats); a RecordingStats snapshot is emitted through
+    stats_updated about once a second and with recording_stopped. The
+    duration is measured from the frame timestamps, pre-roll included.
     """
 
-    recording_stopped = pyqtSignal(str, float)   # file_path, duration_s
+    recording_stopped = pyqtSignal(str, float, object)   # file_path, duration_s, RecordingStats
+    stats_updated     = pyqtSignal(object)               # RecordingStats
+    chunk_opened      = pyqtSignal(object)               # ChunkInfo
+    chunk_closed      = pyqtSignal(object)               # ChunkInfo
     error_occurred    = pyqtSignal(str)
-    frame_ready       = pyqtSignal(QImage)        # live preview during recording
-
-    def __init__(self, file_path: str,
-                 color_width: int, color_height: int, color_fps: int,
-                 depth_width: int, depth_height: int, depth_fps: int,
-                 infrared_width: int, infrared_height: int, infrared_fps: int,
-                 preview_mode: str = "calibration",
-                 preview_fps: int = 15):
+
+    STATS_INTERVAL_S = 1.0
+
+    def __init__(self, file_path: str, queue_size: int = 90,
+                 chunk_seconds: float = 0.0, chunk_bytes: int = 0):
         super().__init__()
-        self._file_path       = file_path
-        self._color_width     = color_width
-        self._color_height    = color_height
-        self._color_fps       = color_fps
-        self._depth_width     = depth_width
-        self._depth_height    = depth_height
-        self._depth_fps       = depth_fps
-        self._infrared_width  = infrared_width
-        self._infrared_height = infrared_height
-        self._infrared_fps    = infrared_fps
-        self._preview_mode    = preview_mode   # "calibration" | "data"
-        self._preview_fps     = preview_fps
-        self._running         = False
+        self._file_path   = file_path
+        self._chunk_seconds = chunk_seconds
+        self._chunk_bytes   = chunk_bytes
+        self._writer: Optional[BagWriter | RvlWriter] = None
+        self._chunk: Optional[ChunkInfo] = None
+        self._closer: Optional[ThreadPoolExecutor] = None
+        self._queue: queue.Queue[FrameSet] = queue.Queue(maxsize=queue_size)
+        self._streams: dict[str, StreamInfo] = {}
+        self._depth_scale = 0.001
+        self._extrinsics: dict[str, Extrinsics] = {}
+        self._preroll: list[FrameSet] = []
+        self._dropped     = 0
+        self._stats       = StreamStatsTracker()
+        self._first_ts: Optional[float] = None
+        self._last_ts:  Optional[float] = None
+        self._running     = False
+        self._accepting   = True
+        self._finished    = threading.Event()
 
-    @pyqtSlot()
-    def run(self) -> None:
-        if not REALSENSE_AVAILABLE:
-            self.error_occurred.emit("pyrealsense2 is not installed.")
+    # ------------------------------------------------------------------ #
+    # Called from the camera thread                                        #
+    # ------------------------------------------------------------------ #
+
+    def set_streams(self, streams: dict[str, StreamInfo], depth_scale: float,
+                    extrinsics: Optional[dict[str, Extrinsics]] = None) -> None:
+        """Describe the streams that will be submitted, and the depth →
+        stream *extrinsics* between them; called before submit()."""
+        self._streams     = streams
+        self._depth_scale = depth_scale
+        self._extrinsics  = dict(extrinsics or {})
+        self._stats.set_streams(streams)
+
+    def set_preroll(self, frames: list[FrameSet]) -> None:
+        """Queue buffered *frames* ahead of live ones."""
+        if self._accepting:
+            self._preroll = frames
+
+    def submit(self, frames: FrameSet) -> None:
+        if not self._accepting:
             return
+        if frames.native is not None:
+            frames.native.keep()    # take the frame out of the SDK pool while queued
+        try:
+            self._queue.put_nowait(frames)
+        except queue.Full:
+            self._dropped += 1
+
+    def finished(self) -> bool:
+        """True once run() has returned and every file is closed, so the
+        pre-roll frames are no longer read."""
+        return self._finished.is_set()
+
+    def backlog(self) -> float:
+        """Fraction of the frame queue in use (0 = keeping up, 1 = dropping)."""
+        return self._queue.qsize() / self._queue.maxsize
+
+    # ------------------------------------------------------------------ #
+    # Writer thread                                                        #
+    # ------------------------------------------------------------------ #
 
-        pipeline = rs.pipeline()
-        config   = rs.config()
-        config.enable_record_to_file(self._file_path)
-        config.enable_stream(rs.stream.color,    self._color_width,    self._color_height,
-                             rs.format.bgr8, self._color_fps)
-        config.enable_stream(rs.stream.depth,    self._depth_width,    self._depth_height,
-                             rs.format.z16,  self._depth_fps)
-        config.enable_stream(rs.stream.infrared, 1,
-                             self._infrared_width, self._infrared_height,
-                             rs.format.y8,   self._infrared_fps)
-
-        colorizer = rs.colorizer()
-        colorizer.set_option(rs.option.color_scheme, 0)   # Jet
-        align     = rs.align(rs.stream.color)
-
-        frame_interval = max(1, self._color_fps // self._preview_fps)
-        frame_count    = 0
-        start_time     = 0.0
+    def stats(self) -> RecordingStats:
+        return self._stats.snapshot(self._dropped)
+
+    @pyqtSlot()
+    def run(self) -> None:
+        self._running = True
+        start_time    = time.time()
+        last_emit     = start_time
 
         try:
-            pipeline.start(config)
-            self._running = True
-            start_time    = time.time()
             logger.info("Recording started → %s", self._file_path)
-
-            while self._running:
+            while self._running or not self._queue.empty():
+                now = time.time()
+                if now - last_emit >= self.STATS_INTERVAL_S:
+                    last_emit = now
+                    self.stats_updated.emit(self.stats())
                 try:
-                    frames = pipeline.wait_for_frames(timeout_ms=1000)
-                except Exception:
+                    frames = self._queue.get(timeout=0.1)
+                except queue.Empty:
                     continue
-
-                frame_count += 1
-
-                # Emit a preview frame at reduced rate
-                if frame_count % frame_interval == 0:
-                    try:
-                        aligned     = align.process(frames)
-                        depth_frame = aligned.get_depth_frame()
-                        if not depth_frame:
-                            continue
-
-                        depth_colored = colorizer.colorize(depth_frame)
-                        depth_rgb     = np.asarray(depth_colored.get_data()).copy()
-
-                        if self._preview_mode == "calibration":
-                            color_frame = aligned.get_color_frame()
-                            if color_frame:
-                                color_bgr = np.asarray(color_frame.get_data())
-                                color_rgb = color_bgr[:, :, ::-1].copy()
-                                combined  = np.hstack([color_rgb, depth_rgb])
-                            else:
-                                combined = depth_rgb
-                        else:          # "data" — depth only
-                            combined = depth_rgb
-
-                        h, w, ch = combined.shape
-                        qimg = QImage(combined.data, w, h, ch * w,
-                                      QImage.Format.Format_RGB888)
-                        self.frame_ready.emit(qimg.copy())
-                    except Exception:
-                        pass   # preview failure must never abort the recording
+                if self._writer is None:
+                    self._flush_preroll()
+                self._write(frames)
 
         except Exception as exc:
             logger.error("Recording worker error: %s", exc)
+            self._accepting = False
             self.error_occurred.emit(str(exc))
             return
         finally:
+            self._preroll = []
             try:
-                pipeline.stop()
-            except Exception:
-                pass
+                self._close_chunks()
+            finally:
+                self._finished.set()
+
+        if self._chunk is None:
+            self.error_occurred.emit("No frames were received from the camera.")
+            return
+
+        duration = self._duration(time.time() - start_time)
+        stats = self.stats()
+        if self._dropped:
+            logger.warning("Recording writer fell behind; %d framesets dropped.",
+                           self._dropped)
+        logger.info("Recording stopped. Duration=%.1f s, %s, file=%s (%d file%s)",
+                    duration, stats.summary(), self._file_path, self._chunk.index + 1,
+                    "s" if self._chunk.index else "")
+        self.stats_updated.emit(stats)
+        self.recording_stopped.emit(self._file_path, duration, stats)
+
+    def _write(self, frames: FrameSet) -> None:
+        if self._writer is None or self._chunk_full(frames):
+            self._next_chunk(frames)
+        self._writer.write(frames)
+        self._chunk.framesets += 1
+        self._stats.update(frames)
+        if self._first_ts is None:
+            self._first_ts = frames.timestamp_ms
+        self._last_ts = frames.timestamp_ms
+
+    # ------------------------------------------------------------------ #
+    # Chunks                                                               #
+    # ------------------------------------------------------------------ #
+
+    def _chunk_full(self, frames: FrameSet) -> bool:
+        """True if *frames* belongs in a new file (no syscalls: called per frameset)."""
+        chunk = self._chunk
+        if not chunk.framesets:
+            return False
+        if (self._chunk_seconds > 0 and frames.timestamp_ms - chunk.start_timestamp_ms
+                >= self._chunk_seconds * 1000.0):
+            return True
+        return 0 < self._chunk_bytes <= self._writer.bytes_written
+
+    def _next_chunk(self, frames: FrameSet) -> None:
+        """Close the current file in the background and open the next one,
+        which starts with *frames*."""
+        index = 0
+        if self._writer is not None:
+            done, writer = self._chunk, self._writer
+            done.duration_seconds = (frames.timestamp_ms - done.start_timestamp_ms) / 1000.0
+            if self._closer is None:
+                self._closer = ThreadPoolExecutor(max_workers=1,
+                                                  thread_name_prefix="chunk-close")
+            self._closer.submit(self._close_chunk, writer, done)
+            index = done.index + 1
+            self._writer = None
+        path = build_chunk_path(self._file_path, index)
+        self._writer = open_writer(path, self._streams, self._depth_scale,
+                                   self._extrinsics)
+        self._chunk = ChunkInfo(
+            index, path, datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            frames.timestamp_ms)
+        if index:
+            logger.info("Recording continues in %s", path)
+        self.chunk_opened.emit(self._chunk)
+
+    def _close_chunk(self, writer: BagWriter | RvlWriter, chunk: ChunkInfo) -> None:
+        try:
+            writer.close()
+        except Exception as exc:
+            logger.error("Closing %s failed: %s", chunk.file_path, exc)
+            self.error_occurred.emit(f"Closing {chunk.file_path} failed: {exc}")
+            return
+        self.chunk_closed.emit(chunk)
+
+    def _close_chunks(self) -> None:
+        """Wait for files closing in the background, then close the current one."""
+        if self._closer is not None:
+            self._closer.shutdown(wait=True)
+            self._closer = None
+        if self._writer is not None:
+            chunk, writer, self._writer = self._chunk, self._writer, None
+            fps = max((s.fps for s in self._streams.values()), default=0)
+            if self._last_ts is not None:
+                chunk.duration_seconds = (self._last_ts - chunk.start_timestamp_ms) / 1000.0 \
+                    + (1.0 / fps if fps > 0 else 0.0)
+            self._close_chunk(writer, chunk)
+
+    def _duration(self, wall_s: float) -> float:
+        """Timestamp span of the written frames plus one frame period;
+        wall-clock time if the timestamps are unusable."""
+        fps = max((s.fps for s in self._streams.values()), default=0)
+        if self._first_ts is None or fps <= 0 or self._last_ts <= self._first_ts:
+            return wall_s
+        return (self._last_ts - self._first_ts) / 1000.0 + 1.0 / fps
 
-        duration = time.time() - start_time
-        logger.info("Recording stopped. Duration=%.1f s, file=%s",
-                    duration, self._file_path)
-        self.recording_stopped.emit(self._file_path, duration)
+    def _flush_preroll(self) -> None:
+        for frames in self._preroll:
+            self._write(frames)
+        if self._preroll:
+            logger.info("Wrote %d pre-roll framesets.", len(self._preroll))
+        self._preroll = []
 
     def stop(self) -> None:
-        self._running = False
+        """Stop accepting frames; run() returns once the queue is written out."""
+        self._accepting = False
+        self._running   = False
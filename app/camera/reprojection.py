@@ -0,0 +1,164 @@
+"""Depth-to-colour reprojection with cached per-pixel maps.
+
+Replaces the per-frame ``rs.align`` in the preview path. For every depth
+pixel the rotated viewing ray R·K⁻¹·(u, v, 1) is precomputed once from the
+stream intrinsics/extrinsics; each frame then only needs
+
+    X, Y, Z = z·ray + t      →      u' = fx·X/Z + ppx,  v' = fy·Y/Z + ppy
+
+followed by a scatter into the colour grid. Maps are built at preview
+(decimated) resolution and rebuilt only when a stream profile, the
+decimation factor or the depth scale changes.
+
+Lens distortion is ignored — D4xx depth is undistorted and the colour
+coefficients are negligible at preview scale.
+"""
+import logging
+from typing import Optional
+
+import numpy as np
+
+from app.camera.frame_source import Extrinsics, FrameSet, Intrinsics
+
+logger = logging.getLogger(__name__)
+
+
+class _Maps:
+    """Per-pixel constants for one (profile, decimation) combination."""
+
+    def __init__(self, depth_shape: tuple, color_shape: tuple,
+                 depth_intr: Intrinsics, color_intr: Intrinsics,
+                 extr: Extrinsics, depth_scale: float, factor: int):
+        h, w = depth_shape
+        self.color_shape = color_shape
+
+        # Decimated pixel i samples the full-resolution pixel i * factor.
+        us = np.arange(w, dtype=np.float32) * factor
+        vs = np.arange(h, dtype=np.float32) * factor
+        xn = ((us - depth_intr.ppx) / depth_intr.fx)[np.newaxis, :]
+        yn = ((vs - depth_intr.ppy) / depth_intr.fy)[:, np.newaxis]
+
+        rot = np.asarray(extr.rotation, dtype=np.float32).reshape(3, 3).T
+        ray_x = rot[0, 0] * xn + rot[0, 1] * yn + rot[0, 2]
+        ray_y = rot[1, 0] * xn + rot[1, 1] * yn + rot[1, 2]
+        ray_z = rot[2, 0] * xn + rot[2, 1] * yn + rot[2, 2]
+
+        # Fold the depth scale in so raw z16 values can be used directly.
+        self.ray_x = (ray_x * depth_scale).astype(np.float32)
+        self.ray_y = (ray_y * depth_scale).astype(np.float32)
+        self.ray_z = (ray_z * depth_scale).astype(np.float32)
+        self.tx, self.ty, self.tz = (float(t) for t in extr.translation)
+
+        # Colour projection expressed directly in decimated pixels.
+        self.fx = color_intr.fx / factor
+        self.fy = color_intr.fy / factor
+        self.ppx = color_intr.ppx / factor
+        self.ppy = color_intr.ppy / factor
+
+        # Work buffers, reused every frame.
+        self.z  = np.empty(depth_shape, dtype=np.float32)
+        self.px = np.empty(depth_shape, dtype=np.float32)
+        self.py = np.empty(depth_shape, dtype=np.float32)
+        self.pz = np.empty(depth_shape, dtype=np.float32)
+        self.ui = np.empty(depth_shape, dtype=np.int32)
+        self.vi = np.empty(depth_shape, dtype=np.int32)
+        self.idx = np.empty(depth_shape, dtype=np.int32)
+        self.bad = np.empty(depth_shape, dtype=bool)
+        # One spare element at the end absorbs discarded pixels.
+        ch, cw = color_shape
+        self.flat = np.zeros(ch * cw + 1, dtype=np.uint16)
+        self.out = self.flat[:-1].reshape(color_shape)
+
+
+class DepthReprojector:
+    """Maps decimated depth frames into the matching decimated colour grid."""
+
+    def __init__(self):
+        self._key = None
+        self._maps: Optional[_Maps] = None
+
+    @staticmethod
+    def is_identity(depth_intr: Intrinsics, color_intr: Intrinsics,
+                    extr: Extrinsics) -> bool:
+        """True when depth already lies on the colour grid (synthetic sources)."""
+        return (depth_intr == color_intr and extr == Extrinsics())
+
+    def _maps_for(self, depth_shape, color_shape, depth_intr, color_intr,
+                  extr, depth_scale, factor) -> _Maps:
+        key = (depth_shape, color_shape, depth_intr, color_intr, extr,
+               depth_scale, factor)
+        if key != self._key:
+            self._maps = _Maps(depth_shape, color_shape, depth_intr, color_intr,
+                               extr, depth_scale, factor)
+            self._key = key
+            logger.debug("Reprojection maps rebuilt for %s → %s (factor %d).",
+                         depth_shape, color_shape, factor)
+        return self._maps
+
+    def reproject(self, depth: np.ndarray, color_shape: tuple,
+                  depth_intr: Intrinsics, color_intr: Intrinsics,
+                  extr: Extrinsics, depth_scale: float, factor: int) -> np.ndarray:
+        """Return *depth* (decimated by *factor*) resampled onto the colour grid.
+
+        The result is a reused buffer; pixels with no depth are zero. When
+        two depth pixels land on the same colour pixel the last one wins,
+        which is indistinguishable from a z-test at preview scale.
+        """
+        m = self._maps_for(depth.shape, color_shape, depth_intr, color_intr,
+                           extr, depth_scale, factor)
+        z, px, py, pz = m.z, m.px, m.py, m.pz
+        np.copyto(z, depth, casting="unsafe")
+
+        # Point in the colour camera frame, then perspective divide.
+        np.multiply(z, m.ray_z, out=pz)
+        pz += m.tz
+        np.maximum(pz, 1e-6, out=pz)
+        np.reciprocal(pz, out=pz)
+        np.multiply(z, m.ray_x, out=px)
+        px += m.tx
+        px *= pz
+        px *= m.fx
+        px += m.ppx + 0.5
+        np.multiply(z, m.ray_y, out=py)
+        py += m.ty
+        py *= pz
+        py *= m.fy
+        py += m.ppy + 0.5
+
+        # Flat colour index; anything invalid or off-grid goes to a spare
+        # slot past the end, so the scatter needs no boolean compaction.
+        h, w = color_shape
+        ui, vi, idx = m.ui, m.vi, m.idx
+        np.copyto(ui, px, casting="unsafe")
+        np.copyto(vi, py, casting="unsafe")
+        np.multiply(vi, w, out=idx)
+        idx += ui
+        np.less(px, 0, out=m.bad)
+        m.bad |= ui >= w
+        m.bad |= py < 0
+        m.bad |= vi >= h
+        m.bad |= depth == 0
+        np.copyto(idx, h * w, where=m.bad)
+
+        flat = m.flat
+        flat.fill(0)
+        flat[idx.ravel()] = depth.ravel()
+        return m.out
+
+    def align(self, frames: FrameSet, factor: int, depth_intr: Intrinsics,
+              color_intr: Intrinsics, extr: Extrinsics,
+              depth_scale: float) -> FrameSet:
+        """Return *frames* (already decimated by *factor*) with depth on the colour grid."""
+        if frames.depth is None or frames.color is None:
+            return frames
+        if self.is_identity(depth_intr, color_intr, extr):
+            return frames
+        aligned = self.reproject(frames.depth, frames.color.shape[:2], depth_intr,
+                                 color_intr, extr, depth_scale, factor)
+        return FrameSet(
+            color=frames.color,
+            depth=aligned,
+            infrared=frames.infrared,
+            timestamp_ms=frames.timestamp_ms,
+            frame_number=frames.frame_number,
+        )
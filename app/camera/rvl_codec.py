@@ -0,0 +1,199 @@
+"""Lossless RVL-style depth compression, vectorised with NumPy.
+
+RVL (Wilson, "Fast Lossless Depth Image Compression", 2017) exploits the
+two things depth images are full of: runs of invalid (zero) pixels and
+small differences between neighbouring valid pixels. A frame is coded as
+
+    runs    (zeros, non-zeros) run-length pairs over the raster scan
+    deltas  each valid pixel minus the previous valid pixel, zig-zag
+            mapped to unsigned
+
+and every number is written as a variable-length code of 3-bit nibbles
+with a continuation bit. The reference coder interleaves each run pair
+with its deltas, which forces a sequential decoder; here all run pairs
+come first and all deltas after them, so both directions are a handful of
+whole-array NumPy operations and decoding needs no Python loop.
+
+Payload layout (little-endian):
+
+    uint32 run_pairs   number of (zeros, non-zeros) pairs
+    uint32 nibbles     number of 4-bit codes that follow
+    bytes              nibbles packed two per byte, high nibble first
+"""
+import struct
+
+import numpy as np
+
+_HEADER = struct.Struct("<II")
+
+# A value v needs k nibbles where 8**(k-1) <= v < 8**k; depth deltas
+# (17 bits zig-zagged) and run lengths (<= W*H) fit in 7.
+_MAX_NIBBLES = 7
+# Below one wide symbol in _SPARSE, the wide ones are handled on their own.
+_SPARSE = 8
+
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    return ((values << 1) ^ (values >> 31)).view(np.uint32)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    values = values.view(np.int32)
+    return (values >> 1) ^ -(values & 1)
+
+
+def _wide_digits(rest: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Split *rest* (values >= 1) into 3-bit digits, least significant first.
+
+    Returns (digits, counts): the continuation-flagged nibbles of every value
+    back to back, and how many each value produced.
+    """
+    widest = 1
+    while widest < _MAX_NIBBLES and (rest >> (3 * widest)).any():
+        widest += 1
+    shifts = np.arange(widest, dtype=np.uint32) * 3
+    table  = ((rest[:, None] >> shifts) & 7).astype(np.uint8)
+    counts = np.ones(rest.size, dtype=np.int64)
+    for k in range(1, widest):
+        counts += rest >= (1 << (3 * k))
+    column = np.arange(widest)
+    table |= (column < (counts - 1)[:, None]).astype(np.uint8) << 3
+    return table[column < counts[:, None]], counts
+
+
+def _encode_varints(symbols: np.ndarray) -> np.ndarray:
+    """Variable-length code *symbols* (uint32); returns one nibble per uint8.
+
+    Depth deltas mostly fit in one nibble. The first nibble of every symbol
+    is written in one pass; when few symbols are wider, their remaining
+    nibbles are spliced in after it, otherwise every nibble is scattered
+    to its offset, one digit position per pass.
+    """
+    nibbles = np.empty(symbols.size, dtype=np.uint8)
+    np.bitwise_and(symbols, 7, out=nibbles, casting="unsafe")
+    wide = np.flatnonzero(symbols >= 8)
+    if not wide.size:
+        return nibbles
+    nibbles[wide] |= 8
+    if wide.size * _SPARSE < symbols.size:
+        digits, counts = _wide_digits(symbols[wide] >> 3)
+        return np.insert(nibbles, np.repeat(wide + 1, counts), digits)
+
+    # levels[k-1]: indices of the symbols that have a nibble k
+    levels = []
+    level  = wide
+    while level.size:
+        levels.append(level)
+        level = level[symbols[level] >= (1 << (3 * (len(levels) + 1)))]
+    counts = np.ones(symbols.size, dtype=np.uint8)
+    for level in levels:
+        counts[level] += 1
+    starts = np.cumsum(counts, dtype=np.int32) - counts
+    out = np.empty(int(starts[-1]) + int(counts[-1]), dtype=np.uint8)
+    out[starts] = nibbles
+    for k, level in enumerate(levels, 1):
+        digit = ((symbols[level] >> (3 * k)) & 7).astype(np.uint8)
+        if k < len(levels):
+            digit |= (counts[level] > k + 1).view(np.uint8) << 3
+        out[starts[level] + k] = digit
+    return out
+
+
+def _pack(nibbles: np.ndarray) -> bytes:
+    if nibbles.size % 2:
+        nibbles = np.append(nibbles, np.uint8(0))
+    return ((nibbles[0::2] << 4) | nibbles[1::2]).tobytes()
+
+
+def _decode_varints(data, total: int) -> np.ndarray:
+    packed  = np.frombuffer(data, dtype=np.uint8)
+    nibbles = np.empty(packed.size * 2, dtype=np.uint8)
+    nibbles[0::2] = packed >> 4
+    nibbles[1::2] = packed & 15
+    nibbles = nibbles[:total]
+
+    # Every nibble after one with the continuation bit is a tail digit
+    tails = np.flatnonzero(nibbles >= 8) + 1
+    if not tails.size:
+        return nibbles.astype(np.uint32)
+    if tails.size * _SPARSE >= total:
+        return _decode_dense(nibbles)
+
+    is_head = np.ones(total, dtype=bool)
+    is_head[tails] = False
+    symbols = (nibbles[is_head] & 7).astype(np.uint32)
+
+    # Tail j belongs to the symbol whose head precedes it; k is its digit
+    # position, counted along chains of consecutive tails.
+    owner  = tails - np.arange(1, tails.size + 1)
+    chain  = np.empty(tails.size, dtype=bool)
+    chain[0]  = False
+    chain[1:] = tails[1:] == tails[:-1] + 1
+    first  = np.flatnonzero(~chain)
+    k = np.arange(tails.size) - np.repeat(first, np.diff(np.append(first, tails.size))) + 1
+    digits = (nibbles[tails] & 7).astype(np.uint32) << (3 * k).astype(np.uint32)
+    # Within one digit position every owner is distinct, so plain fancy
+    # indexing is safe there (and much faster than np.bitwise_or.at).
+    for position in range(1, int(k.max()) + 1):
+        level = k == position
+        symbols[owner[level]] |= digits[level]
+    return symbols
+
+
+def _decode_dense(nibbles: np.ndarray) -> np.ndarray:
+    """Decode a nibble stream in which many symbols span several nibbles."""
+    last    = np.flatnonzero(nibbles < 8)
+    starts  = np.empty_like(last)
+    starts[0]  = 0
+    starts[1:] = last[:-1] + 1
+    lengths = last - starts + 1
+
+    digits  = nibbles & 7
+    symbols = digits[starts].astype(np.uint32)
+    level   = np.flatnonzero(lengths > 1)
+    k = 1
+    while level.size:
+        symbols[level] |= digits[starts[level] + k].astype(np.uint32) << (3 * k)
+        k += 1
+        level = level[lengths[level] > k]
+    return symbols
+
+
+def encode_depth(depth: np.ndarray) -> bytes:
+    """Compress one z16 depth image (H x W uint16) losslessly."""
+    flat  = np.ascontiguousarray(depth).reshape(-1)
+    valid = flat != 0
+
+    # Run boundaries: indices where validity flips, framed by 0 and size.
+    # The first run is always a zero run (possibly empty).
+    flips = np.flatnonzero(valid[1:] != valid[:-1]) + 1
+    edges = np.concatenate(([0], flips, [flat.size]))
+    runs  = np.diff(edges)
+    if valid[0]:
+        runs = np.concatenate(([0], runs))
+    if runs.size % 2:
+        runs = np.append(runs, 0)
+
+    values = flat[valid].astype(np.int32)
+    deltas = np.empty_like(values)
+    if values.size:
+        deltas[0] = values[0]
+        np.subtract(values[1:], values[:-1], out=deltas[1:])
+
+    nibbles = np.concatenate((_encode_varints(runs.astype(np.uint32)),
+                              _encode_varints(_zigzag(deltas))))
+    return _HEADER.pack(runs.size // 2, nibbles.size) + _pack(nibbles)
+
+
+def decode_depth(data: bytes, width: int, height: int) -> np.ndarray:
+    """Reconstruct the H x W uint16 depth image encoded by encode_depth()."""
+    pairs, total = _HEADER.unpack_from(data)
+    symbols = _decode_varints(memoryview(data)[_HEADER.size:], total)
+    runs    = symbols[:2 * pairs].astype(np.int64)
+    values  = np.cumsum(_unzigzag(symbols[2 * pairs:]), dtype=np.int32)
+
+    depth = np.zeros(width * height, dtype=np.uint16)
+    valid = np.repeat(np.tile(np.array([False, True]), pairs), runs)
+    depth[valid] = values
+    return depth.reshape(height, width)
@@ -0,0 +1,114 @@
+"""Per-stream frame accounting for recordings.
+
+Every frameset written to a bag is fed to a StreamStatsTracker, which keeps
+one counter per stream from the hardware timestamp and frame counter of
+that stream:
+
+    received    distinct frames (a frame the syncer repeats is not recounted)
+    gaps        intervals longer than 1.5 frame periods
+    dropped     frames missing in between — from the frame counter when it
+                advances, otherwise estimated from the timestamp gap
+    max_gap_ms  longest interval between two received frames
+
+writer_dropped counts framesets the writer discarded because it fell
+behind; those also show up as gaps/drops in the per-stream counters.
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.camera.frame_source import FrameSet, StreamInfo
+
+STREAMS = ("color", "depth", "infrared")
+
+
+@dataclass
+class StreamStats:
+    received: int = 0
+    gaps: int = 0
+    dropped: int = 0
+    max_gap_ms: float = 0.0
+
+
+@dataclass
+class RecordingStats:
+    streams: dict[str, StreamStats] = field(default_factory=dict)
+    writer_dropped: int = 0
+
+    @property
+    def total_dropped(self) -> int:
+        return sum(s.dropped for s in self.streams.values())
+
+    def summary(self) -> str:
+        """Short human-readable form, e.g. "color 0 · depth 2 · infrared 0 dropped"."""
+        parts = [f"{name} {s.dropped}" for name, s in self.streams.items()]
+        text = " · ".join(parts) + " dropped" if parts else "no frames"
+        if self.writer_dropped:
+            text += f" (writer {self.writer_dropped})"
+        return text
+
+
+class _StreamCounter:
+    def __init__(self, fps: int):
+        self.stats = StreamStats()
+        self._interval_ms = 1000.0 / fps if fps > 0 else 0.0
+        self._last_ts: Optional[float] = None
+        self._last_number: Optional[int] = None
+
+    def update(self, timestamp_ms: float, frame_number: int) -> None:
+        stats = self.stats
+        if self._last_ts is not None:
+            if frame_number == self._last_number:
+                return
+            dt = timestamp_ms - self._last_ts
+            stats.max_gap_ms = max(stats.max_gap_ms, dt)
+            if self._interval_ms and dt > 1.5 * self._interval_ms:
+                stats.gaps += 1
+            if frame_number > self._last_number:
+                stats.dropped += frame_number - self._last_number - 1
+            elif self._interval_ms:
+                # Counter reset (e.g. sensor restart): fall back to time.
+                stats.dropped += max(0, round(dt / self._interval_ms) - 1)
+        stats.received += 1
+        self._last_ts = timestamp_ms
+        self._last_number = frame_number
+
+
+class StreamStatsTracker:
+    """Accumulates StreamStats for the streams described by set_streams()."""
+
+    def __init__(self):
+        self._counters: dict[str, _StreamCounter] = {}
+
+    def set_streams(self, streams: dict[str, StreamInfo]) -> None:
+        self._counters = {name: _StreamCounter(streams[name].fps)
+                          for name in STREAMS if name in streams}
+
+    def update(self, frames: FrameSet) -> None:
+        for name, counter in self._counters.items():
+            if getattr(frames, name) is None:
+                continue
+            clock = frames.stream_clock.get(name) if frames.stream_clock else None
+            if clock is None:
+                clock = (frames.timestamp_ms, frames.frame_number)
+            counter.update(*clock)
+
+    def snapshot(self, writer_dropped: int = 0) -> RecordingStats:
+        return RecordingStats(
+            streams={name: StreamStats(**vars(c.stats))
+                     for name, c in self._counters.items()},
+            writer_dropped=writer_dropped,
+        )
+
+
+def merge_stats(stats: list[RecordingStats]) -> RecordingStats:
+    """Sum the stats of several cameras' recordings, stream by stream."""
+    merged = RecordingStats()
+    for s in stats:
+        merged.writer_dropped += s.writer_dropped
+        for name, src in s.streams.items():
+            dst = merged.streams.setdefault(name, StreamStats())
+            dst.received  += src.received
+            dst.gaps      += src.gaps
+            dst.dropped   += src.dropped
+            dst.max_gap_ms = max(dst.max_gap_ms, src.max_gap_ms)
+    return merged
@@ -0,0 +1,93 @@
+"""Background thumbnailer — extracts and caches recording thumbnail strips."""
+import logging
+import queue
+import threading
+from typing import Optional
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from app.camera.thumbnails import extract_thumbnails, save_thumbnails, thumbnail_path
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailWorker(QObject):
+    """Extracts thumbnail strips of queued recordings on its own QThread.
+
+    A recording whose strip is already cached is skipped and one already
+    waiting is not queued twice, so tables can enqueue every row they show.
+    Use thumbnailer() for the shared instance.
+    """
+
+    thumbnails_ready = pyqtSignal(str)          # recording file path
+    error_occurred   = pyqtSignal(str, str)     # recording file path, message
+
+    def __init__(self):
+        super().__init__()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._queued: set[str] = set()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def enqueue(self, file_path: str) -> None:
+        """Make the strip of *file_path* in the background (thread-safe)."""
+        with self._lock:
+            if file_path in self._queued:
+                return
+            self._queued.add(file_path)
+        self._queue.put(file_path)
+
+    @pyqtSlot()
+    def run(self) -> None:
+        self._running = True
+        while self._running:
+            try:
+                file_path = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            with self._lock:
+                self._queued.discard(file_path)
+            path = thumbnail_path(file_path)
+            if path is None or path.exists():
+                continue
+            try:
+                strip = extract_thumbnails(file_path)
+                if strip is None:
+                    logger.info("No thumbnails for %s: no frames readable here.", file_path)
+                    self.error_occurred.emit(file_path, "No frames could be read.")
+                    continue
+                save_thumbnails(file_path, strip)
+            except Exception as exc:
+                logger.error("Thumbnails of %s failed: %s", file_path, exc)
+                self.error_occurred.emit(file_path, str(exc))
+                continue
+            self.thumbnails_ready.emit(file_path)
+
+    def stop(self) -> None:
+        self._running = False
+
+
+_thumbnailer: Optional[ThumbnailWorker] = None
+_thumbnailer_thread: Optional[QThread] = None
+
+
+def thumbnailer() -> ThumbnailWorker:
+    """The application-wide thumbnailer, started on first use."""
+    global _thumbnailer, _thumbnailer_thread
+    if _thumbnailer is None:
+        _thumbnailer = ThumbnailWorker()
+        _thumbnailer_thread = QThread()
+        _thumbnailer.moveToThread(_thumbnailer_thread)
+        _thumbnailer_thread.started.connect(_thumbnailer.run)
+        _thumbnailer_thread.start()
+    return _thumbnailer
+
+
+def stop_thumbnailer() -> None:
+    """Stop the shared thumbnailer (a strip in progress is finished first)."""
+    global _thumbnailer, _thumbnailer_thread
+    if _thumbnailer is not None:
+        _thumbnailer.stop()
+        _thumbnailer_thread.quit()
+        _thumbnailer_thread.wait(10000)
+    _thumbnailer = None
+    _thumbnailer_thread = None
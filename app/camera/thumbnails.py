@@ -0,0 +1,159 @@
+"""Thumbnail strips of recordings, extracted once and cached on disk.
+
+A strip is THUMB_COUNT evenly spaced framesets of a recording, colour on
+the top row and colorised depth below, THUMB_WIDTH pixels per frame. It
+is stored as a small PNG in THUMBNAIL_DIR named after the recording's
+path, size and mtime:
+
+    <sha1 of the absolute path>-<size>-<mtime_ns>.png
+
+so a lookup is one stat() and one exists(), and a recording that changes
+gets a new strip (the old one is deleted when the new one is written).
+Strips are only ever extracted by the ThumbnailWorker, off the UI thread.
+A recording split into chunks gets one strip across all of them, keyed
+by its first file.
+"""
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from PyQt6.QtGui import QImage
+
+from app.camera.chunked_recording import (
+    ChunkedFrameSource, load_recording_index, open_chunked, recording_index,
+)
+from app.camera.depth_colorizer import make_colorizer
+from app.camera.frame_index import seek_to
+from app.camera.frame_source import (
+    BagFileFrameSource, EndOfStream, FrameSet, FrameSource, REALSENSE_AVAILABLE,
+)
+from app.camera.rvl_file import RvlFileFrameSource
+from app.utils.app_dirs import THUMBNAIL_DIR
+
+logger = logging.getLogger(__name__)
+
+THUMB_COUNT = 6
+THUMB_WIDTH = 64
+
+
+def _path_key(file_path: str) -> str:
+    return hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+
+
+def thumbnail_path(file_path: str) -> Optional[Path]:
+    """Where the strip of *file_path* is cached, or None if the file is gone."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return THUMBNAIL_DIR / f"{_path_key(file_path)}-{st.st_size}-{st.st_mtime_ns}.png"
+
+
+def load_thumbnails(file_path: str) -> Optional[QImage]:
+    """The cached strip of *file_path*, or None if there is none up to date."""
+    path = thumbnail_path(file_path)
+    if path is None or not path.exists():
+        return None
+    image = QImage(str(path))
+    return None if image.isNull() else image
+
+
+# ---------------------------------------------------------------------- #
+# Extraction                                                               #
+# ---------------------------------------------------------------------- #
+
+def _open(file_path: str, decode: bool = True) -> Optional[FrameSource]:
+    if file_path.lower().endswith(".rvl"):
+        return RvlFileFrameSource(file_path, decode=decode)
+    if REALSENSE_AVAILABLE:
+        return BagFileFrameSource(file_path)
+    return None
+
+
+def _sample(image: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Nearest-neighbour resize of *image* to width x height."""
+    h, w = image.shape[:2]
+    rows = ((np.arange(height) + 0.5) * h / height).astype(np.intp)
+    cols = ((np.arange(width) + 0.5) * w / width).astype(np.intp)
+    return image[rows[:, None], cols]
+
+
+def _pick_framesets(source: FrameSource, file_path: str, count: int) -> list[FrameSet]:
+    """*count* evenly spaced framesets, using the frame index when there is one."""
+    index = load_recording_index(file_path)
+    if index is None and isinstance(source, ChunkedFrameSource):
+        # Chunks cannot be sampled blind; index the ones that are not yet
+        index = recording_index(file_path, lambda path: _open(path, decode=False))
+    if index is not None and len(index):
+        picks = np.unique(((np.arange(count) + 0.5) * len(index) / count).astype(int))
+        return [f for f in (seek_to(source, index, int(i)) for i in picks) if f is not None]
+
+    if isinstance(source, RvlFileFrameSource):
+        total = len(source)
+        positions = ((np.arange(count) + 0.5) * total / count).astype(int)
+    else:
+        total = source.duration_ns()
+        positions = ((np.arange(count) + 0.5) * total / count).astype(np.int64)
+    framesets = []
+    for position in np.unique(positions):
+        source.seek(int(position))
+        try:
+            frames = source.wait_for_frames()
+        except EndOfStream:
+            break
+        if frames is not None:
+            framesets.append(frames)
+    return framesets
+
+
+def extract_thumbnails(file_path: str, count: int = THUMB_COUNT,
+                       width: int = THUMB_WIDTH) -> Optional[np.ndarray]:
+    """Decode *count* framesets of *file_path* into a BGR strip
+    (2 x height, count x width, 3); None if the file cannot be read here."""
+    source = open_chunked(file_path, _open)
+    if source is None:
+        return None
+    source.start()
+    try:
+        framesets = _pick_framesets(source, file_path, count)
+    finally:
+        source.stop()
+    if not framesets:
+        return None
+
+    ref = next((f.depth if f.depth is not None else f.color for f in framesets
+                if f.depth is not None or f.color is not None), None)
+    if ref is None:
+        return None
+    height = max(1, round(width * ref.shape[0] / ref.shape[1]))
+    colorizer = make_colorizer("numpy", bgr=True)
+    strip = np.zeros((2 * height, count * width, 3), dtype=np.uint8)
+    for k, frames in enumerate(framesets):
+        x = k * width
+        if frames.color is not None:
+            strip[:height, x:x + width] = _sample(frames.color, width, height)
+        if frames.depth is not None:
+            depth = _sample(frames.depth, width, height)
+            colorizer.colorize_frames(FrameSet(depth=depth), strip[height:, x:x + width])
+    return strip
+
+
+def save_thumbnails(file_path: str, strip: np.ndarray) -> Optional[Path]:
+    """Cache *strip* for *file_path*, replacing strips of earlier versions."""
+    path = thumbnail_path(file_path)
+    if path is None:
+        return None
+    THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+    for old in THUMBNAIL_DIR.glob(f"{_path_key(file_path)}-*.png"):
+        old.unlink(missing_ok=True)
+    h, w, _ = strip.shape
+    strip = np.ascontiguousarray(strip)
+    image = QImage(strip.data, w, h, strip.strides[0], QImage.Format.Format_BGR888)
+    tmp = path.with_suffix(".tmp")
+    if not image.save(str(tmp), "PNG"):
+        raise OSError(f"Could not write {tmp}")
+    os.replace(tmp, path)
+    return path
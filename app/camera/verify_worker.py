@@ -0,0 +1,45 @@
+"""Background integrity check of a batch of recordings."""
+import logging
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from app.camera.recording_verify import VerifyJob, verify_many
+
+logger = logging.getLogger(__name__)
+
+
+class VerifyWorker(QObject):
+    """Runs verify_many() over *jobs* on its own QThread.
+
+    Results arrive one by one through result_ready (a VerifyResult) in
+    completion order; finished is emitted once all are done or after stop().
+    """
+
+    result_ready = pyqtSignal(object)       # VerifyResult
+    progress     = pyqtSignal(int, int)     # done, total
+    finished     = pyqtSignal()
+
+    def __init__(self, jobs: list[VerifyJob], workers: int = 4):
+        super().__init__()
+        self._jobs    = jobs
+        self._workers = workers
+        self._running = False
+
+    @pyqtSlot()
+    def run(self) -> None:
+        self._running = True
+        total = len(self._jobs)
+        done = 0
+        self.progress.emit(0, total)
+        try:
+            for result in verify_many(self._jobs, self._workers,
+                                      should_stop=lambda: not self._running):
+                done += 1
+                self.result_ready.emit(result)
+                self.progress.emit(done, total)
+        except Exception as exc:
+            logger.error("Verification stopped: %s", exc)
+        logger.info("Verified %d of %d recordings.", done, total)
+        self.finished.emit()
+
+    def stop(self) -> None:
+        self._running = False
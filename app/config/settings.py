@@ -16,6 +16,12 @@ class AppSettings:
     infrared_height: int
     infrared_fps: int
     preview_fps: int
+    preview_budget_pct: int
+    preroll_seconds: float
+    preroll_max_mb: int
+    recording_format: str
+    chunk_minutes: int
+    chunk_gb: float
 
 
 def load_settings() -> AppSettings:
@@ -38,6 +44,12 @@ def load_settings() -> AppSettings:
         infrared_height=int(d.get("infrared_height", 720)),
         infrared_fps=int(d.get("infrared_fps", 30)),
         preview_fps=int(d.get("preview_fps", 15)),
+        preview_budget_pct=int(d.get("preview_budget_pct", 25)),
+        preroll_seconds=float(d.get("preroll_seconds", 3)),
+        preroll_max_mb=int(d.get("preroll_max_mb", 512)),
+        recording_format=d.get("recording_format", "bag"),
+        chunk_minutes=int(d.get("chunk_minutes", 0)),
+        chunk_gb=float(d.get("chunk_gb", 0)),
     )
 
 
@@ -54,6 +66,12 @@ def save_settings(settings: AppSettings) -> None:
         "infrared_height": str(settings.infrared_height),
         "infrared_fps": str(settings.infrared_fps),
         "preview_fps": str(settings.preview_fps),
+        "preview_budget_pct": str(settings.preview_budget_pct),
+        "preroll_seconds": str(settings.preroll_seconds),
+        "preroll_max_mb": str(settings.preroll_max_mb),
+        "recording_format": settings.recording_format,
+        "chunk_minutes": str(settings.chunk_minutes),
+        "chunk_gb": str(settings.chunk_gb),
     }
     conn = get_connection()
     try:
@@ -43,3 +43,48 @@ class Recording:
     duration_seconds: Optional[float] = None
     file_size_bytes: Optional[int] = None
     notes: Optional[str] = None
+    # Per-stream frame accounting (None for recordings made before it existed)
+    color_frames: Optional[int] = None
+    color_gaps: Optional[int] = None
+    color_dropped: Optional[int] = None
+    depth_frames: Optional[int] = None
+    depth_gaps: Optional[int] = None
+    depth_dropped: Optional[int] = None
+    infrared_frames: Optional[int] = None
+    infrared_gaps: Optional[int] = None
+    infrared_dropped: Optional[int] = None
+    writer_dropped: Optional[int] = None
+    camera_serial: Optional[str] = None   # None if the device was not enumerated
+    # Last integrity check (see recording_verify); None if never verified
+    verify_status: Optional[str] = None
+    verify_message: Optional[str] = None
+    verified_at: Optional[str] = None
+
+    @property
+    def type_label(self) -> str:
+        """e.g. "Data · 123456789012", or just "Data" without a serial."""
+        label = self.recording_type.capitalize()
+        return f"{label} · {self.camera_serial}" if self.camera_serial else label
+
+    @property
+    def frames_dropped(self) -> Optional[int]:
+        """Total frames dropped across streams, or None if not recorded."""
+        counts = [self.color_dropped, self.depth_dropped, self.infrared_dropped]
+        if all(c is None for c in counts):
+            return None
+        return sum(c or 0 for c in counts)
+
+
+@dataclass
+class RecordingChunk:
+    """One file of a recording that was split into consecutive files."""
+    id: int
+    recording_id: int
+    chunk_index: int            # 0 is the recording's own file_path
+    file_path: str
+    started_at: str
+    start_timestamp_ms: Optional[float] = None   # camera clock of the first frameset
+    ended_at: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    framesets: Optional[int] = None
+    file_size_bytes: Optional[int] = None
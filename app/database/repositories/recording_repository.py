@@ -3,7 +3,10 @@ import sqlite3
 import os
 from typing import Optional, List
 from app.database.connection import get_connection
-from app.database.models import Recording
+from app.database.models import Recording, RecordingChunk
+
+# Stream names whose frame counters are stored as <stream>_frames/_gaps/_dropped
+_STAT_STREAMS = ("color", "depth", "infrared")
 
 
 def _row_to_recording(row: sqlite3.Row) -> Recording:
@@ -17,17 +20,47 @@ def _row_to_recording(row: sqlite3.Row) -> Recording:
         duration_seconds=row["duration_seconds"],
         file_size_bytes=row["file_size_bytes"],
         notes=row["notes"],
+        color_frames=row["color_frames"],
+        color_gaps=row["color_gaps"],
+        color_dropped=row["color_dropped"],
+        depth_frames=row["depth_frames"],
+        depth_gaps=row["depth_gaps"],
+        depth_dropped=row["depth_dropped"],
+        infrared_frames=row["infrared_frames"],
+        infrared_gaps=row["infrared_gaps"],
+        infrared_dropped=row["infrared_dropped"],
+        writer_dropped=row["writer_dropped"],
+        camera_serial=row["camera_serial"],
+        verify_status=row["verify_status"],
+        verify_message=row["verify_message"],
+        verified_at=row["verified_at"],
+    )
+
+
+def _row_to_chunk(row: sqlite3.Row) -> RecordingChunk:
+    return RecordingChunk(
+        id=row["id"],
+        recording_id=row["recording_id"],
+        chunk_index=row["chunk_index"],
+        file_path=row["file_path"],
+        started_at=row["started_at"],
+        start_timestamp_ms=row["start_timestamp_ms"],
+        ended_at=row["ended_at"],
+        duration_seconds=row["duration_seconds"],
+        framesets=row["framesets"],
+        file_size_bytes=row["file_size_bytes"],
     )
 
 
 def create(session_id: int, recording_type: str, file_path: str,
-           started_at: str) -> Recording:
+           started_at: str, camera_serial: Optional[str] = None) -> Recording:
     conn = get_connection()
     try:
         cursor = conn.execute(
-            "INSERT INTO recordings (session_id, recording_type, file_path, started_at) "
-            "VALUES (?, ?, ?, ?)",
-            (session_id, recording_type, file_path, started_at),
+            "INSERT INTO recordings "
+            "(session_id, recording_type, file_path, started_at, camera_serial) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (session_id, recording_type, file_path, started_at, camera_serial),
         )
         conn.commit()
         row = conn.execute(
@@ -39,8 +72,12 @@ def create(session_id: int, recording_type: str, file_path: str,
 
 
 def finalize(recording_id: int, ended_at: str, duration_seconds: float,
-             file_path: str) -> None:
-    """Update recording with end time, duration, and file size."""
+             file_path: str, stats=None) -> None:
+    """Update recording with end time, duration, and file size.
+
+    The size of a recording split into chunks is that of all its chunks.
+    *stats* (a RecordingStats) adds the per-stream frame/gap/drop totals.
+    """
     file_size = 0
     try:
         file_size = os.path.getsize(file_path)
@@ -49,11 +86,29 @@ def finalize(recording_id: int, ended_at: str, duration_seconds: float,
 
     conn = get_connection()
     try:
+        chunks, chunk_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(file_size_bytes), 0) FROM recording_chunks "
+            "WHERE recording_id=?", (recording_id,),
+        ).fetchone()
+        if chunks > 1:
+            file_size = chunk_bytes
         conn.execute(
             "UPDATE recordings SET ended_at=?, duration_seconds=?, file_size_bytes=? "
             "WHERE id=?",
             (ended_at, duration_seconds, file_size, recording_id),
         )
+        if stats is not None:
+            columns, values = ["writer_dropped=?"], [stats.writer_dropped]
+            for name in _STAT_STREAMS:
+                s = stats.streams.get(name)
+                if s is None:
+                    continue
+                columns += [f"{name}_frames=?", f"{name}_gaps=?", f"{name}_dropped=?"]
+                values += [s.received, s.gaps, s.dropped]
+            conn.execute(
+                f"UPDATE recordings SET {', '.join(columns)} WHERE id=?",
+                (*values, recording_id),
+            )
         conn.commit()
     finally:
         conn.close()
@@ -74,7 +129,8 @@ def list_for_session(session_id: int) -> List[Recording]:
     conn = get_connection()
     try:
         rows = conn.execute(
-            "SELECT * FROM recordings WHERE session_id = ? ORDER BY started_at",
+            "SELECT * FROM recordings WHERE session_id = ? "
+            "ORDER BY started_at, camera_serial",
             (session_id,),
         ).fetchall()
         return [_row_to_recording(r) for r in rows]
@@ -82,9 +138,106 @@ def list_for_session(session_id: int) -> List[Recording]:
         conn.close()
 
 
+def list_all() -> List[Recording]:
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            "SELECT * FROM recordings ORDER BY started_at, camera_serial"
+        ).fetchall()
+        return [_row_to_recording(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def set_verification(recording_id: int, status: str, message: str) -> None:
+    """Store the result of an integrity check, stamped with the current time."""
+    conn = get_connection()
+    try:
+        conn.execute(
+            "UPDATE recordings SET verify_status=?, verify_message=?, "
+            "verified_at=strftime('%Y-%m-%dT%H:%M:%SZ','now') WHERE id=?",
+            (status, message, recording_id),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------- #
+# Chunks                                                                   #
+# ---------------------------------------------------------------------- #
+
+def add_chunk(recording_id: int, chunk_index: int, file_path: str, started_at: str,
+              start_timestamp_ms: Optional[float] = None) -> None:
+    """Record that chunk *chunk_index* of a recording was opened."""
+    conn = get_connection()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO recording_chunks "
+            "(recording_id, chunk_index, file_path, started_at, start_timestamp_ms) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (recording_id, chunk_index, file_path, started_at, start_timestamp_ms),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def finalize_chunk(recording_id: int, chunk_index: int, ended_at: str,
+                   duration_seconds: float, framesets: int) -> None:
+    """Store the end time, duration, frameset count and size of a closed chunk."""
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            "SELECT file_path FROM recording_chunks WHERE recording_id=? AND chunk_index=?",
+            (recording_id, chunk_index),
+        ).fetchone()
+        if row is None:
+            return
+        try:
+            file_size = os.path.getsize(row["file_path"])
+        except OSError:
+            file_size = 0
+        conn.execute(
+            "UPDATE recording_chunks SET ended_at=?, duration_seconds=?, framesets=?, "
+            "file_size_bytes=? WHERE recording_id=? AND chunk_index=?",
+            (ended_at, duration_seconds, framesets, file_size, recording_id, chunk_index),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def list_chunks(recording_id: int) -> List[RecordingChunk]:
+    """The files of a recording in order: one unless it was split, none for
+    recordings made before recordings could be split."""
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            "SELECT * FROM recording_chunks WHERE recording_id = ? ORDER BY chunk_index",
+            (recording_id,),
+        ).fetchall()
+        return [_row_to_chunk(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def chunk_counts() -> dict[int, int]:
+    """recording id -> number of files, for every recording with chunk rows."""
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            "SELECT recording_id, COUNT(*) AS n FROM recording_chunks GROUP BY recording_id"
+        ).fetchall()
+        return {r["recording_id"]: r["n"] for r in rows}
+    finally:
+        conn.close()
+
+
 def delete_by_id(recording_id: int) -> None:
     conn = get_connection()
     try:
+        conn.execute("DELETE FROM recording_chunks WHERE recording_id = ?", (recording_id,))
         conn.execute("DELETE FROM recordings WHERE id = ?", (recording_id,))
         conn.commit()
     finally:
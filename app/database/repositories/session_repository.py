@@ -72,7 +72,10 @@ def list_with_recordings_for_subject(subject_id: int) -> List[dict]:
 
     Each row in the result is a dict with keys:
       session_id, session_started, session_ended, operator,
-      rec_id, recording_type, file_path, duration_seconds, file_size_bytes
+      rec_id, recording_type, file_path, duration_seconds, file_size_bytes,
+      color_dropped, depth_dropped, infrared_dropped, writer_dropped, camera_serial,
+      verify_status, verify_message, verified_at,
+      chunk_count (files the recording was split into; 0 if not recorded)
     Rows with no recordings still appear (rec_id will be None).
     """
     conn = get_connection()
@@ -88,12 +91,22 @@ def list_with_recordings_for_subject(subject_id: int) -> List[dict]:
                 r.recording_type,
                 r.file_path,
                 r.duration_seconds,
-                r.file_size_bytes
+                r.file_size_bytes,
+                r.color_dropped,
+                r.depth_dropped,
+                r.infrared_dropped,
+                r.writer_dropped,
+                r.camera_serial,
+                r.verify_status,
+                r.verify_message,
+                r.verified_at,
+                (SELECT COUNT(*) FROM recording_chunks c
+                 WHERE c.recording_id = r.id) AS chunk_count
             FROM sessions s
             JOIN users u ON u.id = s.operator_id
             LEFT JOIN recordings r ON r.session_id = s.id
             WHERE s.subject_id = ?
-            ORDER BY s.started_at DESC, r.recording_type
+            ORDER BY s.started_at DESC, r.recording_type, r.camera_serial
             """,
             (subject_id,),
         ).fetchall()
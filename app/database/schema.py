@@ -42,7 +42,35 @@ CREATE TABLE IF NOT EXISTS recordings (
     ended_at TEXT,
     duration_seconds REAL,
     file_size_bytes INTEGER,
-    notes TEXT
+    notes TEXT,
+    color_frames INTEGER,
+    color_gaps INTEGER,
+    color_dropped INTEGER,
+    depth_frames INTEGER,
+    depth_gaps INTEGER,
+    depth_dropped INTEGER,
+    infrared_frames INTEGER,
+    infrared_gaps INTEGER,
+    infrared_dropped INTEGER,
+    writer_dropped INTEGER,
+    camera_serial TEXT,
+    verify_status TEXT,
+    verify_message TEXT,
+    verified_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS recording_chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recording_id INTEGER NOT NULL REFERENCES recordings(id),
+    chunk_index INTEGER NOT NULL,
+    file_path TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    start_timestamp_ms REAL,
+    ended_at TEXT,
+    duration_seconds REAL,
+    framesets INTEGER,
+    file_size_bytes INTEGER,
+    UNIQUE (recording_id, chunk_index)
 );
 
 CREATE TABLE IF NOT EXISTS settings (
@@ -53,6 +81,25 @@ CREATE TABLE IF NOT EXISTS settings (
 );
 """
 
+# Columns added after the first release: (table, column, type). Missing ones
+# are added to existing databases by _migrate().
+ADDED_COLUMNS = [
+    ("recordings", "color_frames", "INTEGER"),
+    ("recordings", "color_gaps", "INTEGER"),
+    ("recordings", "color_dropped", "INTEGER"),
+    ("recordings", "depth_frames", "INTEGER"),
+    ("recordings", "depth_gaps", "INTEGER"),
+    ("recordings", "depth_dropped", "INTEGER"),
+    ("recordings", "infrared_frames", "INTEGER"),
+    ("recordings", "infrared_gaps", "INTEGER"),
+    ("recordings", "infrared_dropped", "INTEGER"),
+    ("recordings", "writer_dropped", "INTEGER"),
+    ("recordings", "camera_serial", "TEXT"),
+    ("recordings", "verify_status", "TEXT"),
+    ("recordings", "verify_message", "TEXT"),
+    ("recordings", "verified_at", "TEXT"),
+]
+
 DEFAULT_SETTINGS = [
     ("output_directory", "C:/Users/marie/video_capture/recordings",
      "Root directory for storing .bag recordings"),
@@ -66,6 +113,12 @@ DEFAULT_SETTINGS = [
     ("infrared_height", "720", "Infrared stream height in pixels"),
     ("infrared_fps", "30", "Infrared stream frames per second"),
     ("preview_fps", "15", "Preview display frames per second"),
+    ("preview_budget_pct", "25", "Share of one CPU core the preview may use (halved while recording)"),
+    ("preroll_seconds", "3", "Seconds of frames buffered before Start and written to each recording"),
+    ("preroll_max_mb", "512", "Memory cap for the pre-roll buffer in MB"),
+    ("recording_format", "bag", "Recording file format: bag (RealSense) or rvl (compressed depth)"),
+    ("chunk_minutes", "0", "Start a new recording file every N minutes (0 = never)"),
+    ("chunk_gb", "0", "Start a new recording file every N GB (0 = never)"),
     ("theme", "deep_navy", "UI color theme (deep_navy | obsidian | slate_cyan)"),
 ]
 
@@ -76,6 +129,7 @@ def init_db() -> None:
     try:
         conn.executescript(DDL)
         conn.commit()
+        _migrate(conn)
         _seed_admin(conn)
         _seed_settings(conn)
         conn.commit()
@@ -84,6 +138,15 @@ def init_db() -> None:
         conn.close()
 
 
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Add columns from ADDED_COLUMNS that an older database is missing."""
+    for table, column, col_type in ADDED_COLUMNS:
+        existing = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+            logger.info("Added column %s.%s.", table, column)
+
+
 def _seed_admin(conn: sqlite3.Connection) -> None:
     """Insert default admin user if no admin exists."""
     row = conn.execute("SELECT id FROM users WHERE role='admin' LIMIT 1").fetchone()
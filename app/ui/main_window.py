@@ -7,6 +7,9 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 
 from app.auth import auth_service
+from app.camera.index_worker import stop_frame_indexer
+from app.camera.thumbnail_worker import stop_thumbnailer
+from app.config.settings import load_settings
 from app.database.models import Session, Subject
 from app.ui.themes import apply_theme, load_theme, THEME_KEYS, THEME_NAMES, palette
 from app.ui.screens.login_screen import LoginScreen
@@ -15,6 +18,7 @@ from app.ui.screens.session_history_screen import SessionHistoryScreen
 from app.ui.screens.recording_screen import RecordingScreen
 from app.ui.screens.session_review_screen import SessionReviewScreen
 from app.ui.screens.admin.admin_dashboard_screen import AdminDashboardScreen
+from app.ui.widgets.disk_preflight_dialog import confirm_output_disk
 
 logger = logging.getLogger(__name__)
 
@@ -129,6 +133,9 @@ class MainWindow(QMainWindow):
 
     def start_recording(self, subject: Subject) -> None:
         """Called by SessionHistoryScreen 'New Session' button."""
+        if not confirm_output_disk(load_settings(), self):
+            logger.info("New session cancelled: output disk check.")
+            return
         logger.info("Starting new recording session for: %s", subject.subject_code)
         self._recording.setup_session(subject)
         self._stack.setCurrentIndex(IDX_RECORDING)
@@ -161,4 +168,6 @@ class MainWindow(QMainWindow):
             self._recording.teardown()
         except Exception:
             pass
+        stop_frame_indexer()
+        stop_thumbnailer()
         super().closeEvent(event)
@@ -1,16 +1,21 @@
 """Admin tab: Application settings."""
 import logging
+import os
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QFormLayout, QLineEdit,
     QPushButton, QHBoxLayout, QLabel, QMessageBox,
-    QFileDialog, QSpinBox, QRadioButton, QButtonGroup
+    QFileDialog, QSpinBox, QDoubleSpinBox, QRadioButton, QButtonGroup, QComboBox
 )
 from PyQt6.QtCore import Qt
 from app.config.settings import load_settings, save_settings, AppSettings
 from app.ui.themes import THEME_KEYS, THEME_NAMES, load_theme
+from app.ui.widgets.disk_preflight_dialog import DiskPreflightDialog
 
 logger = logging.getLogger(__name__)
 
+# .rvl encoding takes about one core per camera at 1280x720 / 30 fps
+RVL_MIN_CPUS = 2
+
 
 class SettingsScreen(QWidget):
     def __init__(self, parent=None):
@@ -29,8 +34,13 @@ class SettingsScreen(QWidget):
         self.input_output_dir = QLineEdit()
         btn_browse = QPushButton("Browse…")
         btn_browse.clicked.connect(self._browse_dir)
+        btn_test = QPushButton("Test Write Speed")
+        btn_test.setObjectName("btn_secondary")
+        btn_test.setToolTip("Measure whether the directory keeps up with the stream settings below")
+        btn_test.clicked.connect(self._test_write_speed)
         dir_row.addWidget(self.input_output_dir)
         dir_row.addWidget(btn_browse)
+        dir_row.addWidget(btn_test)
         form.addRow("Output Directory:", dir_row)
 
         # Color stream
@@ -80,6 +90,56 @@ class SettingsScreen(QWidget):
         self.spin_preview_fps = QSpinBox()
         self.spin_preview_fps.setRange(1, 60)
         form.addRow("Preview FPS:", self.spin_preview_fps)
+        self.spin_preview_budget = QSpinBox()
+        self.spin_preview_budget.setRange(5, 100)
+        self.spin_preview_budget.setSingleStep(5)
+        self.spin_preview_budget.setSuffix(" % CPU")
+        self.spin_preview_budget.setToolTip(
+            "Share of one CPU core preview rendering may use; halved while recording. "
+            "The preview rate and resolution drop to stay within it.")
+        form.addRow("Preview Budget:", self.spin_preview_budget)
+
+        # Pre-roll
+        form.addRow(QLabel("<b>Pre-roll</b>"))
+        self.spin_preroll_s = QDoubleSpinBox()
+        self.spin_preroll_s.setRange(0.0, 10.0)
+        self.spin_preroll_s.setSingleStep(0.5)
+        self.spin_preroll_s.setSuffix(" s")
+        self.spin_preroll_mb = QSpinBox()
+        self.spin_preroll_mb.setRange(64, 8192)
+        self.spin_preroll_mb.setSingleStep(64)
+        self.spin_preroll_mb.setSuffix(" MB")
+        form.addRow("Pre-roll Length:", self.spin_preroll_s)
+        form.addRow("Pre-roll Memory Cap:", self.spin_preroll_mb)
+
+        # Recording format
+        form.addRow(QLabel("<b>Recording</b>"))
+        self.combo_format = QComboBox()
+        self.combo_format.addItem(".bag (RealSense)", "bag")
+        self.combo_format.addItem(".rvl (compressed depth)", "rvl")
+        self.combo_format.setToolTip(
+            ".rvl stores depth losslessly compressed and colour/IR zlib-compressed; "
+            "several times smaller than .bag, readable without the RealSense SDK. "
+            "Compressing 1280x720 at 30 fps takes a full CPU core per camera, two "
+            f"recommended (this PC has {os.cpu_count() or 1}); when it falls "
+            "behind, colour is stored uncompressed.")
+        form.addRow("File Format:", self.combo_format)
+        self.spin_chunk_min = QSpinBox()
+        self.spin_chunk_min.setRange(0, 240)
+        self.spin_chunk_min.setSuffix(" min")
+        self.spin_chunk_min.setSpecialValueText("Never")
+        self.spin_chunk_gb = QDoubleSpinBox()
+        self.spin_chunk_gb.setRange(0.0, 1000.0)
+        self.spin_chunk_gb.setSingleStep(0.5)
+        self.spin_chunk_gb.setSuffix(" GB")
+        self.spin_chunk_gb.setSpecialValueText("Never")
+        for spin in (self.spin_chunk_min, self.spin_chunk_gb):
+            spin.setToolTip(
+                "Long recordings are split into consecutive files of at most this "
+                "length or size; they play and export as one recording. One camera "
+                "writes ~166 MB/s of .bag at 1280x720, i.e. ~10 GB a minute.")
+        form.addRow("New File Every:", self.spin_chunk_min)
+        form.addRow("Or Every:", self.spin_chunk_gb)
 
         outer.addLayout(form)
 
@@ -134,6 +194,12 @@ class SettingsScreen(QWidget):
         self.spin_ir_h.setValue(s.infrared_height)
         self.spin_ir_fps.setValue(s.infrared_fps)
         self.spin_preview_fps.setValue(s.preview_fps)
+        self.spin_preview_budget.setValue(s.preview_budget_pct)
+        self.spin_preroll_s.setValue(s.preroll_seconds)
+        self.spin_preroll_mb.setValue(s.preroll_max_mb)
+        self.combo_format.setCurrentIndex(max(0, self.combo_format.findData(s.recording_format)))
+        self.spin_chunk_min.setValue(s.chunk_minutes)
+        self.spin_chunk_gb.setValue(s.chunk_gb)
 
     def _browse_dir(self) -> None:
         path = QFileDialog.getExistingDirectory(
@@ -142,8 +208,15 @@ class SettingsScreen(QWidget):
         if path:
             self.input_output_dir.setText(path)
 
-    def _on_save(self) -> None:
-        s = AppSettings(
+    def _test_write_speed(self) -> None:
+        s = self._form_settings()
+        if not s.output_directory:
+            QMessageBox.warning(self, "Validation", "Output directory cannot be empty.")
+            return
+        DiskPreflightDialog(s, parent=self).exec()
+
+    def _form_settings(self) -> AppSettings:
+        return AppSettings(
             output_directory=self.input_output_dir.text().strip(),
             color_width=self.spin_color_w.value(),
             color_height=self.spin_color_h.value(),
@@ -155,10 +228,25 @@ class SettingsScreen(QWidget):
             infrared_height=self.spin_ir_h.value(),
             infrared_fps=self.spin_ir_fps.value(),
             preview_fps=self.spin_preview_fps.value(),
+            preview_budget_pct=self.spin_preview_budget.value(),
+            preroll_seconds=self.spin_preroll_s.value(),
+            preroll_max_mb=self.spin_preroll_mb.value(),
+            recording_format=self.combo_format.currentData(),
+            chunk_minutes=self.spin_chunk_min.value(),
+            chunk_gb=self.spin_chunk_gb.value(),
         )
+
+    def _on_save(self) -> None:
+        s = self._form_settings()
         if not s.output_directory:
             QMessageBox.warning(self, "Validation", "Output directory cannot be empty.")
             return
+        if s.recording_format == "rvl" and (os.cpu_count() or 1) < RVL_MIN_CPUS:
+            QMessageBox.warning(
+                self, "Settings",
+                f"This PC has {os.cpu_count() or 1} CPU core(s). .rvl compression may "
+                "not keep up with the camera here; colour frames it cannot compress "
+                "in time are stored uncompressed, making files larger.")
         save_settings(s)
         logger.info("Settings saved.")
         QMessageBox.information(self, "Settings", "Settings saved successfully.")
@@ -11,6 +11,8 @@ import app.database.repositories.subject_repository as subject_repo
 import app.database.repositories.session_repository as session_repo
 from app.ui.widgets.subject_form_widget import SubjectFormDialog
 from app.database.models import Subject
+from app.ui.widgets.thumbnail_strip import ThumbnailStrip
+from app.ui.widgets.verify_recordings_dialog import VerifyRecordingsDialog
 from app.utils.viewer_utils import open_in_app_viewer
 
 
@@ -32,8 +34,13 @@ class SubjectBrowserScreen(QWidget):
         btn_new = QPushButton("+ New Subject")
         btn_new.setObjectName("btn_secondary")
         btn_new.clicked.connect(self._on_new_subject)
+        btn_verify = QPushButton("Verify Recordings")
+        btn_verify.setObjectName("btn_secondary")
+        btn_verify.setToolTip("Check every recording opens, is complete and matches the settings")
+        btn_verify.clicked.connect(self._on_verify)
         toolbar.addWidget(self.input_search)
         toolbar.addWidget(btn_new)
+        toolbar.addWidget(btn_verify)
         layout.addLayout(toolbar)
 
         self.table = QTableWidget(0, 5)
@@ -103,6 +110,10 @@ class SubjectBrowserScreen(QWidget):
         if dlg.exec():
             self._load_subjects(self.input_search.text().strip())
 
+    def _on_verify(self) -> None:
+        dlg = VerifyRecordingsDialog(self)
+        dlg.exec()
+
     def _edit_subject(self, subject: Subject) -> None:
         dlg = EditSubjectDialog(subject, self)
         if dlg.exec():
@@ -147,7 +158,7 @@ class SubjectSessionsDialog(QDialog):
     def __init__(self, subject: Subject, parent=None):
         super().__init__(parent)
         self.setWindowTitle(f"Sessions — {subject.subject_code}")
-        self.setMinimumSize(900, 480)
+        self.setMinimumSize(1240, 480)
         self._subject = subject
         self._build_ui()
         self._populate()
@@ -159,19 +170,20 @@ class SubjectSessionsDialog(QDialog):
         lbl.setObjectName("subject_label")
         layout.addWidget(lbl)
 
-        # Columns: Session | Date | Operator | Type | Duration | Size | File Path | Open
-        self.table = QTableWidget(0, 8)
+        # Columns: Session | Date | Operator | Type | Duration | Size | Preview | File Path | Open
+        self.table = QTableWidget(0, 9)
         self.table.setHorizontalHeaderLabels([
-            "Session", "Date", "Operator", "Type", "Duration", "Size", "File Path", ""
+            "Session", "Date", "Operator", "Type", "Duration", "Size", "Preview", "File Path", ""
         ])
         hh = self.table.horizontalHeader()
-        hh.setSectionResizeMode(6, QHeaderView.ResizeMode.Stretch)
-        hh.setSectionResizeMode(7, QHeaderView.ResizeMode.Fixed)
-        for col, w in [(0, 65), (1, 150), (2, 105), (3, 105), (4, 80), (5, 80), (7, 140)]:
+        hh.setSectionResizeMode(7, QHeaderView.ResizeMode.Stretch)
+        hh.setSectionResizeMode(8, QHeaderView.ResizeMode.Fixed)
+        for col, w in [(0, 65), (1, 150), (2, 105), (3, 105), (4, 80), (5, 80), (6, 400),
+                       (8, 140)]:
             self.table.setColumnWidth(col, w)
         vh = self.table.verticalHeader()
-        vh.setDefaultSectionSize(46)
-        vh.setMinimumSectionSize(46)
+        vh.setDefaultSectionSize(ThumbnailStrip.ROW_HEIGHT)
+        vh.setMinimumSectionSize(ThumbnailStrip.ROW_HEIGHT)
         vh.setVisible(False)
         self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
@@ -219,8 +231,12 @@ class SubjectSessionsDialog(QDialog):
                 f"{data['file_size_bytes'] / (1024*1024):.1f} MB"
                 if data["file_size_bytes"] is not None else "—"
             )
+            if (data["chunk_count"] or 0) > 1:
+                size += f" in {data['chunk_count']} files"
             date_str = (data["session_started"] or "")[:16].replace("T", " ")
             rec_type  = (data["recording_type"] or "").capitalize()
+            if data["camera_serial"]:
+                rec_type += f" · {data['camera_serial']}"
 
             self.table.setItem(row_idx, 0, _item(str(sid)))
             self.table.setItem(row_idx, 1, _item(date_str))
@@ -228,16 +244,24 @@ class SubjectSessionsDialog(QDialog):
             self.table.setItem(row_idx, 3, _item(rec_type))
             self.table.setItem(row_idx, 4, _item(dur))
             self.table.setItem(row_idx, 5, _item(size))
-            self.table.setItem(row_idx, 6, _item(data["file_path"] or ""))
+            path_item = _item(data["file_path"] or "")
+            if data["verify_status"]:
+                verified = (data["verified_at"] or "")[:16].replace("T", " ")
+                path_item.setToolTip(f"Verified {verified}: {data['verify_status']} — "
+                                     f"{data['verify_message'] or ''}")
+                if data["verify_status"] != "ok":
+                    path_item.setForeground(QColor("#e08050"))
+            self.table.setItem(row_idx, 7, path_item)
 
             file_path = data["file_path"] or ""
+            self.table.setCellWidget(row_idx, 6, ThumbnailStrip(file_path))
             btn_open = QPushButton("Open in Viewer")
             btn_open.setObjectName("btn_secondary")
             btn_open.setEnabled(bool(file_path) and os.path.exists(file_path))
             btn_open.clicked.connect(
                 lambda checked, fp=file_path: open_in_app_viewer(fp, self)
             )
-            self.table.setCellWidget(row_idx, 7, btn_open)
+            self.table.setCellWidget(row_idx, 8, btn_open)
 
         self.table.resizeRowsToContents()
         if not seen_sessions:
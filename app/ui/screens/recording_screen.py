@@ -1,11 +1,15 @@
 """Recording screen — state machine + left control panel + mode-aware preview."""
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum, auto
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QMessageBox, QSizePolicy
 )
+from functools import partial
+from typing import Optional
+
 from PyQt6.QtCore import Qt, QThread, pyqtSlot, pyqtSignal
 
 from app.database.models import Subject, Session, Recording
@@ -13,9 +17,16 @@ import app.database.repositories.session_repository as session_repo
 import app.database.repositories.recording_repository as recording_repo
 from app.auth.auth_service import current_user
 from app.config.settings import load_settings
+from app.utils.disk_preflight import required_bytes_per_second
 from app.utils.file_utils import build_output_path
-from app.camera.preview_worker import PreviewWorker, PreviewMode
+from app.camera.camera_service import CameraService, PreviewMode
+from app.camera.device_registry import device_registry
+from app.camera.index_worker import frame_indexer
+from app.camera.thumbnail_worker import thumbnailer
 from app.camera.recording_worker import RecordingWorker
+from app.camera.disk_space_monitor import DiskSpaceMonitor
+from app.camera.stream_stats import merge_stats
+from app.ui.widgets.camera_preview_grid import CameraPreviewGrid
 from app.ui.widgets.camera_preview_widget import CameraPreviewWidget
 from app.ui.widgets.recording_controls import RecordingControls
 
@@ -40,6 +51,27 @@ _STATE_PREVIEW_MODE = {
 }
 
 
+def _drops_suffix(stats) -> str:
+    dropped = stats.total_dropped
+    return f" ({dropped} frames dropped)" if dropped else ""
+
+
+@dataclass
+class _CameraChannel:
+    """One camera's preview service and, while recording, its writer."""
+    serial: Optional[str]           # None: whichever device the SDK picks
+    tile: CameraPreviewWidget
+    camera: CameraService
+    thread: QThread
+    rec_worker: Optional[RecordingWorker] = None
+    rec_thread: Optional[QThread] = None
+    recording: Optional[Recording] = None
+    pending: bool = False           # recording_stopped not yet received
+    duration: float = 0.0
+    stats: object = None
+    rate: object = None
+
+
 class RecordingScreen(QWidget):
     session_finished = pyqtSignal(object)
 
@@ -48,17 +80,23 @@ class RecordingScreen(QWidget):
         self._subject: Subject | None = None
         self._session: Session | None = None
         self._state = RecordingState.IDLE_NO_CALIBRATION
-        self._calibration_recording: Recording | None = None
-        self._data_recording: Recording | None = None
+        # One recording per camera for each type
+        self._calibration_recordings: list[Recording] = []
+        self._data_recordings: list[Recording] = []
         self._current_preview_mode = PreviewMode.CALIBRATION
 
-        self._preview_thread: QThread | None = None
-        self._preview_worker: PreviewWorker | None = None
-        self._rec_thread: QThread | None = None
-        self._rec_worker: RecordingWorker | None = None
+        self._channels: list[_CameraChannel] = []
+        self._recording_channels: list[_CameraChannel] = []
+        self._disk_monitor: Optional[DiskSpaceMonitor] = None
+        self._disk_thread: Optional[QThread] = None
+        self._stopped_for_space = False
 
         self._build_ui()
 
+        registry = device_registry()
+        registry.device_connected.connect(self._on_device_connected)
+        registry.device_disconnected.connect(self._on_device_disconnected)
+
     def _build_ui(self) -> None:
         root = QVBoxLayout(self)
         root.setContentsMargins(0, 0, 0, 0)
@@ -78,6 +116,9 @@ class RecordingScreen(QWidget):
         self.lbl_preview_hint.setStyleSheet("color: #667799; font-size: 11px;")
         self.lbl_preview_hint.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
+        self.lbl_preview_rate = QLabel("")
+        self.lbl_preview_rate.setStyleSheet("color: #667799; font-size: 11px;")
+
         self.btn_logout = QPushButton("Logout")
         self.btn_logout.setObjectName("btn_danger")
         self.btn_logout.clicked.connect(self._on_logout)
@@ -86,6 +127,8 @@ class RecordingScreen(QWidget):
         header_layout.addStretch()
         header_layout.addWidget(self.lbl_preview_hint)
         header_layout.addStretch()
+        header_layout.addWidget(self.lbl_preview_rate)
+        header_layout.addSpacing(16)
         header_layout.addWidget(self.btn_logout)
         root.addWidget(header)
 
@@ -97,7 +140,7 @@ class RecordingScreen(QWidget):
         self.controls = RecordingControls()
         content.addWidget(self.controls)
 
-        self.preview = CameraPreviewWidget()
+        self.preview = CameraPreviewGrid()
         self.preview.setSizePolicy(
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
         )
@@ -122,8 +165,8 @@ class RecordingScreen(QWidget):
         self._subject = subject
         user = current_user()
         self._session = session_repo.create(subject.id, user.id)
-        self._calibration_recording = None
-        self._data_recording = None
+        self._calibration_recordings = []
+        self._data_recordings = []
         self.controls.lbl_calibration_status.setText("Calibration: —")
         self.controls.lbl_data_status.setText("Data: —")
         self.lbl_subject.setText(f"Subject: {subject.subject_code}")
@@ -131,8 +174,8 @@ class RecordingScreen(QWidget):
         self._start_preview(PreviewMode.CALIBRATION)
 
     def teardown(self) -> None:
-        self._stop_preview()
         self._stop_recording_worker()
+        self._stop_camera()
 
     # ------------------------------------------------------------------ #
     # State machine                                                        #
@@ -198,9 +241,9 @@ class RecordingScreen(QWidget):
         )
         if reply != QMessageBox.StandardButton.Yes:
             return
-        if self._calibration_recording:
-            recording_repo.delete_by_id(self._calibration_recording.id)
-            self._calibration_recording = None
+        for rec in self._calibration_recordings:
+            recording_repo.delete_by_id(rec.id)
+        self._calibration_recordings = []
         self.controls.lbl_calibration_status.setText("Calibration: —")
         self._set_state(RecordingState.IDLE_NO_CALIBRATION)
         self._restart_preview_if_mode_changed(PreviewMode.CALIBRATION)
@@ -220,9 +263,9 @@ class RecordingScreen(QWidget):
         )
         if reply != QMessageBox.StandardButton.Yes:
             return
-        if self._data_recording:
-            recording_repo.delete_by_id(self._data_recording.id)
-            self._data_recording = None
+        for rec in self._data_recordings:
+            recording_repo.delete_by_id(rec.id)
+        self._data_recordings = []
         self.controls.lbl_data_status.setText("Data: —")
         self._set_state(RecordingState.IDLE_CALIBRATION_DONE)
         self._restart_preview_if_mode_changed(PreviewMode.DATA)
@@ -252,71 +295,138 @@ class RecordingScreen(QWidget):
     # ------------------------------------------------------------------ #
 
     def _begin_recording(self, rec_type: str) -> None:
-        self._stop_preview()          # free the pipeline for the recording worker
+        self._start_preview(
+            PreviewMode.DATA if rec_type == "data" else PreviewMode.CALIBRATION)
 
         settings = load_settings()
-        file_path = build_output_path(
-            settings.output_directory,
-            self._subject.subject_code,
-            self._session.id,
-            rec_type,
-        )
         started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        multi = len(self._channels) > 1
+        recordings = []
+
+        # One writer per camera, each on its own thread, so a slow disk
+        # write on one bag never stalls another camera's pipeline.
+        for ch in self._channels:
+            file_path = build_output_path(
+                settings.output_directory,
+                self._subject.subject_code,
+                self._session.id,
+                rec_type,
+                ch.serial if multi else None,
+                settings.recording_format,
+            )
+            ch.recording = recording_repo.create(
+                self._session.id, rec_type, file_path, started_at,
+                camera_serial=ch.serial)
+            recordings.append(ch.recording)
+
+            ch.rec_worker = RecordingWorker(
+                file_path=file_path,
+                chunk_seconds=settings.chunk_minutes * 60.0,
+                chunk_bytes=int(settings.chunk_gb * 1e9))
+            ch.rec_thread = QThread()
+            ch.rec_worker.moveToThread(ch.rec_thread)
+            ch.rec_thread.started.connect(ch.rec_worker.run)
+            ch.rec_worker.recording_stopped.connect(
+                partial(self._on_recording_stopped, ch))
+            ch.rec_worker.stats_updated.connect(partial(self._on_stream_stats, ch))
+            ch.rec_worker.chunk_opened.connect(partial(self._on_chunk_opened, ch))
+            ch.rec_worker.chunk_closed.connect(partial(self._on_chunk_closed, ch))
+            ch.rec_worker.error_occurred.connect(partial(self._on_recording_error, ch))
+            ch.pending = True
+            ch.stats = None
+            ch.rec_thread.start()
+            # Attach to the running stream — no pipeline restart
+            ch.camera.attach_recorder(ch.rec_worker)
 
-        rec = recording_repo.create(self._session.id, rec_type, file_path, started_at)
         if rec_type == "calibration":
-            self._calibration_recording = rec
+            self._calibration_recordings = recordings
         else:
-            self._data_recording = rec
-
-        preview_mode = "data" if rec_type == "data" else "calibration"
-
-        self._rec_worker = RecordingWorker(
-            file_path=file_path,
-            color_width=settings.color_width,
-            color_height=settings.color_height,
-            color_fps=settings.color_fps,
-            depth_width=settings.depth_width,
-            depth_height=settings.depth_height,
-            depth_fps=settings.depth_fps,
-            infrared_width=settings.infrared_width,
-            infrared_height=settings.infrared_height,
-            infrared_fps=settings.infrared_fps,
-            preview_mode=preview_mode,
-            preview_fps=settings.preview_fps,
-        )
-        self._rec_thread = QThread()
-        self._rec_worker.moveToThread(self._rec_thread)
-        self._rec_thread.started.connect(self._rec_worker.run)
-        self._rec_worker.frame_ready.connect(self.preview.set_frame)
-        self._rec_worker.recording_stopped.connect(self._on_recording_stopped)
-        self._rec_worker.error_occurred.connect(self._on_recording_error)
-        self._rec_thread.start()
+            self._data_recordings = recordings
+        self._recording_channels = list(self._channels)
+        self._stopped_for_space = False
         self.controls.start_timer()
+        self._start_disk_monitor(settings, [r.file_path for r in recordings])
+
+    def _start_disk_monitor(self, settings, file_paths: list[str]) -> None:
+        expected = required_bytes_per_second(settings, len(file_paths))
+        self._disk_monitor = DiskSpaceMonitor(settings.output_directory, file_paths, expected)
+        self._disk_thread = QThread()
+        self._disk_monitor.moveToThread(self._disk_thread)
+        self._disk_thread.started.connect(self._disk_monitor.run)
+        self._disk_monitor.forecast_updated.connect(self.controls.show_disk_forecast)
+        self._disk_monitor.space_low.connect(self._on_disk_space_low)
+        self._disk_thread.start()
+
+    def _stop_disk_monitor(self) -> None:
+        if self._disk_monitor:
+            self._disk_monitor.stop()
+        if self._disk_thread:
+            self._disk_thread.quit()
+            self._disk_thread.wait(5000)
+        self._disk_monitor = None
+        self._disk_thread = None
 
     def _stop_recording_worker(self) -> None:
-        if self._rec_worker:
-            self._rec_worker.stop()
-        if self._rec_thread:
-            self._rec_thread.quit()
-            self._rec_thread.wait(5000)
-        self._rec_worker = None
-        self._rec_thread = None
+        self._stop_disk_monitor()
+        for ch in self._channels:
+            ch.camera.detach_recorder()
+        for ch in self._recording_channels:
+            if ch.rec_worker:
+                ch.rec_worker.stop()
+        for ch in self._recording_channels:
+            if ch.rec_thread:
+                ch.rec_thread.quit()
+                ch.rec_thread.wait(5000)
+            ch.rec_worker = None
+            ch.rec_thread = None
         self.controls.stop_timer()
 
-    @pyqtSlot(str, float)
-    def _on_recording_stopped(self, file_path: str, duration: float) -> None:
+    def _on_stream_stats(self, channel: _CameraChannel, stats) -> None:
+        channel.stats = stats
+        self.controls.show_stream_stats(merge_stats(
+            [ch.stats for ch in self._recording_channels if ch.stats is not None]))
+
+    def _on_chunk_opened(self, channel: _CameraChannel, chunk) -> None:
+        if channel.recording:
+            recording_repo.add_chunk(channel.recording.id, chunk.index, chunk.file_path,
+                                     chunk.started_at, chunk.start_timestamp_ms)
+
+    def _on_chunk_closed(self, channel: _CameraChannel, chunk) -> None:
         ended_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        if channel.recording:
+            recording_repo.finalize_chunk(channel.recording.id, chunk.index, ended_at,
+                                          chunk.duration_seconds, chunk.framesets)
+
+    def _on_recording_stopped(self, channel: _CameraChannel, file_path: str,
+                              duration: float, stats) -> None:
+        ended_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        if channel.recording:
+            recording_repo.finalize(
+                channel.recording.id, ended_at, duration, file_path, stats)
+        frame_indexer().enqueue(file_path)
+        thumbnailer().enqueue(file_path)
+        channel.pending  = False
+        channel.duration = duration
+        channel.stats    = stats
+        # Move on only once every camera's bag has been closed
+        if any(ch.pending for ch in self._recording_channels):
+            return
+
+        finished = self._recording_channels
+        self._recording_channels = []
         self.controls.stop_timer()
+        if not finished:
+            return
+        duration = max(ch.duration for ch in finished)
+        stats = merge_stats([ch.stats for ch in finished])
 
         if self._state == RecordingState.RECORDING_CALIBRATION:
-            if self._calibration_recording:
-                recording_repo.finalize(
-                    self._calibration_recording.id, ended_at, duration, file_path)
             self.controls.lbl_calibration_status.setText(
-                f"Calibration: {duration:.1f}s")
+                f"Calibration: {duration:.1f}s{_drops_suffix(stats)}")
             self._set_state(RecordingState.IDLE_CALIBRATION_DONE)
             self._start_preview(PreviewMode.CALIBRATION)
+            if self._stopped_for_space:
+                return      # no room for a data recording; the operator was told
 
             reply = QMessageBox.question(
                 self, "Calibration Complete",
@@ -328,65 +438,171 @@ class RecordingScreen(QWidget):
                 self._start_data()
 
         elif self._state == RecordingState.RECORDING_DATA:
-            if self._data_recording:
-                recording_repo.finalize(
-                    self._data_recording.id, ended_at, duration, file_path)
-            self.controls.lbl_data_status.setText(f"Data: {duration:.1f}s")
+            self.controls.lbl_data_status.setText(
+                f"Data: {duration:.1f}s{_drops_suffix(stats)}")
             self._set_state(RecordingState.BOTH_DONE)
             self._start_preview(PreviewMode.DATA)
 
     @pyqtSlot(str)
-    def _on_recording_error(self, message: str) -> None:
-        logger.error("Recording error: %s", message)
-        self.controls.stop_timer()
+    def _on_disk_space_low(self, message: str) -> None:
+        if not any(ch.rec_worker for ch in self._recording_channels):
+            return
+        # A normal stop: the writers drain their queues and close the files
+        # in the space the monitor kept in reserve.
+        self._stopped_for_space = True
+        self._stop_recording_worker()
+        QMessageBox.warning(self, "Output Disk Full", message)
+
+    def _on_recording_error(self, channel: _CameraChannel, message: str) -> None:
+        logger.error("Recording error (%s): %s", channel.serial or "camera", message)
+        self._mark_recording_failed(channel, message)
+        if not any(ch.rec_worker for ch in self._recording_channels):
+            return      # another camera's error already stopped the recording
+        # A recording is only usable with every camera, so stop them all
+        self._stop_recording_worker()
+        # The failed worker never sends recording_stopped; the others still
+        # finalise their rows when theirs arrives, after this.
+        for ch in self._recording_channels:
+            ch.pending = False
+        self._recording_channels = []
         QMessageBox.critical(self, "Recording Error", message)
-        if self._calibration_recording and self._data_recording:
+        if self._calibration_recordings and self._data_recordings:
             self._set_state(RecordingState.BOTH_DONE)
             self._start_preview(PreviewMode.DATA)
-        elif self._calibration_recording:
+        elif self._calibration_recordings:
             self._set_state(RecordingState.IDLE_CALIBRATION_DONE)
             self._start_preview(PreviewMode.CALIBRATION)
         else:
             self._set_state(RecordingState.IDLE_NO_CALIBRATION)
             self._start_preview(PreviewMode.CALIBRATION)
 
+    def _mark_recording_failed(self, channel: _CameraChannel, message: str) -> None:
+        """Finalise *channel*'s recording with its wall-clock length so far and
+        record the error as its verification result."""
+        recording = channel.recording
+        if recording is None:
+            return
+        now = datetime.now(timezone.utc)
+        started = datetime.strptime(recording.started_at, "%Y-%m-%dT%H:%M:%SZ")
+        duration = max(0.0, (now - started.replace(tzinfo=timezone.utc)).total_seconds())
+        recording_repo.finalize(recording.id, now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                                duration, recording.file_path, channel.stats)
+        recording_repo.set_verification(recording.id, "failed",
+                                        f"Recording error: {message}")
+
     # ------------------------------------------------------------------ #
-    # Preview lifecycle                                                    #
+    # Camera / preview lifecycle                                           #
     # ------------------------------------------------------------------ #
 
     def _start_preview(self, mode: PreviewMode) -> None:
+        """Show *mode* in the preview, starting the cameras if they aren't
+        streaming or the connected cameras changed."""
         self._current_preview_mode = mode
+        # No enumerable devices (or no SDK): open the default device and let
+        # the service report what is wrong.
+        serials = device_registry().serials() or [None]
+        if ([ch.serial for ch in self._channels] == serials
+                and all(ch.thread.isRunning() for ch in self._channels)):
+            for ch in self._channels:
+                ch.camera.set_preview_mode(mode)
+            return
+
+        self._stop_camera()
         settings = load_settings()
-        self._preview_worker = PreviewWorker(
-            color_width=settings.color_width,
-            color_height=settings.color_height,
-            color_fps=settings.color_fps,
-            preview_fps=settings.preview_fps,
-            mode=mode,
-        )
-        self._preview_thread = QThread()
-        self._preview_worker.moveToThread(self._preview_thread)
-        self._preview_thread.started.connect(self._preview_worker.run)
-        self._preview_worker.frame_ready.connect(self.preview.set_frame)
-        self._preview_worker.error_occurred.connect(self._on_preview_error)
-        self._preview_thread.start()
-
-    def _stop_preview(self) -> None:
-        if self._preview_worker:
-            self._preview_worker.stop()
-        if self._preview_thread:
-            self._preview_thread.quit()
-            self._preview_thread.wait(3000)
-        self._preview_worker = None
-        self._preview_thread = None
+        tiles = self.preview.set_cameras([s or "" for s in serials])
+        # The pre-roll memory cap is shared between the cameras
+        preroll_max_bytes = settings.preroll_max_mb * 1024 * 1024 // len(serials)
+
+        for serial, tile in zip(serials, tiles):
+            camera = CameraService(
+                color_width=settings.color_width,
+                color_height=settings.color_height,
+                color_fps=settings.color_fps,
+                depth_width=settings.depth_width,
+                depth_height=settings.depth_height,
+                depth_fps=settings.depth_fps,
+                infrared_width=settings.infrared_width,
+                infrared_height=settings.infrared_height,
+                infrared_fps=settings.infrared_fps,
+                preview_fps=settings.preview_fps,
+                preview_budget=settings.preview_budget_pct / 100.0 / len(serials),
+                mode=mode,
+                preroll_seconds=settings.preroll_seconds,
+                preroll_max_bytes=preroll_max_bytes,
+                serial=serial,
+            )
+            thread = QThread()
+            ch = _CameraChannel(serial=serial, tile=tile, camera=camera, thread=thread)
+            camera.moveToThread(thread)
+            thread.started.connect(camera.run)
+            camera.set_preview_size(tile.width(), tile.height())
+            # Direct: the service's thread is busy in run() and never idles
+            tile.display_resized.connect(
+                camera.set_preview_size, Qt.ConnectionType.DirectConnection)
+            tile.set_mailbox(camera.mailbox)
+            camera.frame_ready.connect(tile.pull_frame)
+            camera.error_occurred.connect(partial(self._on_preview_error, ch))
+            camera.preview_rate_changed.connect(partial(self._on_preview_rate, ch))
+            camera.error_occurred.connect(thread.quit)
+            # A finite source ends run(); a stopped thread is restarted by
+            # the next _start_preview()
+            camera.streaming_stopped.connect(thread.quit)
+            self._channels.append(ch)
+            thread.start()
+
+    def _stop_camera(self) -> None:
+        for ch in self._channels:
+            ch.tile.display_resized.disconnect(ch.camera.set_preview_size)
+            ch.camera.stop()
+        for ch in self._channels:
+            ch.thread.quit()
+            ch.thread.wait(3000)
+            ch.tile.set_mailbox(None)
+        self.lbl_preview_rate.setText("")
+        self._channels = []
 
     def _restart_preview_if_mode_changed(self, new_mode: PreviewMode) -> None:
-        """Restart preview only when the desired mode differs from the running one."""
-        if self._current_preview_mode != new_mode or self._preview_worker is None:
-            self._stop_preview()
-            self._start_preview(new_mode)
+        """Switch the preview mode of the running camera (no pipeline restart)."""
+        self._start_preview(new_mode)
+
+    def _on_preview_rate(self, channel: _CameraChannel, rate) -> None:
+        channel.rate = rate
+        # Show the camera whose preview is struggling most
+        rates = [ch.rate for ch in self._channels if ch.rate is not None]
+        if not rates:
+            return
+        rate = min(rates, key=lambda r: r.fps)
+        text = (f"Preview {rate.fps:.1f} fps · {rate.load * 100:.0f}% of "
+                f"{rate.budget * 100:.0f}% CPU budget")
+        if rate.scale > 1:
+            text += f" · 1/{rate.scale} res"
+        if len(self._channels) > 1:
+            text += f" · {len(self._channels)} cameras"
+        self.lbl_preview_rate.setText(text)
+
+    @pyqtSlot(object)
+    def _on_device_connected(self, info) -> None:
+        # Give a newly plugged-in camera a tile, but never mid-recording
+        if not self._channels or self._recording_channels:
+            return
+        if info.serial in {ch.serial for ch in self._channels}:
+            return
+        self._stop_camera()
+        self._start_preview(self._current_preview_mode)
 
     @pyqtSlot(str)
-    def _on_preview_error(self, message: str) -> None:
-        logger.warning("Preview error: %s", message)
-        self.preview.show_no_signal(f"Camera error: {message}")
+    def _on_device_disconnected(self, serial: str) -> None:
+        channel = next((ch for ch in self._channels if ch.serial == serial), None)
+        if channel is None:
+            return
+        channel.tile.show_no_signal(f"Camera {serial} disconnected")
+        if any(ch.rec_worker for ch in self._recording_channels):
+            self._on_recording_error(
+                channel, f"Camera {serial} was disconnected during the recording.")
+        # Rebuild the rig from the cameras still connected
+        self._stop_camera()
+        self._start_preview(self._current_preview_mode)
+
+    def _on_preview_error(self, channel: _CameraChannel, message: str) -> None:
+        logger.warning("Preview error (%s): %s", channel.serial or "camera", message)
+        channel.tile.show_no_signal(f"Camera error: {message}")
@@ -10,11 +10,34 @@ from PyQt6.QtGui import QColor
 
 import app.database.repositories.session_repository as session_repo
 from app.database.models import Subject
+from app.ui.widgets.thumbnail_strip import ThumbnailStrip
 from app.utils.viewer_utils import open_in_app_viewer
 
 logger = logging.getLogger(__name__)
 
 
+_STAT_STREAMS = ("color", "depth", "infrared")
+
+
+def _drops_item(data: dict, bg: QColor) -> QTableWidgetItem:
+    """Total dropped frames, highlighted when non-zero, per stream in the tooltip."""
+    counts = {name: data[f"{name}_dropped"] for name in _STAT_STREAMS}
+    item = QTableWidgetItem()
+    item.setBackground(bg)
+    if all(c is None for c in counts.values()):
+        item.setText("—")
+        return item
+    total = sum(c or 0 for c in counts.values())
+    item.setText(str(total))
+    tip = "\n".join(f"{name.capitalize()}: {c or 0}" for name, c in counts.items())
+    if data["writer_dropped"]:
+        tip += f"\nWriter fell behind: {data['writer_dropped']} framesets"
+    item.setToolTip(tip)
+    if total or data["writer_dropped"]:
+        item.setForeground(QColor("#ff6b6b"))
+    return item
+
+
 class SessionHistoryScreen(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -45,19 +68,22 @@ class SessionHistoryScreen(QWidget):
         self.lbl_hint.setWordWrap(True)
         layout.addWidget(self.lbl_hint)
 
-        # Columns: Session | Date | Operator | Type | Duration | File Size | File Path | Open
-        self.table = QTableWidget(0, 8)
+        # Columns: Session | Date | Operator | Type | Duration | File Size | Drops | Preview
+        #          | File Path | Open
+        self.table = QTableWidget(0, 10)
         self.table.setHorizontalHeaderLabels([
-            "Session", "Date", "Operator", "Type", "Duration", "Size", "File Path", ""
+            "Session", "Date", "Operator", "Type", "Duration", "Size", "Drops", "Preview",
+            "File Path", ""
         ])
         hh = self.table.horizontalHeader()
-        hh.setSectionResizeMode(6, QHeaderView.ResizeMode.Stretch)
-        hh.setSectionResizeMode(7, QHeaderView.ResizeMode.Fixed)
-        for col, w in [(0, 70), (1, 160), (2, 105), (3, 105), (4, 80), (5, 80), (7, 140)]:
+        hh.setSectionResizeMode(8, QHeaderView.ResizeMode.Stretch)
+        hh.setSectionResizeMode(9, QHeaderView.ResizeMode.Fixed)
+        for col, w in [(0, 70), (1, 160), (2, 105), (3, 105), (4, 80), (5, 80), (6, 70),
+                       (7, 400), (9, 140)]:
             self.table.setColumnWidth(col, w)
         vh = self.table.verticalHeader()
-        vh.setDefaultSectionSize(46)
-        vh.setMinimumSectionSize(46)
+        vh.setDefaultSectionSize(ThumbnailStrip.ROW_HEIGHT)
+        vh.setMinimumSectionSize(ThumbnailStrip.ROW_HEIGHT)
         vh.setVisible(False)
         self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
@@ -131,8 +157,13 @@ class SessionHistoryScreen(QWidget):
                 f"{data['file_size_bytes'] / (1024*1024):.1f} MB"
                 if data["file_size_bytes"] is not None else "—"
             )
+            if (data["chunk_count"] or 0) > 1:
+                size += f" in {data['chunk_count']} files"
+            drops = _drops_item(data, bg)
             date_str = (data["session_started"] or "")[:16].replace("T", " ")
             rec_type = (data["recording_type"] or "").capitalize()
+            if data["camera_serial"]:
+                rec_type += f" · {data['camera_serial']}"
 
             self.table.setItem(row_idx, 0, _item(str(sid)))
             self.table.setItem(row_idx, 1, _item(date_str))
@@ -140,16 +171,18 @@ class SessionHistoryScreen(QWidget):
             self.table.setItem(row_idx, 3, _item(rec_type))
             self.table.setItem(row_idx, 4, _item(dur))
             self.table.setItem(row_idx, 5, _item(size))
-            self.table.setItem(row_idx, 6, _item(data["file_path"] or ""))
+            self.table.setItem(row_idx, 6, drops)
+            self.table.setItem(row_idx, 8, _item(data["file_path"] or ""))
 
             file_path = data["file_path"] or ""
+            self.table.setCellWidget(row_idx, 7, ThumbnailStrip(file_path))
             btn_open = QPushButton("Open in Viewer")
             btn_open.setObjectName("btn_secondary")
             btn_open.setEnabled(bool(file_path) and os.path.exists(file_path))
             btn_open.clicked.connect(
                 lambda checked, fp=file_path: open_in_app_viewer(fp, self)
             )
-            self.table.setCellWidget(row_idx, 7, btn_open)
+            self.table.setCellWidget(row_idx, 9, btn_open)
 
         self.table.resizeRowsToContents()
 
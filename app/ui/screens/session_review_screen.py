@@ -7,6 +7,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 import app.database.repositories.recording_repository as recording_repo
 from app.database.models import Session, Subject
+from app.ui.widgets.thumbnail_strip import ThumbnailStrip
 from app.utils.viewer_utils import open_in_app_viewer
 
 
@@ -29,21 +30,22 @@ class SessionReviewScreen(QWidget):
         self.lbl_info = QLabel()
         layout.addWidget(self.lbl_info)
 
-        self.table = QTableWidget(0, 6)
+        self.table = QTableWidget(0, 7)
         self.table.setHorizontalHeaderLabels(
-            ["Type", "Started", "Duration", "File Size", "File Path", ""]
+            ["Type", "Started", "Duration", "File Size", "Preview", "File Path", ""]
         )
         hh = self.table.horizontalHeader()
-        hh.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
-        hh.setSectionResizeMode(5, QHeaderView.ResizeMode.Fixed)
+        hh.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
+        hh.setSectionResizeMode(6, QHeaderView.ResizeMode.Fixed)
         self.table.setColumnWidth(0, 110)
         self.table.setColumnWidth(1, 165)
         self.table.setColumnWidth(2, 90)
         self.table.setColumnWidth(3, 90)
-        self.table.setColumnWidth(5, 140)
+        self.table.setColumnWidth(4, 400)
+        self.table.setColumnWidth(6, 140)
         vh = self.table.verticalHeader()
-        vh.setDefaultSectionSize(46)
-        vh.setMinimumSectionSize(46)
+        vh.setDefaultSectionSize(ThumbnailStrip.ROW_HEIGHT)
+        vh.setMinimumSectionSize(ThumbnailStrip.ROW_HEIGHT)
         vh.setVisible(False)
         self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
@@ -80,11 +82,12 @@ class SessionReviewScreen(QWidget):
                 size_str = f"{rec.file_size_bytes / (1024*1024):.1f} MB"
             dur_str = f"{rec.duration_seconds:.1f}s" if rec.duration_seconds else "—"
 
-            self.table.setItem(row, 0, QTableWidgetItem(rec.recording_type.capitalize()))
+            self.table.setItem(row, 0, QTableWidgetItem(rec.type_label))
             self.table.setItem(row, 1, QTableWidgetItem(rec.started_at or "—"))
             self.table.setItem(row, 2, QTableWidgetItem(dur_str))
             self.table.setItem(row, 3, QTableWidgetItem(size_str))
-            self.table.setItem(row, 4, QTableWidgetItem(rec.file_path))
+            self.table.setCellWidget(row, 4, ThumbnailStrip(rec.file_path))
+            self.table.setItem(row, 5, QTableWidgetItem(rec.file_path))
 
             btn_open = QPushButton("Open in Viewer")
             btn_open.setObjectName("btn_secondary")
@@ -93,7 +96,7 @@ class SessionReviewScreen(QWidget):
                 lambda checked, fp=file_path: open_in_app_viewer(fp, self)
             )
             btn_open.setEnabled(os.path.exists(rec.file_path))
-            self.table.setCellWidget(row, 5, btn_open)
+            self.table.setCellWidget(row, 6, btn_open)
 
         self.table.resizeRowsToContents()
 
@@ -1,34 +1,56 @@
-"""In-app .bag file viewer dialog with play/pause and restart controls."""
+"""In-app .bag / .rvl file viewer dialog with a timeline, frame stepping and speed control."""
 import os
 import logging
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QSizePolicy
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QSizePolicy,
+    QSlider, QComboBox,
 )
-from PyQt6.QtCore import QThread
+from PyQt6.QtCore import Qt, QThread
 
 from app.camera.bag_playback_worker import BagPlaybackWorker
+from app.camera.chunked_recording import chunk_paths, load_recording_index
+from app.camera.frame_index import FrameIndex
+from app.camera.index_worker import frame_indexer
 from app.ui.widgets.camera_preview_widget import CameraPreviewWidget
 
 logger = logging.getLogger(__name__)
 
 
+def _format_time(seconds: float) -> str:
+    minutes, seconds = divmod(max(0.0, seconds), 60)
+    return f"{int(minutes)}:{seconds:04.1f}"
+
+
 class BagViewerDialog(QDialog):
-    """Plays back a .bag recording file using the built-in RealSense pipeline."""
+    """Plays back a .bag recording file using the built-in RealSense pipeline
+    (or an .rvl recording with the built-in reader).
+
+    The timeline and the step-back button need the recording's sidecar
+    frame index; if it is missing the file is queued on the background
+    indexer and they are enabled once it is written. A recording split
+    into chunks is played as one, from its first file.
+    """
 
     def __init__(self, file_path: str, parent=None):
         super().__init__(parent)
         self._file_path = file_path
         self._worker: BagPlaybackWorker | None = None
         self._thread:  QThread | None = None
+        self._index:   FrameIndex | None = None
         self._paused   = False
+        self._ended    = False
 
         fname = os.path.basename(file_path)
+        chunks = len(chunk_paths(file_path))
+        if chunks > 1:
+            fname += f" ({chunks} files)"
         self.setWindowTitle(f"Viewer — {fname}")
-        self.setMinimumSize(960, 580)
-        self.resize(1100, 650)
+        self.setMinimumSize(960, 600)
+        self.resize(1100, 680)
 
         self._build_ui()
         self._start_playback()
+        self._load_index()
 
     # ------------------------------------------------------------------ #
     # UI                                                                   #
@@ -45,25 +67,69 @@ class BagViewerDialog(QDialog):
         )
         layout.addWidget(self._preview)
 
+        # Timeline
+        timeline = QHBoxLayout()
+        self._lbl_position = QLabel(_format_time(0))
+        self._lbl_position.setStyleSheet("color: #8899bb; font-size: 11px;")
+        timeline.addWidget(self._lbl_position)
+
+        self._slider = QSlider(Qt.Orientation.Horizontal)
+        self._slider.setEnabled(False)
+        self._slider.valueChanged.connect(self._on_slider_changed)
+        timeline.addWidget(self._slider, stretch=1)
+
+        self._lbl_duration = QLabel("–:––")
+        self._lbl_duration.setStyleSheet("color: #8899bb; font-size: 11px;")
+        timeline.addWidget(self._lbl_duration)
+        layout.addLayout(timeline)
+
         # Control bar
         ctrl = QHBoxLayout()
 
         self._lbl_status = QLabel("Loading…")
         self._lbl_status.setStyleSheet("color: #8899bb; font-size: 11px;")
         ctrl.addWidget(self._lbl_status)
+
+        self._lbl_buffer = QLabel("")
+        self._lbl_buffer.setStyleSheet("color: #667799; font-size: 11px;")
+        self._lbl_buffer.setToolTip(
+            "Framesets decoded ahead of playback, how often playback had to "
+            "wait for the decoder, and frames shown late or skipped to keep "
+            "to the recording's timing")
+        ctrl.addWidget(self._lbl_buffer)
         ctrl.addStretch()
 
         self._btn_restart = QPushButton("Restart")
         self._btn_restart.setObjectName("btn_secondary")
-        self._btn_restart.setEnabled(False)
         self._btn_restart.clicked.connect(self._on_restart)
         ctrl.addWidget(self._btn_restart)
 
+        self._btn_back = QPushButton("◀ Frame")
+        self._btn_back.setObjectName("btn_secondary")
+        self._btn_back.setToolTip("Step back one frame (Left arrow)")
+        self._btn_back.setEnabled(False)
+        self._btn_back.clicked.connect(lambda: self._on_step(-1))
+        ctrl.addWidget(self._btn_back)
+
         self._btn_pause = QPushButton("Pause")
         self._btn_pause.setObjectName("btn_secondary")
         self._btn_pause.clicked.connect(self._on_pause_resume)
         ctrl.addWidget(self._btn_pause)
 
+        self._btn_forward = QPushButton("Frame ▶")
+        self._btn_forward.setObjectName("btn_secondary")
+        self._btn_forward.setToolTip("Step forward one frame (Right arrow)")
+        self._btn_forward.clicked.connect(lambda: self._on_step(1))
+        ctrl.addWidget(self._btn_forward)
+
+        self._combo_speed = QComboBox()
+        for speed in BagPlaybackWorker.SPEEDS:
+            self._combo_speed.addItem(f"{speed:g}×", speed)
+        self._combo_speed.setCurrentIndex(BagPlaybackWorker.SPEEDS.index(1.0))
+        self._combo_speed.setToolTip("Playback speed")
+        self._combo_speed.currentIndexChanged.connect(self._on_speed_changed)
+        ctrl.addWidget(self._combo_speed)
+
         btn_close = QPushButton("Close")
         btn_close.setObjectName("btn_secondary")
         btn_close.clicked.connect(self.close)
@@ -78,63 +144,163 @@ class BagViewerDialog(QDialog):
     def _start_playback(self) -> None:
         self._paused = False
         self._btn_pause.setText("Pause")
-        self._btn_pause.setEnabled(True)
-        self._btn_restart.setEnabled(False)
         self._lbl_status.setText("Playing…")
 
         self._worker = BagPlaybackWorker(self._file_path)
         self._thread = QThread()
         self._worker.moveToThread(self._thread)
         self._thread.started.connect(self._worker.run)
-        self._worker.frame_ready.connect(self._preview.set_frame)
+        self._worker.set_preview_size(self._preview.width(), self._preview.height())
+        self._preview.display_resized.connect(
+            self._worker.set_preview_size, Qt.ConnectionType.DirectConnection)
+        self._preview.set_mailbox(self._worker.mailbox)
+        self._worker.frame_ready.connect(self._preview.pull_frame)
+        self._worker.position_changed.connect(self._on_position_changed)
+        self._worker.stats_updated.connect(self._on_stats_updated)
         self._worker.playback_ended.connect(self._on_playback_ended)
         self._worker.error_occurred.connect(self._on_error)
         self._thread.start()
 
     def _stop_worker(self) -> None:
         if self._worker:
+            self._preview.display_resized.disconnect(self._worker.set_preview_size)
             self._worker.stop()
         if self._thread:
             self._thread.quit()
             self._thread.wait(3000)
+        self._preview.set_mailbox(None)
         self._worker = None
         self._thread = None
 
+    def _load_index(self) -> None:
+        index = load_recording_index(self._file_path)
+        if index is not None:
+            self._set_index(index)
+            return
+        indexer = frame_indexer()
+        indexer.index_ready.connect(self._on_index_ready)
+        indexer.enqueue(self._file_path)
+
+    def _set_index(self, index: FrameIndex) -> None:
+        self._index = index
+        if self._worker:
+            self._worker.set_index(index)
+        self._slider.blockSignals(True)
+        self._slider.setRange(0, max(0, len(index) - 1))
+        self._slider.blockSignals(False)
+        self._slider.setEnabled(len(index) > 1)
+        self._btn_back.setEnabled(len(index) > 1)
+        self._lbl_duration.setText(_format_time(index.duration_ms / 1000.0))
+
+    def _set_playing_state(self) -> None:
+        self._ended = False
+        self._btn_pause.setEnabled(True)
+        self._btn_pause.setText("Resume" if self._paused else "Pause")
+        self._lbl_status.setText("Paused" if self._paused else "Playing…")
+
     # ------------------------------------------------------------------ #
     # Slots                                                                #
     # ------------------------------------------------------------------ #
 
+    def _on_index_ready(self, file_path: str) -> None:
+        if file_path != self._file_path or self._index is not None:
+            return
+        frame_indexer().index_ready.disconnect(self._on_index_ready)
+        index = load_recording_index(file_path)
+        if index is not None:
+            self._set_index(index)
+
+    def _on_slider_changed(self, value: int) -> None:
+        # Only user changes get here; position updates block the signals.
+        # The worker coalesces the stream of seeks a drag produces.
+        if self._worker is None:
+            return
+        self._worker.seek(value)
+        if self._ended:
+            self._set_playing_state()
+
+    def _on_position_changed(self, i: int, seconds: float) -> None:
+        self._lbl_position.setText(_format_time(seconds))
+        if i >= 0 and not self._slider.isSliderDown():
+            self._slider.blockSignals(True)
+            self._slider.setValue(i)
+            self._slider.blockSignals(False)
+
+    def _on_stats_updated(self, stats) -> None:
+        text = f"· Buffer {stats.buffered}/{stats.capacity}"
+        if stats.underruns:
+            text += f" · {stats.underruns} underrun{'s' if stats.underruns != 1 else ''}"
+        if stats.late:
+            text += f" · {stats.late} late"
+            if stats.skipped:
+                text += f", {stats.skipped} skipped"
+        self._lbl_buffer.setText(text)
+
+    def _on_step(self, n: int) -> None:
+        if self._worker is None:
+            return
+        if n < 0 and self._index is None:
+            return
+        self._worker.step(n)
+        self._paused = True
+        if not self._ended or n < 0:
+            self._set_playing_state()
+
+    def _on_speed_changed(self, _index: int) -> None:
+        if self._worker:
+            self._worker.set_speed(self._combo_speed.currentData())
+
     def _on_pause_resume(self) -> None:
         if self._worker is None:
             return
         if self._paused:
             self._worker.resume()
             self._paused = False
-            self._btn_pause.setText("Pause")
-            self._lbl_status.setText("Playing…")
         else:
             self._worker.pause()
             self._paused = True
-            self._btn_pause.setText("Resume")
-            self._lbl_status.setText("Paused")
+        self._set_playing_state()
 
     def _on_restart(self) -> None:
-        self._stop_worker()
-        self._preview.show_no_signal("Restarting…")
-        self._start_playback()
+        if self._worker is None:
+            self._preview.show_no_signal("Restarting…")
+            self._start_playback()
+            self._worker.set_speed(self._combo_speed.currentData())
+            if self._index is not None:
+                self._worker.set_index(self._index)
+            return
+        self._worker.restart()
+        self._paused = False
+        self._set_playing_state()
 
     def _on_playback_ended(self) -> None:
+        self._ended = True
         self._lbl_status.setText("Playback complete")
         self._btn_pause.setEnabled(False)
-        self._btn_restart.setEnabled(True)
 
     def _on_error(self, message: str) -> None:
         logger.error("Bag viewer error: %s", message)
         self._lbl_status.setText(f"Error: {message}")
         self._btn_pause.setEnabled(False)
-        self._btn_restart.setEnabled(True)
         self._preview.show_no_signal(f"Error: {message}")
+        # The worker has exited; Restart opens the file again
+        self._stop_worker()
+
+    def keyPressEvent(self, event) -> None:
+        if event.key() == Qt.Key.Key_Left:
+            self._on_step(-1)
+        elif event.key() == Qt.Key.Key_Right:
+            self._on_step(1)
+        elif event.key() == Qt.Key.Key_Space:
+            self._on_pause_resume()
+        else:
+            super().keyPressEvent(event)
 
     def closeEvent(self, event) -> None:
+        if self._index is None:
+            try:
+                frame_indexer().index_ready.disconnect(self._on_index_ready)
+            except TypeError:
+                pass
         self._stop_worker()
         super().closeEvent(event)
@@ -0,0 +1,73 @@
+"""Tiled preview for one or more cameras."""
+from PyQt6.QtWidgets import QWidget, QGridLayout, QVBoxLayout, QLabel, QSizePolicy
+from PyQt6.QtCore import Qt
+
+from app.ui.widgets.camera_preview_widget import CameraPreviewWidget
+
+
+class CameraPreviewGrid(QWidget):
+    """One CameraPreviewWidget per camera, tiled.
+
+    A single camera gets the whole area exactly like a lone preview widget;
+    two are stacked, three or more fill a two-column grid. Each tile is
+    captioned with its camera label when there is more than one.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("background-color: #0d0d1a;")
+        self._grid = QGridLayout(self)
+        self._grid.setContentsMargins(0, 0, 0, 0)
+        self._grid.setSpacing(4)
+        self._labels: list[str] = []
+        self._tiles: list[CameraPreviewWidget] = []
+        self._cells: list[QWidget] = []
+        self.set_cameras([""])
+
+    @property
+    def tiles(self) -> list[CameraPreviewWidget]:
+        return list(self._tiles)
+
+    def set_cameras(self, labels: list[str]) -> list[CameraPreviewWidget]:
+        """Lay out one tile per entry of *labels* and return the tiles in order.
+
+        The existing tiles are kept when the labels have not changed.
+        """
+        labels = list(labels) or [""]
+        if labels == self._labels:
+            return self.tiles
+
+        for cell in self._cells:
+            self._grid.removeWidget(cell)
+            cell.deleteLater()
+        self._cells.clear()
+        self._tiles.clear()
+        self._labels = labels
+
+        multi   = len(labels) > 1
+        columns = 1 if len(labels) <= 2 else 2
+        for i, label in enumerate(labels):
+            cell = QWidget()
+            box = QVBoxLayout(cell)
+            box.setContentsMargins(0, 0, 0, 0)
+            box.setSpacing(2)
+            if multi:
+                caption = QLabel(label)
+                caption.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                caption.setStyleSheet("color: #8899bb; font-size: 11px;")
+                box.addWidget(caption)
+            tile = CameraPreviewWidget()
+            if multi:
+                tile.setMinimumSize(320, 180)
+            tile.setSizePolicy(
+                QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
+            )
+            box.addWidget(tile)
+            self._grid.addWidget(cell, i // columns, i % columns)
+            self._cells.append(cell)
+            self._tiles.append(tile)
+        return self.tiles
+
+    def show_no_signal(self, message: str = "No camera feed") -> None:
+        for tile in self._tiles:
+            tile.show_no_signal(message)
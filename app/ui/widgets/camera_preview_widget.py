@@ -1,11 +1,33 @@
-"""Camera preview widget — displays live QImage frames scaled to fit."""
+"""Camera preview widget — paints live pooled frames scaled to fit."""
+import time
+from collections import deque
+
 from PyQt6.QtWidgets import QLabel
-from PyQt6.QtGui import QImage, QPixmap, QPainter, QColor, QFont
-from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPainter, QColor, QFont
+from PyQt6.QtCore import Qt, QRect, QSize, pyqtSignal
+
+from app.camera.frame_mailbox import FrameMailbox
+from app.camera.frame_pool import PooledFrame
 
 
 class CameraPreviewWidget(QLabel):
-    """Displays camera frames scaled to fit. Supports overlay messages."""
+    """Displays camera frames scaled to fit. Supports overlay messages.
+
+    display_resized is emitted with the new (width, height) so frame
+    producers can render previews at display resolution.
+
+    Frames are PooledFrames: the current one is held until it has been
+    replaced, then released back to its producer's pool. Producers post
+    them to a FrameMailbox given to set_mailbox() and signal pull_frame(),
+    which schedules a repaint; paintEvent takes whichever frame is newest
+    and draws its QImage straight into a target rect that is only
+    recomputed on resize or when the frame size changes. The label text is
+    shown only while there is no frame.
+
+    The time spent in paintEvent is recorded; ui_time_ms() reports it.
+    """
+
+    display_resized = pyqtSignal(int, int)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -13,60 +35,110 @@ class CameraPreviewWidget(QLabel):
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setStyleSheet("background-color: #0d0d1a; color: #888888;")
         self.setText("No camera feed")
-        self._last_pixmap: QPixmap | None = None
+        self._frame: PooledFrame | None = None
+        self._mailbox: FrameMailbox | None = None
         self._overlay_text: str = ""
+        self._image_size = QSize()
+        self._target = QRect()
+        self._overlay_font = QFont()
+        self._overlay_font.setBold(True)
+        self._overlay_font.setPointSize(12)
+        self._paint_ms: deque[float] = deque(maxlen=120)
+        self.frames_painted = 0
+
+    # ------------------------------------------------------------------ #
+    # Frame input                                                          #
+    # ------------------------------------------------------------------ #
 
-    def set_frame(self, image: QImage) -> None:
+    def set_frame(self, frame: PooledFrame) -> None:
         """Update the displayed frame."""
         self._overlay_text = ""
-        pixmap = QPixmap.fromImage(image)
-        self._last_pixmap = pixmap
-        self._render()
+        self._replace_frame(frame)
+        self.update()
+
+    def set_mailbox(self, mailbox: FrameMailbox | None) -> None:
+        """Pull frames from *mailbox*; None detaches (and drops its frame)."""
+        if self._mailbox is not None:
+            self._mailbox.clear()
+        self._mailbox = mailbox
+
+    def pull_frame(self) -> None:
+        """Repaint with the newest frame waiting in the mailbox, if any."""
+        if self._mailbox is not None:
+            self.update()
+
+    def _replace_frame(self, frame: PooledFrame | None) -> None:
+        if self._frame is not None:
+            self._frame.release()
+        self._frame = frame
+        if frame is not None and self.text():
+            self.clear()
 
     def show_no_signal(self, message: str = "No camera feed") -> None:
-        self._last_pixmap = None
+        self._replace_frame(None)
         self._overlay_text = ""
-        self.clear()
         self.setText(message)
 
     def show_recording(self, recording_type: str) -> None:
         """Show a 'recording in progress' overlay on the last frame (or black)."""
         self._overlay_text = f"● Recording {recording_type.capitalize()}…"
-        self._render()
+        if self._frame is None:
+            self.setText(self._overlay_text)
+        self.update()
 
-    def _render(self) -> None:
-        if self._last_pixmap is None:
-            self.clear()
-            self.setText(self._overlay_text or "No camera feed")
-            return
+    # ------------------------------------------------------------------ #
+    # Painting                                                             #
+    # ------------------------------------------------------------------ #
 
-        scaled = self._last_pixmap.scaled(
-            self.width(), self.height(),
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation,
+    def ui_time_ms(self) -> tuple[float, float]:
+        """(mean, max) paintEvent time in ms over the last 120 frames."""
+        if not self._paint_ms:
+            return 0.0, 0.0
+        return sum(self._paint_ms) / len(self._paint_ms), max(self._paint_ms)
+
+    def _update_target(self) -> None:
+        """Aspect-fit the current frame size into the widget, centred."""
+        size = self._image_size.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio)
+        self._target = QRect(
+            (self.width() - size.width()) // 2,
+            (self.height() - size.height()) // 2,
+            size.width(), size.height(),
         )
 
+    def paintEvent(self, event):
+        t0 = time.perf_counter()
+        if self._mailbox is not None:
+            frame = self._mailbox.take()
+            if frame is not None:
+                self._replace_frame(frame)
+
+        if self._frame is None:
+            super().paintEvent(event)
+            return
+
+        image = self._frame.image
+        if image.size() != self._image_size:
+            self._image_size = image.size()
+            self._update_target()
+
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#0d0d1a"))
+        # Frames arrive already decimated to about the display size, so the
+        # default (unfiltered) scaling is used; smooth filtering costs ~2x.
+        painter.drawImage(self._target, image)
         if self._overlay_text:
-            result = QPixmap(scaled.size())
-            result.fill(Qt.GlobalColor.transparent)
-            painter = QPainter(result)
-            painter.drawPixmap(0, 0, scaled)
             # Semi-transparent red bar at top
-            painter.fillRect(0, 0, result.width(), 36,
-                             QColor(180, 20, 20, 200))
+            bar = QRect(self._target.x(), self._target.y(), self._target.width(), 36)
+            painter.fillRect(bar, QColor(180, 20, 20, 200))
             painter.setPen(QColor(255, 255, 255))
-            font = QFont()
-            font.setBold(True)
-            font.setPointSize(12)
-            painter.setFont(font)
-            painter.drawText(result.rect(), Qt.AlignmentFlag.AlignTop |
-                             Qt.AlignmentFlag.AlignHCenter, self._overlay_text)
-            painter.end()
-            self.setPixmap(result)
-        else:
-            self.setPixmap(scaled)
+            painter.setFont(self._overlay_font)
+            painter.drawText(bar, Qt.AlignmentFlag.AlignCenter, self._overlay_text)
+        painter.end()
+
+        self.frames_painted += 1
+        self._paint_ms.append((time.perf_counter() - t0) * 1000.0)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        if self._last_pixmap:
-            self._render()
+        self.display_resized.emit(self.width(), self.height())
+        self._update_target()
@@ -0,0 +1,161 @@
+"""Dialog that tests the write speed of the output directory before recording."""
+import logging
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QProgressBar,
+)
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+
+from app.camera.device_registry import device_registry
+from app.utils.disk_preflight import (
+    MAX_TEST_SECONDS, WriteBenchmark, assess, cached_benchmark, measure_write,
+    required_bytes_per_second,
+)
+
+logger = logging.getLogger(__name__)
+
+_VERDICT_STYLES = {
+    "ok":    ("Write speed OK", "color: #40c080;"),
+    "warn":  ("Write speed is marginal", "color: #c8a040;"),
+    "block": ("Write speed is too low", "color: #e05060;"),
+}
+
+
+class _MeasureWorker(QObject):
+    finished = pyqtSignal(object)       # WriteBenchmark
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self._directory = directory
+
+    @pyqtSlot()
+    def run(self) -> None:
+        self.finished.emit(measure_write(self._directory))
+
+
+class DiskPreflightDialog(QDialog):
+    """Measures (or shows the cached) write throughput of *settings*'
+    output directory against what its streams need.
+
+    With *starting_session* the dialog gates a new session: it offers
+    "Start Anyway" on a warning, only Cancel when the disk cannot keep
+    up, and accepts by itself when the result is OK. Otherwise it is the
+    informational test run from the Settings screen and always measures.
+    """
+
+    def __init__(self, settings, starting_session: bool = False, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Output Disk Check")
+        self.setMinimumWidth(520)
+        self._directory = settings.output_directory
+        self._starting_session = starting_session
+        self._cameras = max(1, len(device_registry().devices()))
+        self._required = required_bytes_per_second(settings, self._cameras)
+        self._worker: _MeasureWorker | None = None
+        self._thread: QThread | None = None
+        self.verdict: str | None = None
+        self._build_ui()
+
+        cached = cached_benchmark(self._directory) if starting_session else None
+        if cached is not None:
+            self._show_result(cached)
+        else:
+            self._start_measure()
+
+    def _build_ui(self) -> None:
+        layout = QVBoxLayout(self)
+
+        self.lbl_title = QLabel(f"Testing write speed of {self._directory}…")
+        self.lbl_title.setObjectName("subject_label")
+        self.lbl_title.setWordWrap(True)
+        layout.addWidget(self.lbl_title)
+
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)
+        self.progress.setTextVisible(False)
+        layout.addWidget(self.progress)
+
+        self.lbl_detail = QLabel(
+            f"Writing test data for up to {MAX_TEST_SECONDS:.0f} s "
+            f"({self._cameras} camera{'s' if self._cameras > 1 else ''}).")
+        self.lbl_detail.setWordWrap(True)
+        layout.addWidget(self.lbl_detail)
+
+        self.lbl_stats = QLabel("")
+        self.lbl_stats.setStyleSheet("color: #8899bb; font-size: 11px;")
+        layout.addWidget(self.lbl_stats)
+
+        btn_row = QHBoxLayout()
+        btn_row.addStretch()
+        self.btn_retest = QPushButton("Test Again")
+        self.btn_retest.setObjectName("btn_secondary")
+        self.btn_retest.setEnabled(False)
+        self.btn_retest.clicked.connect(self._start_measure)
+        btn_row.addWidget(self.btn_retest)
+        self.btn_start = QPushButton("Start Anyway")
+        self.btn_start.setVisible(False)
+        self.btn_start.clicked.connect(self.accept)
+        btn_row.addWidget(self.btn_start)
+        self.btn_close = QPushButton("Cancel" if self._starting_session else "Close")
+        self.btn_close.setObjectName("btn_secondary")
+        self.btn_close.clicked.connect(self.reject)
+        btn_row.addWidget(self.btn_close)
+        layout.addLayout(btn_row)
+
+    def _start_measure(self) -> None:
+        self.btn_retest.setEnabled(False)
+        self.btn_start.setVisible(False)
+        self.progress.setVisible(True)
+        self.lbl_title.setText(f"Testing write speed of {self._directory}…")
+        self.lbl_title.setStyleSheet("")
+        self._worker = _MeasureWorker(self._directory)
+        self._thread = QThread()
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.finished.connect(self._on_measured)
+        self._thread.start()
+
+    def _on_measured(self, bench: WriteBenchmark) -> None:
+        self._thread.quit()
+        self._thread.wait()
+        self._worker = None
+        self._thread = None
+        self._show_result(bench)
+
+    def _show_result(self, bench: WriteBenchmark) -> None:
+        self.verdict, message = assess(bench, self._required)
+        title, style = _VERDICT_STYLES[self.verdict]
+        self.progress.setVisible(False)
+        self.lbl_title.setText(title)
+        self.lbl_title.setStyleSheet(style)
+        self.lbl_detail.setText(message)
+        if not bench.error:
+            self.lbl_stats.setText(
+                f"{bench.mb_per_second:.0f} MB/s sustained · median {bench.median_ms:.0f} ms, "
+                f"longest {bench.max_ms:.0f} ms per 4 MB write · {self._directory}")
+        self.btn_retest.setEnabled(True)
+        if self._starting_session:
+            self.btn_start.setVisible(self.verdict == "warn")
+            if self.verdict == "ok":
+                # Nothing to decide: let the operator see it briefly, then go on.
+                QTimer.singleShot(600, self.accept)
+
+    def reject(self) -> None:
+        if self._thread is not None:
+            return      # the measurement takes a few seconds at most
+        super().reject()
+
+
+def confirm_output_disk(settings, parent=None) -> bool:
+    """True if a session may start writing to *settings*' output directory.
+
+    Silent when a fresh cached check passed; otherwise the check runs (or
+    its cached result is shown) and the operator decides on a warning.
+    """
+    cached = cached_benchmark(settings.output_directory)
+    if cached is not None:
+        cameras = max(1, len(device_registry().devices()))
+        verdict, _ = assess(cached, required_bytes_per_second(settings, cameras))
+        if verdict == "ok":
+            return True
+    dlg = DiskPreflightDialog(settings, starting_session=True, parent=parent)
+    return bool(dlg.exec())
@@ -6,6 +6,11 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import QTimer, Qt, QSize
 from PyQt6.QtGui import QIcon
 
+# Recording time left on the output disk below which the forecast is
+# shown in amber and red
+DISK_LOW_S = 15 * 60
+DISK_CRITICAL_S = 2 * 60
+
 
 def _icon(standard_pixmap) -> QIcon:
     return QApplication.style().standardIcon(standard_pixmap)
@@ -106,6 +111,20 @@ class RecordingControls(QWidget):
         self.lbl_elapsed.setVisible(False)
         layout.addWidget(self.lbl_elapsed)
 
+        self.lbl_stream_stats = QLabel()
+        self.lbl_stream_stats.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.lbl_stream_stats.setWordWrap(True)
+        self.lbl_stream_stats.setObjectName("status_detail")
+        self.lbl_stream_stats.setVisible(False)
+        layout.addWidget(self.lbl_stream_stats)
+
+        self.lbl_disk_forecast = QLabel()
+        self.lbl_disk_forecast.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.lbl_disk_forecast.setWordWrap(True)
+        self.lbl_disk_forecast.setObjectName("status_detail")
+        self.lbl_disk_forecast.setVisible(False)
+        layout.addWidget(self.lbl_disk_forecast)
+
         # Hide all but start calibration initially
         for btn in [self.btn_stop_calibration, self.btn_restart_calibration,
                     self.btn_start_data, self.btn_stop_data,
@@ -149,12 +168,46 @@ class RecordingControls(QWidget):
         self._update_label()
         self.lbl_rec_indicator.setVisible(True)
         self.lbl_elapsed.setVisible(True)
+        self.lbl_stream_stats.clear()
+        self.lbl_stream_stats.setVisible(True)
+        self.lbl_disk_forecast.clear()
+        self.lbl_disk_forecast.setVisible(True)
         self._timer.start()
 
     def stop_timer(self) -> None:
         self._timer.stop()
         self.lbl_rec_indicator.setVisible(False)
         self.lbl_elapsed.setVisible(False)
+        self.lbl_stream_stats.setVisible(False)
+        self.lbl_disk_forecast.setVisible(False)
+
+    def show_stream_stats(self, stats) -> None:
+        """Show live per-stream frame/drop counts from a RecordingStats."""
+        lines = [f"{name.capitalize()}: {s.received} frames, {s.dropped} dropped"
+                 for name, s in stats.streams.items()]
+        if stats.writer_dropped:
+            lines.append(f"Writer behind: {stats.writer_dropped} dropped")
+        self.lbl_stream_stats.setText("\n".join(lines))
+        bad = stats.total_dropped or stats.writer_dropped
+        self.lbl_stream_stats.setStyleSheet("color: #ff6b6b;" if bad else "")
+
+    def show_disk_forecast(self, forecast) -> None:
+        """Show the recording time left on the output disk from a DiskForecast."""
+        free_gb = forecast.free_bytes / 1e9
+        seconds = int(min(max(forecast.remaining_seconds, 0.0), 1e9))
+        hours, rest = divmod(seconds, 3600)
+        if hours >= 100:
+            self.lbl_disk_forecast.setText(f"Disk: {free_gb:.1f} GB free")
+        else:
+            left = f"{hours} h {rest // 60:02d} min" if hours else \
+                f"{rest // 60:02d}:{rest % 60:02d}"
+            self.lbl_disk_forecast.setText(f"Disk: {left} left ({free_gb:.1f} GB free)")
+        if seconds < DISK_CRITICAL_S:
+            self.lbl_disk_forecast.setStyleSheet("color: #ff6b6b;")
+        elif seconds < DISK_LOW_S:
+            self.lbl_disk_forecast.setStyleSheet("color: #c8a040;")
+        else:
+            self.lbl_disk_forecast.setStyleSheet("")
 
     def _tick(self) -> None:
         self._elapsed_seconds += 1
@@ -0,0 +1,69 @@
+"""Table cell showing a recording's cached thumbnail strip."""
+import os
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPixmap
+
+from app.camera.thumbnail_worker import thumbnailer
+from app.camera.thumbnails import THUMB_COUNT, load_thumbnails
+
+
+class ThumbnailStrip(QLabel):
+    """Shows the thumbnail strip of *file_path* (colour above depth).
+
+    A cached strip is shown at once; otherwise the recording is queued on
+    the background thumbnailer and the strip appears when it is written.
+    """
+
+    # Row height that fits a strip of 16:9 recordings
+    ROW_HEIGHT = 80
+
+    def __init__(self, file_path: str, parent=None):
+        super().__init__(parent)
+        self._file_path = file_path
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setStyleSheet("color: #667799; font-size: 11px;")
+
+        if not file_path or not os.path.exists(file_path):
+            self.setText("—")
+            return
+        image = load_thumbnails(file_path)
+        if image is not None:
+            self._show(image)
+            return
+        self.setText("Generating preview…")
+        worker = thumbnailer()
+        worker.thumbnails_ready.connect(self._on_ready)
+        worker.error_occurred.connect(self._on_error)
+        worker.enqueue(file_path)
+
+    def _show(self, image) -> None:
+        pixmap = QPixmap.fromImage(image)
+        if pixmap.height() > self.ROW_HEIGHT - 8:     # e.g. 4:3 recordings
+            pixmap = pixmap.scaledToHeight(self.ROW_HEIGHT - 8,
+                                           Qt.TransformationMode.SmoothTransformation)
+        self.setPixmap(pixmap)
+        self.setToolTip(f"{THUMB_COUNT} frames spread over the recording — "
+                        "colour (top) and depth (bottom)")
+
+    def _disconnect(self) -> None:
+        worker = thumbnailer()
+        worker.thumbnails_ready.disconnect(self._on_ready)
+        worker.error_occurred.disconnect(self._on_error)
+
+    def _on_ready(self, file_path: str) -> None:
+        if file_path != self._file_path:
+            return
+        self._disconnect()
+        image = load_thumbnails(file_path)
+        if image is not None:
+            self._show(image)
+        else:
+            self.setText("—")
+
+    def _on_error(self, file_path: str, message: str) -> None:
+        if file_path != self._file_path:
+            return
+        self._disconnect()
+        self.setText("—")
+        self.setToolTip(f"No preview: {message}")
@@ -0,0 +1,183 @@
+"""Dialog that checks the integrity of every recording in the database."""
+import logging
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QCheckBox,
+    QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView,
+)
+from PyQt6.QtCore import QThread
+from PyQt6.QtGui import QColor
+
+import app.database.repositories.recording_repository as recording_repo
+from app.camera.recording_verify import VERIFY_STATUSES, VerifyJob, expected_profiles
+from app.camera.verify_worker import VerifyWorker
+from app.config.settings import load_settings
+
+logger = logging.getLogger(__name__)
+
+# Checks run at once; reading is I/O bound, so a few threads keep the disk busy
+VERIFY_THREADS = 4
+
+_STATUS_COLORS = {
+    "warning":   QColor("#c8a040"),
+    "truncated": QColor("#e08050"),
+    "failed":    QColor("#e05060"),
+    "missing":   QColor("#e05060"),
+}
+
+
+class VerifyRecordingsDialog(QDialog):
+    """Verifies recordings in parallel and stores each result in the database.
+
+    Only problems are listed; the counts of every status are shown below.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Verify Recordings")
+        self.setMinimumSize(900, 480)
+        self._worker: VerifyWorker | None = None
+        self._thread: QThread | None = None
+        self._counts: dict[str, int] = {}
+        self._build_ui()
+
+    def _build_ui(self) -> None:
+        layout = QVBoxLayout(self)
+
+        lbl = QLabel(
+            "Reads every recording to check that it opens, has colour, depth and "
+            "infrared at the configured profiles, that all frames are readable and "
+            "that it is not truncated."
+        )
+        lbl.setWordWrap(True)
+        layout.addWidget(lbl)
+
+        self.chk_unverified = QCheckBox("Skip recordings that already verified OK")
+        self.chk_unverified.setChecked(True)
+        layout.addWidget(self.chk_unverified)
+
+        self.progress = QProgressBar()
+        self.progress.setFormat("%v / %m")
+        layout.addWidget(self.progress)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Recording", "Status", "Problem", "File Path"])
+        hh = self.table.horizontalHeader()
+        hh.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        hh.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        self.table.setColumnWidth(0, 85)
+        self.table.setColumnWidth(1, 90)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        layout.addWidget(self.table)
+
+        self.lbl_summary = QLabel("")
+        self.lbl_summary.setStyleSheet("color: #8899bb; font-size: 11px;")
+        layout.addWidget(self.lbl_summary)
+
+        btn_row = QHBoxLayout()
+        btn_row.addStretch()
+        self.btn_start = QPushButton("Start")
+        self.btn_start.clicked.connect(self._on_start)
+        btn_row.addWidget(self.btn_start)
+        self.btn_stop = QPushButton("Stop")
+        self.btn_stop.setObjectName("btn_secondary")
+        self.btn_stop.setEnabled(False)
+        self.btn_stop.clicked.connect(self._on_stop)
+        btn_row.addWidget(self.btn_stop)
+        btn_close = QPushButton("Close")
+        btn_close.setObjectName("btn_secondary")
+        btn_close.clicked.connect(self.accept)
+        btn_row.addWidget(btn_close)
+        layout.addLayout(btn_row)
+
+    # ------------------------------------------------------------------ #
+    # Slots                                                                #
+    # ------------------------------------------------------------------ #
+
+    def _on_start(self) -> None:
+        recordings = recording_repo.list_all()
+        if self.chk_unverified.isChecked():
+            recordings = [r for r in recordings if r.verify_status != "ok"]
+        expected = expected_profiles(load_settings())
+        chunks = recording_repo.chunk_counts()
+        jobs = [VerifyJob(r.id, r.file_path, expected, r.duration_seconds, chunks.get(r.id))
+                for r in recordings]
+
+        self.table.setRowCount(0)
+        self._counts = {}
+        self.lbl_summary.setText(f"Verifying {len(jobs)} recordings…")
+        self.progress.setRange(0, max(1, len(jobs)))
+        self.progress.setValue(0)
+        self.btn_start.setEnabled(False)
+        self.btn_stop.setEnabled(True)
+        self.chk_unverified.setEnabled(False)
+
+        self._worker = VerifyWorker(jobs, VERIFY_THREADS)
+        self._thread = QThread()
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.result_ready.connect(self._on_result)
+        self._worker.progress.connect(self._on_progress)
+        self._worker.finished.connect(self._on_finished)
+        self._thread.start()
+
+    def _on_stop(self) -> None:
+        if self._worker:
+            self._worker.stop()
+        self.btn_stop.setEnabled(False)
+
+    def _on_progress(self, done: int, total: int) -> None:
+        self.progress.setValue(done)
+
+    def _on_result(self, result) -> None:
+        if result.status is None:
+            key = "not checked"
+        else:
+            key = result.status
+            if result.recording_id is not None:
+                recording_repo.set_verification(result.recording_id, result.status,
+                                                result.message)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        self._update_summary()
+        if result.status == "ok":
+            return
+
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        items = [str(result.recording_id), key, result.message, result.file_path]
+        for col, text in enumerate(items):
+            item = QTableWidgetItem(text)
+            if col == 1 and result.status in _STATUS_COLORS:
+                item.setForeground(_STATUS_COLORS[result.status])
+            self.table.setItem(row, col, item)
+
+    def _on_finished(self) -> None:
+        self._stop_worker()
+        self.btn_start.setEnabled(True)
+        self.btn_stop.setEnabled(False)
+        self.chk_unverified.setEnabled(True)
+        self._update_summary(final=True)
+
+    def _update_summary(self, final: bool = False) -> None:
+        order = VERIFY_STATUSES + ("not checked",)
+        parts = [f"{self._counts[k]} {k}" for k in order if self._counts.get(k)]
+        prefix = "Done: " if final else ""
+        self.lbl_summary.setText(prefix + (", ".join(parts) or "nothing to verify"))
+
+    def _stop_worker(self) -> None:
+        if self._worker:
+            self._worker.stop()
+        if self._thread:
+            self._thread.quit()
+            self._thread.wait(10000)
+        self._worker = None
+        self._thread = None
+
+    def closeEvent(self, event) -> None:
+        self._stop_worker()
+        super().closeEvent(event)
+
+    def accept(self) -> None:
+        self._stop_worker()
+        super().accept()
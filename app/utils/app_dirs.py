@@ -20,3 +20,4 @@ def _app_data_root() -> Path:
 APP_DATA_DIR = _app_data_root()
 LOG_DIR = APP_DATA_DIR / "logs"
 DB_DIR = APP_DATA_DIR / "data"
+THUMBNAIL_DIR = APP_DATA_DIR / "thumbnails"
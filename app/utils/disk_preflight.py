@@ -0,0 +1,175 @@
+"""Write-throughput preflight for the recordings output directory.
+
+A recording writes well over 100 MB/s of raw frames; on a slow USB stick
+or a network share the writer falls behind, its queue fills and frames
+are dropped without any other sign. measure_write() writes incompressible
+blocks to a temporary file in the directory for a few seconds, flushing
+each block to the device, and reports the sustained throughput and the
+longest single-block stall. assess() compares that with the rate the
+configured streams need:
+
+    block   the disk cannot keep up at all (or is not writable)
+    warn    less than MIN_HEADROOM spare, or a stall long enough to fill
+            a good part of the recording queue
+    ok      otherwise
+
+Results are cached per directory in PREFLIGHT_CACHE for PREFLIGHT_TTL_S,
+so the check costs a few seconds at most once per TTL.
+"""
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.utils.app_dirs import APP_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+PREFLIGHT_CACHE = APP_DATA_DIR / "disk_preflight.json"
+PREFLIGHT_TTL_S = 3600.0
+
+BLOCK_BYTES = 4 * 1024 * 1024
+MAX_TEST_BYTES = 1024 * 1024 * 1024
+MAX_TEST_SECONDS = 3.0
+
+# Required rate x this is considered comfortable
+MIN_HEADROOM = 1.5
+# A single stall this long eats a third of RecordingWorker's 90-frameset
+# queue at 30 fps
+STALL_WARN_MS = 1000.0
+# .rvl is at least this much smaller than raw (colour compresses least)
+RVL_SIZE_RATIO = 1.5
+
+_BYTES_PER_PIXEL = {"color": 3, "depth": 2, "infrared": 1}
+
+
+@dataclass
+class WriteBenchmark:
+    directory: str
+    bytes_per_second: float = 0.0
+    median_ms: float = 0.0          # per BLOCK_BYTES write + flush
+    max_ms: float = 0.0
+    measured_at: float = 0.0        # time.time()
+    error: str = ""
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_per_second / 1e6
+
+    def is_fresh(self) -> bool:
+        return time.time() - self.measured_at < PREFLIGHT_TTL_S
+
+
+def required_bytes_per_second(settings, cameras: int = 1) -> float:
+    """Bytes/s the configured streams write (an AppSettings), for *cameras* cameras."""
+    per_camera = sum(getattr(settings, f"{name}_width") * getattr(settings, f"{name}_height")
+                     * bpp * getattr(settings, f"{name}_fps")
+                     for name, bpp in _BYTES_PER_PIXEL.items())
+    if settings.recording_format == "rvl":
+        per_camera /= RVL_SIZE_RATIO
+    return per_camera * max(1, cameras)
+
+
+# ---------------------------------------------------------------------- #
+# Measurement and cache                                                    #
+# ---------------------------------------------------------------------- #
+
+def _cache_key(directory: str) -> str:
+    return os.path.normcase(os.path.abspath(directory))
+
+
+def _load_cache() -> dict:
+    try:
+        with open(PREFLIGHT_CACHE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_benchmark(directory: str) -> Optional[WriteBenchmark]:
+    """The last benchmark of *directory* if it is within PREFLIGHT_TTL_S."""
+    entry = _load_cache().get(_cache_key(directory))
+    if entry is None:
+        return None
+    try:
+        bench = WriteBenchmark(**entry)
+    except TypeError:
+        return None
+    return bench if bench.is_fresh() else None
+
+
+def _store(bench: WriteBenchmark) -> None:
+    cache = {k: v for k, v in _load_cache().items()
+             if time.time() - v.get("measured_at", 0) < PREFLIGHT_TTL_S}
+    cache[_cache_key(bench.directory)] = asdict(bench)
+    try:
+        PREFLIGHT_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = PREFLIGHT_CACHE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+        os.replace(tmp, PREFLIGHT_CACHE)
+    except OSError as exc:
+        logger.warning("Could not cache the disk preflight: %s", exc)
+
+
+def measure_write(directory: str, max_bytes: int = MAX_TEST_BYTES,
+                  max_seconds: float = MAX_TEST_SECONDS) -> WriteBenchmark:
+    """Write to a temporary file in *directory* and time it; the result is cached."""
+    bench = WriteBenchmark(directory, measured_at=time.time())
+    # Random bytes, so compressing or deduplicating storage cannot flatter it.
+    block = np.random.default_rng().integers(0, 256, BLOCK_BYTES, dtype=np.uint8).tobytes()
+    path = os.path.join(directory, f".write_test_{os.getpid()}.tmp")
+    times = []
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+        try:
+            written = 0
+            t0 = time.perf_counter()
+            while written < max_bytes and time.perf_counter() - t0 < max_seconds:
+                t = time.perf_counter()
+                view = memoryview(block)
+                while view:
+                    view = view[os.write(fd, view):]
+                # Flush every block: the figure is the device's, not the page cache's.
+                os.fsync(fd)
+                times.append(time.perf_counter() - t)
+                written += len(block)
+            seconds = time.perf_counter() - t0
+        finally:
+            os.close(fd)
+            os.remove(path)
+    except OSError as exc:
+        bench.error = str(exc)
+        logger.warning("Disk preflight of %s failed: %s", directory, exc)
+        return bench            # not cached: the directory may be fixed any moment
+
+    bench.bytes_per_second = written / seconds if seconds > 0 else 0.0
+    bench.median_ms = float(np.median(times)) * 1000.0
+    bench.max_ms = max(times) * 1000.0
+    logger.info("Disk preflight of %s: %.1f MB/s, median %.0f ms, max %.0f ms "
+                "per %d MB block.", directory, bench.mb_per_second, bench.median_ms,
+                bench.max_ms, BLOCK_BYTES >> 20)
+    _store(bench)
+    return bench
+
+
+def assess(bench: WriteBenchmark, required_bps: float) -> tuple[str, str]:
+    """("ok" | "warn" | "block", explanation) for recording at *required_bps*."""
+    if bench.error:
+        return "block", f"Cannot write to {bench.directory}: {bench.error}"
+    have, need = bench.mb_per_second, required_bps / 1e6
+    headroom = have / need if need else float("inf")
+    rates = f"The output directory writes {have:.0f} MB/s; recording needs {need:.0f} MB/s"
+    if headroom < 1.0:
+        return "block", f"{rates}. Recordings would drop frames."
+    if headroom < MIN_HEADROOM:
+        return "warn", (f"{rates}, only {headroom:.1f}x headroom. "
+                        "Frames may drop when the disk is busy.")
+    if bench.max_ms > STALL_WARN_MS:
+        return "warn", (f"{rates}, but one write stalled for {bench.max_ms / 1000.0:.1f} s. "
+                        "Frames may drop during stalls.")
+    return "ok", f"{rates} ({headroom:.1f}x headroom)."
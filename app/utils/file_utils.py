@@ -2,6 +2,7 @@
 import os
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 
 def ensure_directory(path: str) -> str:
@@ -11,15 +12,29 @@ def ensure_directory(path: str) -> str:
 
 
 def build_output_path(output_dir: str, subject_code: str, session_id: int,
-                      recording_type: str) -> str:
-    """Return the full .bag file path for a recording.
+                      recording_type: str, camera_serial: Optional[str] = None,
+                      file_format: str = "bag") -> str:
+    """Return the full file path for a recording.
 
     Pattern:
         {output_dir}/{subject_code}/session_{session_id}/
-            {subject_code}_{recording_type}_{YYYYMMDD_HHMMSS}.bag
+            {subject_code}_{recording_type}[_{camera_serial}]_{YYYYMMDD_HHMMSS}.{file_format}
     """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{subject_code}_{recording_type}_{timestamp}.bag"
+    camera = f"_{camera_serial}" if camera_serial else ""
+    filename = f"{subject_code}_{recording_type}{camera}_{timestamp}.{file_format}"
     session_dir = os.path.join(output_dir, subject_code, f"session_{session_id}")
     ensure_directory(session_dir)
     return os.path.join(session_dir, filename)
+
+
+def build_chunk_path(file_path: str, chunk_index: int) -> str:
+    """Path of chunk *chunk_index* of the recording at *file_path*.
+
+    Chunk 0 is *file_path* itself; later chunks sit beside it:
+        {stem}_chunk{NNN}.{file_format}
+    """
+    if chunk_index == 0:
+        return file_path
+    root, ext = os.path.splitext(file_path)
+    return f"{root}_chunk{chunk_index:03d}{ext}"
@@ -0,0 +1,112 @@
+"""Benchmark the NumPy LUT depth colorizer against rs.colorizer.
+
+Colorizes synthetic z16 depth (SyntheticFrameSource) with every
+DepthColorizer mode and, when pyrealsense2 is installed, with rs.colorizer
+fed the same depth through a software device.
+
+Run from the project root:
+    python scripts/benchmark_colorizer.py
+    python scripts/benchmark_colorizer.py --width 640 --height 480 --frames 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.camera.depth_colorizer import DepthColorizer, REALSENSE_AVAILABLE, rs
+from app.camera.frame_source import SyntheticFrameSource
+
+
+def _depth_frames(args) -> list:
+    source = SyntheticFrameSource(args.width, args.height, num_frames=args.frames,
+                                  real_time=False)
+    source.start()
+    return [source.generate(i).depth for i in range(args.frames)]
+
+
+def _time(fn, items) -> list[float]:
+    samples = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def _report(name: str, samples: list[float]) -> None:
+    ms = [s * 1000.0 for s in samples]
+    mean = statistics.mean(ms)
+    print(f"  {name:<28} mean {mean:7.2f} ms   median {statistics.median(ms):7.2f} ms"
+          f"   → {1000.0 / mean:7.1f} fps")
+
+
+def _rs_depth_frames(depths: list, args) -> list:
+    """Wrap NumPy depth arrays in real rs.depth_frame objects."""
+    device = rs.software_device()
+    sensor = device.add_sensor("Depth")
+    intr = rs.intrinsics()
+    intr.width, intr.height = args.width, args.height
+    intr.fx = intr.fy = 0.7 * args.width
+    intr.ppx, intr.ppy = args.width / 2.0, args.height / 2.0
+    vs = rs.video_stream()
+    vs.type, vs.index, vs.uid = rs.stream.depth, 0, 1
+    vs.width, vs.height, vs.fps, vs.bpp = args.width, args.height, 30, 2
+    vs.fmt, vs.intrinsics = rs.format.z16, intr
+    profile = sensor.add_video_stream(vs)
+    sensor.add_read_only_option(rs.option.depth_units, 0.001)
+    queue = rs.frame_queue(len(depths) + 1, keep_frames=True)
+    sensor.open(profile)
+    sensor.start(queue)
+
+    frames = []
+    for i, depth in enumerate(depths):
+        f = rs.software_video_frame()
+        f.pixels = depth
+        f.stride, f.bpp = depth.strides[0], 2
+        f.timestamp, f.frame_number = i * 33.3, i
+        f.domain = rs.timestamp_domain.hardware_clock
+        f.profile = profile.as_video_stream_profile()
+        sensor.on_video_frame(f)
+        frames.append(queue.wait_for_frame().as_depth_frame())
+    sensor.stop()
+    sensor.close()
+    return frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    depths = _depth_frames(args)
+    print(f"Colorizer benchmark: {args.width}x{args.height}, {args.frames} frames")
+
+    variants = {
+        "numpy fixed range":         DepthColorizer(),
+        "numpy auto range":          DepthColorizer(auto_range=True),
+        "numpy histogram equalized": DepthColorizer(equalize=True),
+    }
+    for name, colorizer in variants.items():
+        colorizer.colorize(depths[0])      # warm the LUT cache
+        _report(name, _time(colorizer.colorize, depths))
+
+    if not REALSENSE_AVAILABLE:
+        print("  rs.colorizer                 skipped (pyrealsense2 not installed)")
+        return
+
+    rs_frames = _rs_depth_frames(depths, args)
+    for equalize in (0, 1):
+        colorizer = rs.colorizer()
+        colorizer.set_option(rs.option.color_scheme, 0)
+        colorizer.set_option(rs.option.histogram_equalization_enabled, equalize)
+        name = "rs.colorizer " + ("histogram equalized" if equalize else "fixed range")
+        _report(name, _time(lambda f: colorizer.colorize(f).get_data(), rs_frames))
+
+
+if __name__ == "__main__":
+    main()
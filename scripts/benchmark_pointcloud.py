@@ -0,0 +1,109 @@
+"""Benchmark point-cloud deprojection against rs.pointcloud.
+
+Deprojects synthetic z16 depth (SyntheticFrameSource) with
+PointCloudMaker — depth only, coloured on the same grid, and coloured
+through a depth→colour extrinsic — and writes the PLY files, then runs
+the full parallel PLY export of a synthetic .rvl recording. When
+pyrealsense2 is installed, rs.pointcloud is timed on the same depth.
+
+Run from the project root:
+    python scripts/benchmark_pointcloud.py
+    python scripts/benchmark_pointcloud.py --width 848 --height 480 --frames 60 --workers 4
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.camera.frame_source import (
+    REALSENSE_AVAILABLE, Extrinsics, FrameSet, SyntheticFrameSource, depth_extrinsics, rs,
+)
+from app.camera.pointcloud import PointCloudMaker, export_point_clouds, write_ply
+from app.camera.rvl_file import RvlWriter
+from scripts.benchmark_colorizer import _rs_depth_frames
+
+
+def _time(fn, items) -> list[float]:
+    samples = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def _report(name: str, samples: list[float]) -> None:
+    ms = [s * 1000.0 for s in samples]
+    mean = statistics.mean(ms)
+    print(f"  {name:<34} mean {mean:7.2f} ms   median {statistics.median(ms):7.2f} ms"
+          f"   → {1000.0 / mean:7.1f} frames/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for the recording export")
+    args = parser.parse_args()
+
+    source = SyntheticFrameSource(args.width, args.height, num_frames=args.frames,
+                                  real_time=False)
+    source.start()
+    framesets = [source.generate(i) for i in range(args.frames)]
+    intr = source.streams()["depth"].intrinsics
+    depth_only = [FrameSet(depth=f.depth) for f in framesets]
+    points = int(np.mean([np.count_nonzero(f.depth) for f in framesets]))
+    print(f"Point-cloud benchmark: {args.width}x{args.height}, {args.frames} frames, "
+          f"{points} points per frame")
+
+    plain = PointCloudMaker(intr, source.depth_scale)
+    same_grid = PointCloudMaker(intr, source.depth_scale, intr)
+    # A D4xx-like baseline: colour camera 15 mm to the side of the depth camera.
+    shifted = PointCloudMaker(intr, source.depth_scale, intr,
+                              Extrinsics(translation=(0.015, 0.0, 0.0)))
+    _report("depth only", _time(plain.points, depth_only))
+    _report("colour, same grid", _time(same_grid.points, framesets))
+    _report("colour, through extrinsics", _time(shifted.points, framesets))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ply_path = os.path.join(tmp, "bench.ply")
+        _report("colour + write PLY",
+                _time(lambda f: write_ply(ply_path, shifted.points(f)), framesets))
+        print(f"  {'':<34} {os.path.getsize(ply_path) / 1e6:.1f} MB per PLY")
+
+        rvl_path = os.path.join(tmp, "bench.rvl")
+        writer = RvlWriter(rvl_path, source.streams(), source.depth_scale,
+                           depth_extrinsics(source))
+        for frames in framesets:
+            writer.write(frames)
+        writer.close()
+        print(f"\nRecording export ({args.frames} framesets, decode + deproject + write):")
+        for workers in sorted({1, args.workers}):
+            out_dir = os.path.join(tmp, f"clouds_{workers}")
+            t0 = time.perf_counter()
+            written = export_point_clouds(rvl_path, out_dir, workers=workers)
+            seconds = time.perf_counter() - t0
+            print(f"  {workers} worker(s)  {written} PLYs in {seconds:6.2f} s"
+                  f"   → {written / seconds:7.1f} frames/s")
+
+    if not REALSENSE_AVAILABLE:
+        print("\n  rs.pointcloud                      skipped (pyrealsense2 not installed)")
+        return
+
+    print()
+    rs_frames = _rs_depth_frames([f.depth for f in framesets], args)
+    pc = rs.pointcloud()
+    _report("rs.pointcloud (vertices to NumPy)",
+            _time(lambda f: np.asanyarray(pc.calculate(f).get_vertices()), rs_frames))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Headless benchmark of the preview frame path — no camera required.
+
+Drives the decimate / align / colorize / compose path with
+SyntheticFrameSource (or a .npz capture replayed with ReplayFrameSource)
+and reports per-stage cost, steady-state allocations per preview frame,
+end-to-end CameraService throughput and the UI-thread cost of painting a
+frame in CameraPreviewWidget.
+
+Run from the project root:
+    python scripts/benchmark_preview.py
+    python scripts/benchmark_preview.py --width 848 --height 480 --frames 300
+    python scripts/benchmark_preview.py --display 900x500
+    python scripts/benchmark_preview.py --replay capture.npz
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.camera.frame_source import (
+    SyntheticFrameSource, ReplayFrameSource, EndOfStream, Extrinsics,
+)
+from app.camera.depth_colorizer import make_colorizer, COLORIZERS
+from app.camera.reprojection import DepthReprojector
+from app.camera.frame_pool import FramePool
+from app.camera.frame_render import (
+    colorize_depth, decimate, decimation_factor, render_preview,
+)
+from app.camera.camera_service import CameraService, PreviewMode
+
+
+def _make_source(args):
+    if args.replay:
+        return ReplayFrameSource.from_npz(args.replay, real_time=False)
+    return SyntheticFrameSource(args.width, args.height, args.fps,
+                                num_frames=args.frames, real_time=False)
+
+
+def _report(name: str, samples: list[float]) -> None:
+    if not samples:
+        return
+    ms = sorted(s * 1000.0 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"  {name:<12} mean {statistics.mean(ms):7.2f} ms   "
+          f"median {statistics.median(ms):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def bench_stages(args) -> None:
+    source = _make_source(args)
+    colorizer = make_colorizer(args.colorizer, bgr=True)
+    reprojector = DepthReprojector()
+    pool = FramePool()
+    include_color = args.mode == "calibration"
+    stages: dict[str, list[float]] = {
+        "source": [], "decimate": [], "align": [], "colorize": [],
+        "compose": [],
+    }
+    allocated: list[int] = []
+    path_allocated: list[int] = []
+    source.start()
+    streams = source.streams()
+    # Synthetic depth is already registered to colour; give the benchmark a
+    # realistic depth camera (wider FOV, 15 mm baseline) so alignment does work.
+    depth_intr = replace(streams["depth"].intrinsics,
+                         fx=streams["depth"].intrinsics.fx * 0.7,
+                         fy=streams["depth"].intrinsics.fy * 0.7)
+    extrinsics = Extrinsics(translation=(0.015, 0.0, 0.0))
+    try:
+        while True:
+            t0 = time.perf_counter()
+            try:
+                frames = source.wait_for_frames()
+            except EndOfStream:
+                break
+            t1 = time.perf_counter()
+            h, w = frames.depth.shape
+            factor = decimation_factor(w, h, args.display[0] // (2 if include_color else 1),
+                                       args.display[1])
+            small = decimate(frames, factor)
+            t2 = time.perf_counter()
+            small = reprojector.align(small, factor, depth_intr,
+                                      streams["color"].intrinsics, extrinsics, 0.001)
+            t3 = time.perf_counter()
+            colorize_depth(small, colorizer)
+            t4 = time.perf_counter()
+            # Composite (colorize included) into a pooled buffer, as the
+            # services do; the frame goes straight back as if painted.
+            frame = render_preview(small, include_color, colorizer, pool)
+            t5 = time.perf_counter()
+            frame.release()
+            for key, dt in zip(stages, (t1 - t0, t2 - t1, t3 - t2, t4 - t3,
+                                        t5 - t4)):
+                stages[key].append(dt)
+
+            tracemalloc.start()
+            render_preview(small, include_color, colorizer, pool).release()
+            allocated.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            small = reprojector.align(decimate(frames, factor), factor, depth_intr,
+                                      streams["color"].intrinsics, extrinsics, 0.001)
+            render_preview(small, include_color, colorizer, pool).release()
+            path_allocated.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    finally:
+        source.stop()
+
+    print(f"Per-stage cost ({len(stages['source'])} frames):")
+    for name, samples in stages.items():
+        _report(name, samples)
+    if len(allocated) > 1:
+        steady = allocated[1:]
+        print(f"  compose peak allocation per frame (steady state): "
+              f"{statistics.median(steady) / 1024:.1f} KiB median, "
+              f"{max(steady) / 1024:.1f} KiB max")
+        steady = path_allocated[1:]
+        print(f"  whole path peak allocation per frame (steady state): "
+              f"{statistics.median(steady) / 1024:.1f} KiB median, "
+              f"{max(steady) / 1024:.1f} KiB max")
+
+
+def bench_service(args) -> None:
+    source = _make_source(args)
+    # Uncapped rate and a whole core, so this measures throughput rather
+    # than the adaptive preview rate.
+    service = CameraService(color_fps=args.fps, preview_fps=1000, preview_budget=1.0,
+                            mode=PreviewMode(args.mode), colorizer=args.colorizer,
+                            source=source)
+    service.set_preview_size(*args.display)
+    emitted = []
+    def _on_frame():
+        # No event loop here, so the signal fires synchronously: take the
+        # frame straight away as the widget would.
+        frame = service.mailbox.take()
+        if frame is not None:
+            emitted.append(1)
+            frame.release()
+
+    service.frame_ready.connect(_on_frame)
+    service.error_occurred.connect(lambda msg: print(f"  service error: {msg}"))
+
+    t0 = time.perf_counter()
+    service.run()   # returns when the finite source is exhausted
+    elapsed = time.perf_counter() - t0
+
+    fps = len(emitted) / elapsed if elapsed > 0 else 0.0
+    print(f"CameraService end-to-end: {len(emitted)} frames in {elapsed:.2f} s "
+          f"→ {fps:.1f} fps (source generation included)")
+
+
+def bench_widget(args) -> None:
+    """UI-thread cost of showing one preview frame in CameraPreviewWidget,
+    against the previous QPixmap + smooth-rescale + setPixmap path."""
+    from PyQt6.QtGui import QPixmap
+    from PyQt6.QtWidgets import QApplication, QLabel
+    from PyQt6.QtCore import Qt
+    from app.camera.frame_mailbox import FrameMailbox
+    from app.ui.widgets.camera_preview_widget import CameraPreviewWidget
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    display_w, display_h = args.display if args.display[0] > 0 else (1280, 720)
+    source = _make_source(args)
+    colorizer = make_colorizer(args.colorizer, bgr=True)
+    include_color = args.mode == "calibration"
+    pool = FramePool()
+    source.start()
+    frames = source.wait_for_frames()
+    source.stop()
+    factor = decimation_factor(frames.depth.shape[1], frames.depth.shape[0],
+                               display_w // (2 if include_color else 1), display_h)
+    small = decimate(frames, factor)
+
+    widget = CameraPreviewWidget()
+    widget.resize(display_w, display_h)
+    widget.show()
+    mailbox = FrameMailbox()
+    widget.set_mailbox(mailbox)
+    label = QLabel()
+    label.resize(display_w, display_h)
+    label.show()
+    app.processEvents()
+
+    legacy: list[float] = []
+    for _ in range(args.frames):
+        frame = render_preview(small, include_color, colorizer, pool)
+        t0 = time.perf_counter()
+        pixmap = QPixmap.fromImage(frame.image).scaled(
+            display_w, display_h, Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation)
+        label.setPixmap(pixmap)
+        label.repaint()
+        legacy.append(time.perf_counter() - t0)
+        frame.release()
+
+    for _ in range(args.frames):
+        mailbox.put(render_preview(small, include_color, colorizer, pool))
+        widget.repaint()
+    mean_ms, max_ms = widget.ui_time_ms()
+
+    print(f"UI thread per frame at {display_w}x{display_h}:")
+    _report("pixmap", legacy)
+    print(f"  {'paintEvent':<12} mean {mean_ms:7.2f} ms   max {max_ms:7.2f} ms "
+          f"({widget.frames_painted} frames)")
+    widget.set_mailbox(None)
+
+
+def _size(text: str) -> tuple[int, int]:
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--mode", choices=["calibration", "data"], default="calibration")
+    parser.add_argument("--colorizer", choices=COLORIZERS, default="numpy")
+    parser.add_argument("--display", type=_size, default=(0, 0),
+                        help="Preview widget size WxH to decimate for (default: full res)")
+    parser.add_argument("--replay", help="Replay a .npz capture instead of synthetic frames")
+    args = parser.parse_args()
+
+    print(f"Preview benchmark: {args.width}x{args.height} mode={args.mode} "
+          f"colorizer={args.colorizer}")
+    bench_stages(args)
+    bench_service(args)
+    bench_widget(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Benchmark the compressed .rvl recording format against .bag.
+
+Writes the same framesets with RvlWriter and (when pyrealsense2 is
+installed) BagWriter, and reports write throughput, file size and
+compression ratio. The .rvl file is read back and every depth, colour and
+infrared frame is checked to be bit-identical to what was written.
+
+Synthetic depth is far smoother than a real sensor's, so by default
+Gaussian noise and random holes are added to it; use --noise 0 --holes 0
+for the raw pattern, or --replay to use a captured .npz.
+
+Run from the project root:
+    python scripts/benchmark_rvl.py
+    python scripts/benchmark_rvl.py --frames 300 --workers 4
+    python scripts/benchmark_rvl.py --replay capture.npz
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.camera.frame_source import (
+    SyntheticFrameSource, ReplayFrameSource, EndOfStream, REALSENSE_AVAILABLE,
+)
+from app.camera.rvl_codec import decode_depth, encode_depth
+from app.camera.rvl_file import RvlReader, RvlWriter, ZLIB_LEVEL
+
+
+def _load_frames(args):
+    if args.replay:
+        source = ReplayFrameSource.from_npz(args.replay, real_time=False)
+    else:
+        source = SyntheticFrameSource(args.width, args.height, args.fps,
+                                      num_frames=args.frames, real_time=False)
+    source.start()
+    rng = np.random.default_rng(0)
+    frames = []
+    try:
+        while len(frames) < args.frames:
+            try:
+                fs = source.wait_for_frames()
+            except EndOfStream:
+                break
+            if fs is None:
+                continue
+            if fs.depth is not None and (args.noise or args.holes):
+                depth = fs.depth.astype(np.int32)
+                if args.noise:
+                    depth += rng.normal(0, args.noise, depth.shape).astype(np.int32)
+                depth[rng.random(depth.shape) < args.holes] = 0
+                fs.depth = depth.clip(0, 65535).astype(np.uint16)
+            fs.native = None
+            frames.append(fs)
+        return frames, source.streams(), source.depth_scale
+    finally:
+        source.stop()
+
+
+def _raw_bytes(frames) -> int:
+    return sum(getattr(fs, n).nbytes for fs in frames
+               for n in ("color", "depth", "infrared") if getattr(fs, n) is not None)
+
+
+def _ms(samples: list[float]) -> str:
+    return f"{statistics.mean(samples) * 1000:6.2f} ms"
+
+
+def bench_codecs(frames) -> None:
+    print("Per-frame codec cost (single thread):")
+    enc, dec, sizes = [], [], []
+    for fs in frames[:60]:
+        t0 = time.perf_counter()
+        data = encode_depth(fs.depth)
+        t1 = time.perf_counter()
+        decode_depth(data, fs.depth.shape[1], fs.depth.shape[0])
+        enc.append(t1 - t0)
+        dec.append(time.perf_counter() - t1)
+        sizes.append(len(data))
+    ratio = frames[0].depth.nbytes / statistics.mean(sizes)
+    print(f"  depth RVL    encode {_ms(enc)}   decode {_ms(dec)}   {ratio:5.2f}x")
+    for name in ("color", "infrared"):
+        if getattr(frames[0], name) is None:
+            continue
+        enc, sizes = [], []
+        for fs in frames[:60]:
+            t0 = time.perf_counter()
+            sizes.append(len(zlib.compress(getattr(fs, name), ZLIB_LEVEL)))
+            enc.append(time.perf_counter() - t0)
+        ratio = getattr(frames[0], name).nbytes / statistics.mean(sizes)
+        print(f"  {name:<8} zlib encode {_ms(enc)}                     {ratio:5.2f}x")
+
+
+def _write(writer, frames) -> float:
+    t0 = time.perf_counter()
+    for fs in frames:
+        writer.write(fs)
+    writer.close()
+    return time.perf_counter() - t0
+
+
+def _print_result(name: str, seconds: float, path: str, frames, raw: int) -> None:
+    size = os.path.getsize(path)
+    print(f"  {name:<5} {len(frames) / seconds:7.1f} fps   "
+          f"{raw / seconds / 1e6:7.1f} MB/s in   "
+          f"{size / 1e6:8.1f} MB   {raw / size:5.2f}x smaller than raw")
+
+
+def verify(path: str, frames) -> None:
+    with RvlReader(path) as reader:
+        assert len(reader) == len(frames), f"{len(reader)} framesets, wrote {len(frames)}"
+        t0 = time.perf_counter()
+        for i, fs in enumerate(frames):
+            back = reader.read(i)
+            for name in ("color", "depth", "infrared"):
+                if getattr(fs, name) is not None:
+                    assert np.array_equal(getattr(back, name), getattr(fs, name)), \
+                        f"frameset {i}: {name} differs"
+        seconds = time.perf_counter() - t0
+    print(f"  read back {len(frames) / seconds:.1f} fps — all frames bit-identical")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=3,
+                        help="RvlWriter encoder threads")
+    parser.add_argument("--noise", type=float, default=3.0,
+                        help="Depth noise sigma in depth units (synthetic only)")
+    parser.add_argument("--holes", type=float, default=0.05,
+                        help="Fraction of depth pixels zeroed (synthetic only)")
+    parser.add_argument("--replay", help="Use a .npz capture instead of synthetic frames")
+    args = parser.parse_args()
+    if args.replay:
+        args.noise = args.holes = 0
+
+    frames, streams, depth_scale = _load_frames(args)
+    if not frames:
+        sys.exit("No frames to write.")
+    raw = _raw_bytes(frames)
+    h, w = frames[0].depth.shape
+    print(f"{len(frames)} framesets, depth {w}x{h}, "
+          f"{raw / len(frames) / 1e6:.1f} MB raw per frameset\n")
+
+    bench_codecs(frames)
+
+    print(f"\nWriters ({len(frames)} framesets, write + close):")
+    with tempfile.TemporaryDirectory() as tmp:
+        rvl_path = os.path.join(tmp, "bench.rvl")
+        seconds = _write(RvlWriter(rvl_path, streams, depth_scale, workers=args.workers,
+                                   raw_fallback=False), frames)
+        _print_result(".rvl", seconds, rvl_path, frames, raw)
+        if len(frames) / seconds < args.fps:
+            print(f"  .rvl  cannot keep up with {args.fps} fps on {os.cpu_count()} CPU(s); "
+                  "recordings store some colour frames uncompressed")
+
+        if REALSENSE_AVAILABLE:
+            from app.camera.bag_writer import BagWriter
+            bag_path = os.path.join(tmp, "bench.bag")
+            writer = BagWriter(bag_path, streams, depth_scale)
+            seconds = _write(writer, frames)
+            del writer      # the recorder finalises the bag when destroyed
+            _print_result(".bag", seconds, bag_path, frames, raw)
+        else:
+            print("  .bag  skipped — pyrealsense2 is not installed")
+
+        verify(rvl_path, frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Export recordings as coloured point clouds (one binary PLY per frameset).
+
+Depth is deprojected with per-pixel ray tables built from the stream
+intrinsics and coloured from the colour stream (see
+app/camera/pointcloud.py). Each recording gets a directory named after it
+under the export directory; framesets are converted in worker processes.
+
+Run from the project root:
+    python scripts/export_point_clouds.py D:/Recordings/S01/session_3/rec.rvl D:/Clouds
+    python scripts/export_point_clouds.py rec.rvl D:/Clouds --stride 5 --start 10 --end 40
+    python scripts/export_point_clouds.py a.bag b.bag D:/Clouds --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.camera.pointcloud import export_point_clouds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="+", help=".bag / .rvl recordings")
+    parser.add_argument("export_dir", help="Where the PLY directories are written")
+    parser.add_argument("--stride", type=int, default=1,
+                        help="Export every n-th frameset")
+    parser.add_argument("--start", type=float, help="Start, seconds from the beginning")
+    parser.add_argument("--end", type=float, help="End, seconds from the beginning")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes")
+    args = parser.parse_args()
+    if args.stride < 1:
+        sys.exit("--stride must be at least 1")
+
+    failed = 0
+    for file_path in args.recordings:
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        out_dir = os.path.join(args.export_dir, stem)
+
+        def progress(done: int, total: int) -> None:
+            print(f"\r  {stem}: {done}/{total} framesets", end="", flush=True)
+
+        t0 = time.perf_counter()
+        try:
+            written = export_point_clouds(file_path, out_dir, args.stride, args.start,
+                                          args.end, args.workers, progress)
+        except Exception as exc:
+            failed += 1
+            print(f"\n  {stem}: FAILED: {exc}")
+            continue
+        seconds = time.perf_counter() - t0
+        rate = written / seconds if seconds > 0 else 0.0
+        print(f"\r  {stem}: {written} point clouds in {seconds:.1f} s "
+              f"({rate:.1f} frames/s) → {out_dir}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
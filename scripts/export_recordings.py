@@ -0,0 +1,85 @@
+"""Batch-export recordings to NumPy (.npy) or HDF5 arrays.
+
+Walks the {subject}/session_{id}/ layout of the recordings output
+directory and converts every .bag / .rvl to arrays plus timestamps (see
+app/camera/recording_export.py for the layout), one recording per worker
+process. Recordings already exported and unchanged since are skipped, so
+an interrupted run can be restarted with the same command.
+
+Run from the project root:
+    python scripts/export_recordings.py D:/Recordings D:/Exports
+    python scripts/export_recordings.py D:/Recordings D:/Exports --format h5 --workers 4
+    python scripts/export_recordings.py D:/Recordings D:/Exports --streams depth
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.camera.recording_export import (
+    FORMATS, H5PY_AVAILABLE, STREAMS, export_recording, export_target,
+    find_recordings, is_exported,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output_dir", help="Recordings output directory")
+    parser.add_argument("export_dir", help="Where the arrays are written")
+    parser.add_argument("--format", choices=FORMATS, default="npy")
+    parser.add_argument("--streams", default=",".join(STREAMS),
+                        help="Comma-separated streams to export (default: all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Recordings converted in parallel")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-export recordings that are already up to date")
+    args = parser.parse_args()
+
+    if args.format == "h5" and not H5PY_AVAILABLE:
+        sys.exit("HDF5 export needs h5py: pip install h5py")
+    streams = tuple(s.strip() for s in args.streams.split(",") if s.strip())
+    unknown = set(streams) - set(STREAMS)
+    if unknown:
+        sys.exit(f"Unknown stream(s): {', '.join(sorted(unknown))}")
+
+    recordings = find_recordings(args.output_dir)
+    jobs = []
+    skipped = 0
+    for file_path in recordings:
+        target = export_target(file_path, args.output_dir, args.export_dir, args.format)
+        if not args.force and is_exported(file_path, target, args.format):
+            skipped += 1
+            continue
+        jobs.append((file_path, target))
+    print(f"{len(recordings)} recordings, {skipped} already exported, "
+          f"{len(jobs)} to export with {args.workers} worker(s).")
+
+    t0 = time.perf_counter()
+    failed = 0
+    framesets = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(export_recording, fp, target, args.format, streams, True)
+                   for fp, target in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            name = os.path.relpath(result.file_path, args.output_dir)
+            if result.status == "failed":
+                failed += 1
+                print(f"[{done}/{len(jobs)}] FAILED {name}: {result.message}")
+                continue
+            framesets += result.framesets
+            note = f" ({result.message})" if result.message else ""
+            print(f"[{done}/{len(jobs)}] {name}: {result.framesets} framesets "
+                  f"in {result.seconds:.1f} s{note}")
+
+    seconds = time.perf_counter() - t0
+    print(f"\nExported {len(jobs) - failed} recording(s), {framesets} framesets "
+          f"in {seconds:.1f} s; {failed} failed.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,16 +16,20 @@ except ImportError:
     print("ERROR: pyrealsense2 is not installed.")
     sys.exit(1)
 
-from app.camera.realsense_manager import is_camera_connected, get_connected_device_info
+from app.camera.device_registry import device_registry
+from app.camera.recording_verify import VerifyJob, verify_recording
 
 def main():
     print("Checking for RealSense camera...")
-    if not is_camera_connected():
+    devices = device_registry().devices()
+    if not devices:
         print("ERROR: No RealSense camera detected. Check USB connection.")
         sys.exit(1)
 
-    info = get_connected_device_info()
-    print(f"Camera found: {info}")
+    for info in devices:
+        print(f"Camera found: {info.describe()}")
+        if info.usb_type and not info.is_usb3:
+            print("WARNING: camera is on a USB 2 port; use a USB 3.0 (blue) port.")
 
     with tempfile.TemporaryDirectory() as tmpdir:
         bag_path = os.path.join(tmpdir, "test_recording.bag")
@@ -54,13 +58,16 @@ def main():
         print(f"\nPipeline stopped.")
 
         size = os.path.getsize(bag_path)
-        if size > 0:
-            print(f"SUCCESS: .bag file exists, size = {size / (1024*1024):.1f} MB")
+        expected = {"color": (1280, 720, 30), "depth": (1280, 720, 30),
+                    "infrared": (1280, 720, 30)}
+        result = verify_recording(VerifyJob(None, bag_path, expected))
+        if result.status == "ok":
+            print(f"SUCCESS: .bag is {size / (1024*1024):.1f} MB, {result.message}")
         else:
-            print("FAILURE: .bag file is empty.")
+            print(f"FAILURE: .bag {result.status}: {result.message}")
             sys.exit(1)
 
-    print("Test completed successfully. Open the .bag in Intel RealSense Viewer to verify all 3 streams.")
+    print("Test completed successfully.")
 
 
 if __name__ == "__main__":
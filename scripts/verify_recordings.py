@@ -0,0 +1,92 @@
+"""Check the integrity of recordings and store the results in the database.
+
+Each recording is read once, frameset by frameset, to check that it
+opens, has colour, depth and infrared at the configured profiles, that
+every frameset is readable and that it is not truncated (see
+app/camera/recording_verify.py). Checks run in parallel threads.
+
+Without arguments every recording in the application database that has
+not verified OK yet is checked and its status is written back. Given
+files or recordings output directories, those are checked instead and the
+database is not written to; the expected profiles are then read from the
+application's settings if its database exists, and not checked if not.
+
+Run from the project root:
+    python scripts/verify_recordings.py
+    python scripts/verify_recordings.py --all --workers 8
+    python scripts/verify_recordings.py D:/Recordings
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.camera.recording_export import find_recordings
+from app.camera.recording_verify import VerifyJob, expected_profiles, verify_many
+
+
+def _jobs_from_paths(paths: list[str], expected) -> list[VerifyJob]:
+    files = []
+    for path in paths:
+        files += find_recordings(path) if os.path.isdir(path) else [path]
+    return [VerifyJob(None, f, expected) for f in files]
+
+
+def _jobs_from_database(include_ok: bool, expected) -> list[VerifyJob]:
+    import app.database.repositories.recording_repository as recording_repo
+    recordings = recording_repo.list_all()
+    if not include_ok:
+        recordings = [r for r in recordings if r.verify_status != "ok"]
+    chunks = recording_repo.chunk_counts()
+    return [VerifyJob(r.id, r.file_path, expected, r.duration_seconds, chunks.get(r.id))
+            for r in recordings]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*",
+                        help="Recordings or output directories (default: the database)")
+    parser.add_argument("--all", action="store_true",
+                        help="Also re-check recordings that already verified OK")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel checks")
+    args = parser.parse_args()
+
+    from app.config.settings import load_settings
+    from app.database.connection import DB_PATH
+    use_db = not args.paths
+    if use_db:
+        from app.database.schema import init_db
+        init_db()
+        expected = expected_profiles(load_settings())
+    elif DB_PATH.exists():
+        expected = expected_profiles(load_settings())
+    else:
+        expected = None
+        print("No application database; stream profiles are not checked.")
+    jobs = _jobs_from_database(args.all, expected) if use_db else \
+        _jobs_from_paths(args.paths, expected)
+    print(f"Verifying {len(jobs)} recording(s) with {args.workers} worker(s).")
+
+    if use_db:
+        import app.database.repositories.recording_repository as recording_repo
+    counts: dict[str, int] = {}
+    t0 = time.perf_counter()
+    for done, result in enumerate(verify_many(jobs, args.workers), 1):
+        status = result.status or "not checked"
+        counts[status] = counts.get(status, 0) + 1
+        if use_db and result.status is not None:
+            recording_repo.set_verification(result.recording_id, result.status,
+                                            result.message)
+        print(f"[{done}/{len(jobs)}] {status.upper():<11} {result.file_path}: "
+              f"{result.message}")
+
+    seconds = time.perf_counter() - t0
+    print(f"\nDone in {seconds:.1f} s: "
+          + (", ".join(f"{n} {s}" for s, n in sorted(counts.items())) or "nothing to do"))
+    sys.exit(0 if set(counts) <= {"ok", "warning"} else 1)
+
+
+if __name__ == "__main__":
+    main()